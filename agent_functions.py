@@ -14,10 +14,14 @@ FUNCTIONS = [
     },
     {
         "name": "click",
-        "description": "Click an element on the page, either by visible text or a CSS selector.",
+        "description": (
+            "Click an element on the page, by its element id from the page summary "
+            "(fastest), visible text or a CSS selector."
+        ),
         "parameters": {
             "type": "object",
             "properties": {
+                "id":       {"type": "string", "pattern": "^e[0-9]+$"},
                 "text":     {"type": "string"},
                 "selector": {"type": "string"}
             }
@@ -26,10 +30,11 @@ FUNCTIONS = [
     },
     {
         "name": "fill",
-        "description": "Fill an input field, by form label or CSS selector.",
+        "description": "Fill an input field, by element id, form label or CSS selector.",
         "parameters": {
             "type": "object",
             "properties": {
+                "id":       {"type": "string", "pattern": "^e[0-9]+$"},
                 "label":    {"type": "string"},
                 "selector": {"type": "string"},
                 "text":     {"type": "string"}
@@ -49,27 +54,147 @@ FUNCTIONS = [
             "required": ["timeout_ms"]
         }
     },
+    {
+        "name": "fill_form",
+        "description": (
+            "Fill every field of a form in one step, and optionally submit it. "
+            "`fields` maps each field (its name from the page summary, element id, "
+            "label or placeholder) to the value to enter; use true/false for "
+            "checkboxes and the option text or value for selects and radio groups."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "form_selector": {"type": "string"},
+                "fields": {
+                    "type": "object",
+                    "additionalProperties": {"type": ["string", "boolean", "number"]},
+                    "minProperties": 1
+                },
+                "submit": {"type": "boolean"}
+            },
+            "required": ["form_selector", "fields"]
+        }
+    },
     {
         "name": "extract_text",
-        "description": "Extract visible text from a CSS selector.",
+        "description": "Extract visible text from an element id or a CSS selector.",
         "parameters": {
             "type": "object",
             "properties": {
+                "id":       {"type": "string", "pattern": "^e[0-9]+$"},
                 "selector": {"type": "string"}
+            }
+        }
+    },
+    {
+        "name": "extract_all",
+        "description": (
+            "Extract the visible text of every element matching a CSS selector, "
+            "in one step. Returns at most `limit` items (default 100) starting at "
+            "`offset`; with `next_selector`, clicks that pagination control and "
+            "continues on up to `max_pages` pages."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "selector":      {"type": "string"},
+                "limit":         {"type": "integer", "minimum": 1},
+                "offset":        {"type": "integer", "minimum": 0},
+                "next_selector": {"type": "string"},
+                "max_pages":     {"type": "integer", "minimum": 1, "maximum": 50}
+            },
+            "required": ["selector"]
+        }
+    },
+    {
+        "name": "extract_table",
+        "description": (
+            "Extract a table (CSS selector of the <table>) as column names and "
+            "rows of cell text. Paginates like extract_all."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "selector":      {"type": "string"},
+                "limit":         {"type": "integer", "minimum": 1},
+                "offset":        {"type": "integer", "minimum": 0},
+                "next_selector": {"type": "string"},
+                "max_pages":     {"type": "integer", "minimum": 1, "maximum": 50}
             },
             "required": ["selector"]
         }
     },
+    {
+        "name": "extract_attributes",
+        "description": (
+            "Extract attributes (e.g. href, src; \"text\" for the element text) "
+            "of every element matching a CSS selector, as one row per element. "
+            "Paginates like extract_all."
+        ),
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "selector":      {"type": "string"},
+                "attributes":    {"type": "array", "items": {"type": "string"}, "minItems": 1},
+                "limit":         {"type": "integer", "minimum": 1},
+                "offset":        {"type": "integer", "minimum": 0},
+                "next_selector": {"type": "string"},
+                "max_pages":     {"type": "integer", "minimum": 1, "maximum": 50}
+            },
+            "required": ["selector", "attributes"]
+        }
+    },
     {
         "name": "screenshot",
-        "description": "Take a screenshot of the page or a specific selector.",
+        "description": (
+            "Take a screenshot of the full page (or only the visible part with "
+            "`full_page` false) or of a specific selector; saved to `path` if "
+            "given. JPEG/WebP with a `quality` and a `max_width` keep it small."
+        ),
         "parameters": {
             "type": "object",
             "properties": {
-                "path":     {"type": "string"},
-                "selector": {"type": "string"}
+                "path":      {"type": "string"},
+                "selector":  {"type": "string"},
+                "format":    {"type": "string", "enum": ["png", "jpeg", "webp"], "default": "png"},
+                "quality":   {"type": "integer", "minimum": 0, "maximum": 100},
+                "full_page": {"type": "boolean"},
+                "max_width": {"type": "integer", "minimum": 1}
+            }
+        }
+    },
+    {
+        "name": "new_tab",
+        "description": "Open a URL in a new tab and make it the current tab.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "url": {"type": "string", "format": "uri"}
             },
-            "required": ["path"]
+            "required": ["url"]
+        }
+    },
+    {
+        "name": "switch_tab",
+        "description": "Make another open tab (by tab id, e.g. t1) the current tab.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "tab": {"type": "string", "pattern": "^t[0-9]+$"}
+            },
+            "required": ["tab"]
+        }
+    },
+    {
+        "name": "close_tab",
+        "description": "Close a tab by tab id; closing the current tab switches to the last one left.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "tab": {"type": "string", "pattern": "^t[0-9]+$"}
+            },
+            "required": ["tab"]
         }
     },
     {
@@ -81,3 +206,53 @@ FUNCTIONS = [
         }
     }
 ]
+
+# Offered in addition to FUNCTIONS when the autonomous loop runs in batch mode
+BATCH_FUNCTION = {
+    "name": "batch",
+    "description": (
+        "Run an ordered list of browser actions in one turn. Each step is "
+        "{\"action\": <function name>, \"args\": {...}} using the functions "
+        "above (not done). Steps after a navigation or a failed step are skipped."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "steps": {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "action": {"type": "string"},
+                        "args":   {"type": "object"}
+                    },
+                    "required": ["action", "args"]
+                }
+            }
+        },
+        "required": ["steps"]
+    }
+}
+
+# Offered in addition to FUNCTIONS when the autonomous loop may fan out
+FAN_OUT_FUNCTION = {
+    "name": "fan_out",
+    "description": (
+        "Work on several independent sub-goals at once (e.g. one per website), "
+        "each by its own agent in its own tab. Their results are reported back "
+        "in the next page summary under \"fan_out_results\"."
+    ),
+    "parameters": {
+        "type": "object",
+        "properties": {
+            "goals": {
+                "type": "array",
+                "minItems": 1,
+                "maxItems": 10,
+                "items": {"type": "string"}
+            }
+        },
+        "required": ["goals"]
+    }
+}
@@ -1,27 +1,58 @@
 #!/usr/bin/env python3
+from __future__ import annotations
+
 import os
 import sys
 import json
+import time
 import asyncio
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
 
 import click
-from dotenv import load_dotenv
-from openai import OpenAI
-from playwright.async_api import async_playwright
 
-from agent_functions import FUNCTIONS
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+from agent_functions import FUNCTIONS, BATCH_FUNCTION, FAN_OUT_FUNCTION
 from browseruse.schema_validator import validate_instructions
-from browser_controller import snapshot_page, execute_single
+from browser_controller import (
+    snapshot_page, execute_single, format_timings, step_event, collect_results,
+    TabSet, TAB_ACTIONS
+)
+from incremental_snapshot import IncrementalSnapshotter
+from compact_snapshot import compact_snapshot
+from conversation_history import ConversationHistory
+from browser_pool import BrowserPool, run_bounded
+from planner import Planner, OpenAIPlanner
+from tracing import Tracer, span
+from decision_cache import DecisionCache, CachingPlanner, RecordingPlanner, ReplayPlanner
+from script_recorder import ScriptRecorder, load_script
+from request_filter import RequestFilter, PROFILES
+from screenshots import strip_image
+from session_store import SessionStore, site_key
+from run_budget import RunBudget, LOOP_POLICIES, summary_hash
+
+_default_planner: Optional[Planner] = None
 
-# Load API key
-load_dotenv()
-API_KEY = os.getenv("OPENAI_API_KEY")
-if not API_KEY:
-    print("Error: OPENAI_API_KEY not set.", file=sys.stderr)
-    sys.exit(1)
+def api_key() -> str:
+    """
+    The OpenAI API key from the environment (or a .env file, read on first
+    use). Raises RuntimeError if it is not set.
+    """
+    from dotenv import load_dotenv
+    load_dotenv()
+    key = os.getenv("OPENAI_API_KEY")
+    if not key:
+        raise RuntimeError("OPENAI_API_KEY not set.")
+    return key
 
-# Instantiate client
-client = OpenAI(api_key=API_KEY)
+def default_planner() -> Planner:
+    """Shared OpenAIPlanner used when run_autonomous is not given one."""
+    global _default_planner
+    if _default_planner is None:
+        _default_planner = OpenAIPlanner(api_key=api_key())
+    return _default_planner
 
 # Autonomous system prompt
 AUTONOMOUS_SYSTEM_PROMPT = """
@@ -33,99 +64,608 @@ You are a self-driving browser agent. Each turn:
 
 Functions:
 - navigate(url)
-- click(text) or click(selector)
-- fill(label,text) or fill(selector,text)
+- click(id), click(text) or click(selector)
+- fill(id,text), fill(label,text) or fill(selector,text)
+- fill_form(form_selector,fields,submit) → a whole form in one step; prefer it over several fills
 - wait(timeout_ms) or wait(selector,timeout_ms)
-- extract_text(selector)
+- extract_text(id) or extract_text(selector)
+- extract_all(selector), extract_table(selector) or extract_attributes(selector,attributes)
+  → many records in one step; optional limit, offset, next_selector, max_pages
 - scroll(dx,dy)
-- screenshot(path) or screenshot(path,selector)
+- screenshot() or screenshot(selector); optional format (png), path, quality, full_page, max_width
+- new_tab(url), switch_tab(tab), close_tab(tab) → work with several tabs
 - done() → signals completion
 
+Elements in the page summary carry ids (e.g. "e12: Contact" or
+`e12 link "Contact"`); prefer addressing them by id, which is instant.
+If a page summary carries a "hint", your last action was skipped: follow it.
+
 Do NOT output any explanations or markdown.
 """
 
-async def run_autonomous(
-    user_goal: str,
-    headless: bool = False,
-    slow_mo: int = 250
+# Appended to the system prompt when observations are sent incrementally
+INCREMENTAL_PROMPT_NOTE = """
+After the first summary, a page summary may instead be {"changes": {...}}:
+only the sections that changed since the previous summary. "forms" is the
+complete new form list; "links"/"buttons" list the texts added and removed.
+An empty "changes" object means the page did not change.
+"""
+
+# Appended to the system prompt when observations are compact element lists
+COMPACT_PROMPT_NOTE = """
+Page summaries list visible elements as lines `<id> <kind> "<text>"`,
+chosen by relevance when space is short ("omitted" were left out,
+"offscreen" need scrolling). Target an element by its id, e.g. click(id="e12").
+"""
+
+# Appended to the system prompt when the model may plan several steps at once
+BATCH_PROMPT_NOTE = """
+When you can already see the next several actions (e.g. filling every field
+of a form and submitting it), call batch(steps) once instead, with an ordered
+list of {"action": ..., "args": {...}} steps. Steps run in order; if one
+fails or the page navigates, the rest are skipped and you get a fresh summary.
+"""
+
+# Appended to the system prompt when the model may split the goal up
+FAN_OUT_PROMPT_NOTE = """
+If the goal breaks into independent sub-goals (e.g. the same check on
+several websites), call fan_out(goals) with one self-contained goal per
+item; they run in parallel and their results come back in the next summary.
+"""
+
+def _with_defaults(instr: dict) -> dict:
+    """Fill in arguments the model may leave out: a bare screenshot() is a PNG."""
+    if instr.get("action") == "screenshot" and not instr.get("args"):
+        return {**instr, "args": {"format": "png"}}
+    return instr
+
+async def _run_step(
+    tabs: TabSet,
+    instr: dict,
+    index: int,
+    fast: bool = False,
+    profile: bool = False,
+    recorder: Optional[ScriptRecorder] = None,
+    strict: bool = False
+) -> Dict[str, Any]:
+    """
+    Execute one validated step on the current tab and return its
+    step_event. Errors are reported and swallowed so the model can react;
+    the event then carries "error". Steps that succeed are added to
+    `recorder`, if given. With `strict`, or a `recorder`, an
+    extract_text/screenshot selector that matches nothing is an error too,
+    so a broken step is neither replayed as a success nor recorded.
+    """
+    report = {}
+    start = time.perf_counter()
+    step_result = error = None
+    try:
+        step_result = await execute_single(
+            tabs.current, instr, fast=fast, report=report,
+            record=recorder is not None, tabs=tabs,
+            strict=strict or recorder is not None
+        )
+        if recorder is not None:
+            recorder.add(instr, report)
+    except Exception as e:
+        print(f"[Error executing step {instr}]: {e}", file=sys.stderr)
+        error = str(e)
+    report["total"] = time.perf_counter() - start
+    if profile:
+        print(format_timings(instr, report), file=sys.stderr)
+    return step_event(index, instr, step_result, report, error)
+
+async def _execute_batch(
+    tabs: TabSet,
+    steps: list[dict],
+    index: int,
+    **step_options
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run validated steps in order, yielding their events and stopping after
+    a failure, a navigation or a tab change so the next decision sees the
+    new page.
+    """
+    for i, instr in enumerate(steps):
+        url = tabs.current.url
+        event = await _run_step(tabs, instr, index + i, **step_options)
+        yield event
+        if "error" in event or instr["action"] in ("navigate",) + TAB_ACTIONS \
+                or tabs.current.url != url:
+            return
+
+async def fan_out(
+    context: Any,
+    goals: list[str],
+    concurrency: int = 4,
+    **loop_options
 ) -> list[dict]:
     """
-    Main control loop: observe → reason → act → repeat, until done.
-    Returns list of results from extract_text/screenshot.
+    Run independent sub-goals in parallel, each with its own autonomous_loop
+    in a new tab of `context` (shared cookies, one browser process). Tabs
+    are closed when their goal finishes. Returns [{"goal", "results"}] in
+    the order of `goals`.
     """
-    messages = [
-        {"role": "system", "content": AUTONOMOUS_SYSTEM_PROMPT}
-    ]
-    results = []
+    async def one(goal):
+        page = await context.new_page()
+        try:
+            return await autonomous_loop(page, goal, **loop_options)
+        finally:
+            await page.close()
 
-    # Launch browser
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=headless, slow_mo=slow_mo)
-        page = await browser.new_page()
-
-        done = False
-        while not done:
-            # 1️⃣ Observe: snapshot the page
-            dom_summary = await snapshot_page(page)
-            messages.append({
-                "role": "assistant",
-                "content": json.dumps(dom_summary)
-            })
+    results = await run_bounded([one(g) for g in goals], concurrency)
+    # Screenshot bytes stay out of what is reported back to the model
+    return [{"goal": g, "results": [strip_image(x) for x in r]} for g, r in zip(goals, results)]
+
+async def autonomous_stream(
+    page: Page,
+    user_goal: str,
+    planner: Optional[Planner] = None,
+    incremental: bool = False,
+    batch: bool = False,
+    compact: bool = False,
+    observation_tokens: int = 1500,
+    max_history_tokens: int = 8000,
+    keep_observations: int = 3,
+    fast: bool = False,
+    profile: bool = False,
+    recorder: Optional[ScriptRecorder] = None,
+    start_index: int = 0,
+    fan_out_concurrency: int = 0,
+    tabs: Optional[TabSet] = None,
+    max_steps: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    loop_threshold: int = 3,
+    on_loop: str = "reprompt",
+    escalation_planner: Optional[Planner] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Observe → reason → act → repeat on an already-open page, until done.
+    Yields a {"type": "decision", "turn", "name", "arguments"} event per
+    model decision and a step_event per executed step, as they happen
+    (step indices count from `start_index`).
+
+    Decisions come from `planner` (default: the shared OpenAIPlanner); pass
+    a ScriptedPlanner to run the loop offline.
+    With `batch`, the planner may return an ordered list of steps that are
+    validated together and run without re-observing, unless a step fails or
+    the page navigates.
+    With `incremental`, only the changed parts of the page summary are sent
+    after the first turn (full summaries resume after each navigation).
+    With `compact` (which takes precedence), each turn sends a
+    compact_snapshot of the visible elements ranked against the goal and
+    capped at `observation_tokens`.
+    The prompt is capped at `max_history_tokens`; only the last
+    `keep_observations` page summaries are sent in full.
+    `fast` and `profile` are passed to execute_single per step (see there);
+    with `profile` a timing line is printed for every step, and the prompt
+    size for every turn.
+    Successful steps are compiled into `recorder`, if given, so the run can
+    be replayed later without the model (see replay_script).
+    Tab actions move the loop to another page of the same context (pass
+    `tabs` to continue with an existing TabSet); when more than one tab is
+    open, the summary lists them under "tabs".
+    With `fan_out_concurrency` > 0 the planner may call fan_out(goals): the
+    sub-goals run in parallel tabs (see fan_out), up to that many at once,
+    with the same options, and their results are yielded as one step and
+    shown to the planner on the next turn. Fan-out steps are not recorded.
+    The run stops early once `max_steps` turns, `max_seconds` or
+    `max_tokens` are used up, and repeated actions on an unchanged page are
+    handled per `on_loop` ("escalate" switches to `escalation_planner`);
+    see RunBudget. The last event is always the run's {"type": "budget"}
+    summary, whose "reason" says why it stopped ("done" if it finished).
+    """
+    sub_options = dict(
+        planner=planner, incremental=incremental, batch=batch, compact=compact,
+        observation_tokens=observation_tokens, max_history_tokens=max_history_tokens,
+        keep_observations=keep_observations, fast=fast, profile=profile,
+        max_steps=max_steps, max_seconds=max_seconds, max_tokens=max_tokens,
+        loop_threshold=loop_threshold, on_loop=on_loop, escalation_planner=escalation_planner
+    )
+    system_prompt = AUTONOMOUS_SYSTEM_PROMPT
+    if compact:
+        incremental = False
+        system_prompt += COMPACT_PROMPT_NOTE
+    if incremental:
+        system_prompt += INCREMENTAL_PROMPT_NOTE
+    functions = FUNCTIONS
+    if batch:
+        system_prompt += BATCH_PROMPT_NOTE
+        functions = functions + [BATCH_FUNCTION]
+    if fan_out_concurrency > 0:
+        system_prompt += FAN_OUT_PROMPT_NOTE
+        functions = functions + [FAN_OUT_FUNCTION]
+    history = ConversationHistory(
+        system_prompt,
+        max_tokens=max_history_tokens,
+        keep_full=keep_observations
+    )
+    planner = planner or default_planner()
+    index = start_index
+    tabs = tabs or TabSet(page)
+    snapshotters: Dict[Any, IncrementalSnapshotter] = {}
+    fan_out_results = None
+    budget = RunBudget(max_steps, max_seconds, max_tokens, loop_threshold, on_loop)
+    loop_hint = None
+
+    step = 0
+    stop = None
+    while stop is None:
+        # ⏱️ Stop once a budget is used up
+        stop = budget.exceeded()
+        if stop:
+            break
+        step += 1
+        # The step span is paused at every yield, so it times only the turn
+        with span("step", step=step) as step_span:
+            # 1️⃣ Observe: snapshot the current tab (or just what changed)
+            page = tabs.current
+            if compact:
+                dom_summary = await compact_snapshot(
+                    page, user_goal, max_tokens=observation_tokens
+                )
+            elif incremental:
+                if page not in snapshotters:
+                    snapshotters[page] = IncrementalSnapshotter(page, ids=True)
+                observation = await snapshotters[page].observe()
+                dom_summary = (
+                    observation["summary"]
+                    if observation["mode"] == "full"
+                    else {"changes": observation["changes"]}
+                )
+            else:
+                dom_summary = await snapshot_page(page, ids=True)
+            if len(tabs) > 1:
+                dom_summary = {**dom_summary, "tabs": await tabs.describe()}
+            if fan_out_results is not None:
+                dom_summary = {**dom_summary, "fan_out_results": fan_out_results}
+                fan_out_results = None
+            page_hash = summary_hash(dom_summary)
+            if loop_hint is not None:
+                dom_summary = {**dom_summary, "hint": loop_hint}
+                loop_hint = None
+            history.add_observation(dom_summary)
             # 2️⃣ Reason: ask LLM what to do next
-            messages.append({"role": "user", "content": user_goal})
-
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                functions=FUNCTIONS,
-                function_call="auto",
-                temperature=0.0,
-                max_tokens=200
-            )
-            msg = resp.choices[0].message
-            if not msg.function_call:
-                raise RuntimeError("Agent did not call a function")
+            history.set_goal(user_goal)
+            messages = history.messages()
+            usage = history.turn_tokens[-1]
+            if profile:
+                print(
+                    f"[tokens] turn {usage['turn']}: {usage['prompt_tokens']} prompt"
+                    f" (untrimmed {usage['untrimmed_tokens']})",
+                    file=sys.stderr
+                )
 
-            name = msg.function_call.name
-            args = json.loads(msg.function_call.arguments)
+            with span("plan", model=planner.model) as sp:
+                decision = await planner.decide(messages, functions)
+                sp.update(
+                    decision=decision["name"],
+                    history_tokens=usage["prompt_tokens"],
+                    retries=decision.get("retries", 0)
+                )
+                if "tokens" in decision:
+                    sp.update(
+                        prompt_tokens=decision["tokens"]["prompt"],
+                        completion_tokens=decision["tokens"]["completion"]
+                    )
+            budget.charge(decision, usage["prompt_tokens"])
+            name = decision["name"]
+            args = json.loads(decision["arguments"])
 
             # 3️⃣ If done, break
             if name == "done":
-                done = True
+                stop = "done"
+                continue
+            with step_span.paused():
+                yield {"type": "decision", "turn": step, "name": name, "arguments": args}
+
+            # 🔁 The same action on the same page again: skip it, or give up
+            verdict = budget.check_loop(name, args, page_hash)
+            if verdict == "escalate" and escalation_planner is None:
+                print("[Warning] Loop detected and no escalation planner; aborting", file=sys.stderr)
+                verdict = "abort"
+            if verdict == "abort":
+                stop = "loop"
+                break
+            if verdict is not None:
+                if verdict == "escalate":
+                    planner = escalation_planner
+                loop_hint = budget.hint(name, args, page_hash)
+                history.add_function_call(name, decision["arguments"])
                 continue
 
-            # 4️⃣ Otherwise, execute the single action
-            instr = {"action": name, "args": args}
-            # Validate step
-            validate_instructions([instr])
-            # Execute step
-            try:
-                step_result = await execute_single(page, instr)
-                if step_result is not None:
-                    results.append(step_result)
-            except Exception as e:
-                print(f"[Error executing step {instr}]: {e}", file=sys.stderr)
+            # 4️⃣ Otherwise, execute the action (or batch of actions)
+            if name == "batch":
+                steps = [_with_defaults(s) for s in args.get("steps", [])]
+                # Validate the whole plan before running any of it
+                validate_instructions(steps)
+                executed = 0
+                async for event in _execute_batch(
+                    tabs, steps, index, fast=fast, profile=profile, recorder=recorder
+                ):
+                    executed += 1
+                    with step_span.paused():
+                        yield event
+                index += executed
+                budget.actions += executed
+                # Record only the steps that actually ran
+                arguments = json.dumps({"steps": steps[:executed]})
+            elif name == "fan_out":
+                # 🔀 Independent sub-goals, each in its own tab
+                goals = args.get("goals", [])
+                start = time.perf_counter()
+                fan_out_results = await fan_out(
+                    page.context, goals, fan_out_concurrency, **sub_options
+                )
+                event = step_event(
+                    index, {"action": "fan_out", "args": args},
+                    {"fan_out": fan_out_results},
+                    {"total": time.perf_counter() - start}
+                )
+                with step_span.paused():
+                    yield event
+                index += 1
+                budget.actions += 1
+                arguments = decision["arguments"]
+            else:
+                instr = _with_defaults({"action": name, "args": args})
+                # Validate step
+                validate_instructions([instr])
+                # Execute step
+                event = await _run_step(
+                    tabs, instr, index, fast=fast, profile=profile, recorder=recorder
+                )
+                with step_span.paused():
+                    yield event
+                index += 1
+                budget.actions += 1
+                arguments = decision["arguments"]
 
             # 5️⃣ Feed the function call back into the conversation
-            messages.append({
-                "role": "assistant",
-                "content": None,
-                "function_call": {
-                    "name": name,
-                    "arguments": msg.function_call.arguments
-                }
-            })
+            history.add_function_call(name, arguments)
+
+    yield budget.summary(stop)
+
+async def autonomous_loop(page: Page, user_goal: str, **options) -> list[dict]:
+    """
+    Run autonomous_stream (see there for the options) until done and
+    return the list of results from extract_text/screenshot.
+    """
+    return await collect_results(autonomous_stream(page, user_goal, **options))
+
+async def replay_stream(
+    page: Page,
+    instructions: list[dict],
+    user_goal: str,
+    fast: bool = False,
+    profile: bool = False,
+    recorder: Optional[ScriptRecorder] = None,
+    **loop_options
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Replay a compiled instruction script on `page` without the model,
+    yielding a step_event per step. If a step fails (an extract_text or
+    screenshot selector that matches nothing counts), fall back to
+    autonomous_stream for `user_goal` from the page as it is at that point.
+    Extra keyword arguments go to autonomous_stream.
+    """
+    tabs = TabSet(page)
+    for i, instr in enumerate(instructions):
+        event = await _run_step(
+            tabs, instr, i, fast=fast, profile=profile, recorder=recorder, strict=True
+        )
+        yield event
+        if "error" in event:
+            print(
+                f"[Warning] Replay failed at step {i + 1}/{len(instructions)};"
+                " continuing autonomously",
+                file=sys.stderr
+            )
+            async for event in autonomous_stream(
+                tabs.current, user_goal, fast=fast, profile=profile, recorder=recorder,
+                start_index=i + 1, tabs=tabs, **loop_options
+            ):
+                yield event
+            return
+
+async def replay_script(
+    page: Page,
+    instructions: list[dict],
+    user_goal: str,
+    **options
+) -> list[dict]:
+    """Run replay_stream (see there) and return the extract_text/screenshot results."""
+    return await collect_results(replay_stream(page, instructions, user_goal, **options))
+
+async def run_autonomous_stream(
+    user_goal: str,
+    headless: bool = False,
+    slow_mo: int = 250,
+    fast: Optional[bool] = None,
+    script_path: Optional[str] = None,
+    request_filter: Optional[RequestFilter] = None,
+    nav_timeout_ms: Optional[int] = None,
+    sessions: Optional[SessionStore] = None,
+    **loop_options
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Launch a browser and run autonomous_stream on a fresh page until done,
+    yielding its events as they happen. Extra keyword arguments are passed
+    through to autonomous_stream.
+
+    `fast` defaults to `headless` and also drops slow_mo.
+    With `script_path`, a finished run is compiled into an instruction file
+    there; if the file already exists it is replayed instead, falling back
+    to the model only from the first step that fails (and then re-saved).
+    Runs stopped by a budget or loop detection are not saved.
+    `request_filter` blocks or caches resources (see RequestFilter);
+    `nav_timeout_ms` overrides Playwright's navigation timeout.
+    With `sessions`, the browser starts from the state saved for the site
+    the goal names (see SessionStore.track), and a run that reaches done
+    saves it.
+    """
+    if fast is None:
+        fast = headless
+    recorder = ScriptRecorder() if script_path else None
+    site = site_key(user_goal) if sessions is not None else None
+    # Launch browser
+    from playwright.async_api import async_playwright
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(
+            headless=headless, slow_mo=0 if fast else slow_mo
+        )
+        state = sessions.load(site) if site else None
+        context = await browser.new_context(storage_state=state)
+        if request_filter is not None:
+            # On the context, so new tabs and popups are filtered as well
+            await request_filter.attach(context)
+        page = await context.new_page()
+        if nav_timeout_ms is not None:
+            page.set_default_navigation_timeout(nav_timeout_ms)
+
+        if script_path and os.path.exists(script_path):
+            events = replay_stream(
+                page, load_script(script_path), user_goal,
+                fast=fast, recorder=recorder, **loop_options
+            )
+        else:
+            events = autonomous_stream(
+                page, user_goal, fast=fast, recorder=recorder, **loop_options
+            )
+        if site:
+            events = sessions.track(events, context, site, restored=state is not None)
+        finished = True
+        async for event in events:
+            if event["type"] == "budget":
+                finished = event["reason"] == "done"
+            yield event
 
         # Close browser
         await browser.close()
 
-    return results
+    # A run cut short by a budget or a loop never reached the goal
+    if recorder is not None and finished:
+        recorder.save(script_path)
+
+async def run_autonomous(user_goal: str, *args, **options) -> list[dict]:
+    """
+    Run run_autonomous_stream (same arguments) to completion and return the
+    list of results from extract_text/screenshot.
+    """
+    return await collect_results(run_autonomous_stream(user_goal, *args, **options))
+
+def describe_event(event: Dict[str, Any]) -> str:
+    """One line of progress output for a streamed event."""
+    if event["type"] == "decision":
+        return f"🤖 {event['name']} {json.dumps(event['arguments'])}"
+    if event["type"] == "budget":
+        status = "Finished" if event["reason"] == "done" else f"Stopped early ({event['reason']})"
+        return (
+            f"📊 {status}: {event['steps']} turn(s), {event['actions']} action(s), "
+            f"{event['seconds']:.1f}s, {event['tokens']} token(s), {event['loops']} loop(s)"
+        )
+    line = f"▶️ {event['instruction']['action']} ({event['total'] * 1000:.0f}ms)"
+    if "error" in event:
+        return f"{line} failed: {event['error']}"
+    result = event["result"] or {}
+    if "screenshot" in result:
+        if result["screenshot"]:
+            line += f"\n📸 Screenshot saved: {result['screenshot']}"
+        else:
+            line += f"\n📸 Screenshot captured ({result['format']}, {result['bytes'] / 1024:.0f} KiB)"
+    if "extracted_text" in result:
+        line += f"\n✂️ Extracted text: {result['extracted_text']}"
+    if "extracted_items" in result:
+        line += f"\n✂️ Extracted {len(result['extracted_items'])} item(s)"
+    if "extracted_table" in result:
+        line += f"\n✂️ Extracted {len(result['extracted_table']['rows'])} row(s)"
+    if "fan_out" in result:
+        line += f"\n🔀 {len(result['fan_out'])} sub-goal(s) finished"
+    return line
+
+async def run_autonomous_many(
+    goals: list[str],
+    concurrency: int = 4,
+    pool: Optional[BrowserPool] = None,
+    headless: bool = True,
+    **loop_options
+) -> list[list[dict]]:
+    """
+    Run several goals at once, each in its own isolated browser context from
+    a warm BrowserPool (a temporary pool is created if none is given).
+    Returns one result list per goal, in order.
+    """
+    loop_options.setdefault("fast", True)
+
+    async def one(goal):
+        async with pool.page() as page:
+            return await autonomous_loop(page, goal, **loop_options)
+
+    if pool is not None:
+        return await run_bounded([one(g) for g in goals], concurrency)
+    async with BrowserPool(
+        size=max(1, -(-concurrency // 4)),
+        contexts_per_browser=4,
+        headless=headless
+    ) as pool:
+        return await run_bounded([one(g) for g in goals], concurrency)
 
 @click.command(context_settings={"ignore_unknown_options": True})
 @click.argument("user_goal", nargs=-1)
 @click.option("--headless/--show", default=False, help="Run in headless mode")
 @click.option("--slow-mo",     default=250,   help="Delay between actions (ms)")
-def main(user_goal, headless, slow_mo):
+@click.option("--incremental/--full-snapshots", default=False,
+              help="Send only page changes after the first snapshot")
+@click.option("--batch/--single-step", default=False,
+              help="Let the model plan several actions per turn")
+@click.option("--compact/--full-page", default=False,
+              help="Send compact, goal-ranked element lists with short ids")
+@click.option("--observation-tokens", default=1500,
+              help="Token budget per compact page observation")
+@click.option("--fan-out", "fan_out_concurrency", default=0, metavar="N",
+              help="Let the model split the goal into up to N parallel tabs")
+@click.option("--fast/--no-fast", default=None,
+              help="Race locators and skip fixed delays (default: on when headless)")
+@click.option("--profile", is_flag=True, help="Print per-step timings and prompt sizes")
+@click.option("--trace", "trace_path", default=None, metavar="PATH",
+              help="Write per-step spans as JSONL and print a metrics summary")
+@click.option("--cache/--no-cache", default=False,
+              help="Reuse cached model decisions for identical requests")
+@click.option("--record", "record_path", default=None, metavar="PATH",
+              help="Record every model decision to a JSONL session file")
+@click.option("--replay", "replay_path", default=None, metavar="PATH",
+              help="Replay a recorded session strictly, without model calls")
+@click.option("--script", "script_path", default=None, metavar="PATH",
+              help="Replay this instruction file if it exists (falling back to the "
+                   "model on failure), else compile the run into it")
+@click.option("--block", "block_profile", type=click.Choice(sorted(PROFILES)), default="none",
+              help="Resource blocking profile (lean: images, media, fonts, trackers)")
+@click.option("--block-type", multiple=True, metavar="TYPE",
+              help="Also block this resource type (e.g. stylesheet); repeatable")
+@click.option("--block-domain", multiple=True, metavar="DOMAIN",
+              help="Also block requests to this domain and its subdomains; repeatable")
+@click.option("--cache-assets", is_flag=True,
+              help="Serve scripts and stylesheets from a local cache after the first fetch")
+@click.option("--nav-timeout", default=None, type=float, metavar="SECONDS",
+              help="Navigation timeout")
+@click.option("--session", "use_session", is_flag=True,
+              help="Start from the saved login session for the goal's site and save it afterwards")
+@click.option("--session-max-age", default=24.0, metavar="HOURS",
+              help="Ignore saved sessions older than this")
+@click.option("--max-steps", default=None, type=int, metavar="N", help="Stop after N model turns")
+@click.option("--max-seconds", default=None, type=float, metavar="SECONDS",
+              help="Stop once the run has taken this long")
+@click.option("--max-tokens", default=None, type=int, metavar="N",
+              help="Stop once the model calls have used N tokens")
+@click.option("--on-loop", type=click.Choice(LOOP_POLICIES), default="reprompt",
+              help="When the model repeats an action on an unchanged page")
+@click.option("--escalate-model", default=None, metavar="MODEL",
+              help="Model to hand the run to when --on-loop escalate triggers")
+def main(user_goal, headless, slow_mo, incremental, batch, compact, observation_tokens,
+         fan_out_concurrency, fast, profile, trace_path, cache, record_path, replay_path, script_path, block_profile,
+         block_type, block_domain, cache_assets, nav_timeout, use_session, session_max_age,
+         max_steps, max_seconds, max_tokens, on_loop, escalate_model):
     """
     Autonomous browser agent. Describe your goal in plain English:
 
@@ -136,8 +676,59 @@ def main(user_goal, headless, slow_mo):
         print("[Error] No goal provided.", file=sys.stderr)
         sys.exit(1)
 
-    results = asyncio.run(run_autonomous(goal, headless, slow_mo))
-    print("✅ Final results:", results)
+    if replay_path:
+        planner = ReplayPlanner(replay_path, strict=True)
+    else:
+        try:
+            planner = default_planner()
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        if cache:
+            planner = CachingPlanner(planner, DecisionCache())
+        if record_path:
+            planner = RecordingPlanner(planner, record_path)
+
+    request_filter = RequestFilter.from_options(
+        block_profile, block_type, block_domain, cache_assets
+    )
+    nav_timeout_ms = int(nav_timeout * 1000) if nav_timeout else None
+    sessions = SessionStore(max_age=session_max_age * 3600) if use_session else None
+    escalation_planner = None
+    if escalate_model:
+        try:
+            escalation_planner = OpenAIPlanner(api_key=api_key(), model=escalate_model)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    async def stream() -> int:
+        # Print progress as it happens rather than collecting every result
+        count = 0
+        async for event in run_autonomous_stream(
+            goal, headless, slow_mo, fast=fast, planner=planner,
+            incremental=incremental, batch=batch, compact=compact,
+            observation_tokens=observation_tokens, profile=profile,
+            fan_out_concurrency=fan_out_concurrency,
+            script_path=script_path, request_filter=request_filter,
+            nav_timeout_ms=nav_timeout_ms, sessions=sessions,
+            max_steps=max_steps, max_seconds=max_seconds, max_tokens=max_tokens,
+            on_loop=on_loop, escalation_planner=escalation_planner
+        ):
+            print(describe_event(event), flush=True)
+            if event["type"] == "step" and event["result"] is not None:
+                count += 1
+        return count
+
+    tracer = Tracer()
+    with (tracer.activate() if trace_path else nullcontext()):
+        count = asyncio.run(stream())
+    if trace_path:
+        tracer.write_jsonl(trace_path)
+        print(tracer.prometheus(), file=sys.stderr)
+    if request_filter.active:
+        print(request_filter.summary(), file=sys.stderr)
+    print(f"✅ Done: {count} result(s)")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+from typing import Any, Dict, Iterable, Optional
+
+import click
+
+from ai_agent import autonomous_stream, default_planner
+from browser_controller import stream_on_page
+from browser_pool import BrowserPool
+from browseruse.schema_validator import validate_instructions
+from planner import Planner, BoundedPlanner
+from request_filter import RequestFilter, PROFILES
+from screenshots import strip_image
+
+
+def _task(raw: Any, where: str, default_id: str) -> Dict[str, Any]:
+    """Normalise one input row to {"id", "goal"} or {"id", "instructions"}."""
+    if isinstance(raw, str):
+        raw = {"goal": raw}
+    if not isinstance(raw, dict):
+        raise ValueError(f"{where}: expected an object or a goal string")
+    task = {"id": str(raw.get("id") or default_id)}
+    if raw.get("instructions"):
+        instructions = raw["instructions"]
+        if isinstance(instructions, str):
+            try:
+                instructions = json.loads(instructions)
+            except ValueError as e:
+                raise ValueError(f"{where}: instructions are not valid JSON ({e})")
+        task["instructions"] = instructions
+    elif (raw.get("goal") or "").strip():
+        task["goal"] = raw["goal"].strip()
+    else:
+        raise ValueError(f"{where}: needs a \"goal\" or \"instructions\"")
+    return task
+
+
+def load_tasks(path: str) -> list[Dict[str, Any]]:
+    """
+    Read batch tasks from a .csv file (columns "goal" or "instructions" as a
+    JSON string, optional "id") or a JSONL file (one object with the same
+    keys, or a bare goal string, per line). Rows without an id are numbered
+    by line. Duplicate ids raise ValueError, since resuming relies on them.
+    """
+    tasks = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".csv"):
+            for line_no, row in enumerate(csv.DictReader(f), start=2):
+                tasks.append(_task(row, f"{path}:{line_no}", str(line_no - 1)))
+        else:
+            for line_no, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    raw = json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON ({e})")
+                tasks.append(_task(raw, f"{path}:{line_no}", str(line_no)))
+
+    seen = set()
+    for task in tasks:
+        if task["id"] in seen:
+            raise ValueError(f"{path}: duplicate task id {task['id']!r}")
+        seen.add(task["id"])
+    return tasks
+
+
+def finished_ids(path: str, retry_failed: bool = False) -> set:
+    """
+    Ids already recorded in a results file, so a rerun can skip them. A
+    torn last line (from a crash mid-write) is ignored; with `retry_failed`,
+    tasks recorded with status "error" are run again.
+    """
+    done = set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if retry_failed and record.get("status") != "ok":
+                    continue
+                done.add(record.get("id"))
+    except OSError:
+        pass
+    return done
+
+
+async def run_task(
+    pool: BrowserPool,
+    task: Dict[str, Any],
+    planner: Optional[Planner] = None,
+    task_timeout: Optional[float] = None,
+    **loop_options
+) -> Dict[str, Any]:
+    """
+    Run one task in a fresh pooled context and return its result record:
+    {"id", "status": "ok"|"error", "results", "step_errors", "seconds"},
+    plus "error" when the task failed and, for goals, the run's "budget"
+    summary. Instruction lists fail on any step
+    error; goals if the loop raises or stops for any reason other than
+    done, but not on a failed step, since the model can recover from it.
+    """
+    record: Dict[str, Any] = {"id": task["id"]}
+    if "goal" in task:
+        record["goal"] = task["goal"]
+    results: list[Dict[str, Any]] = []
+    step_errors: list[str] = []
+    start = time.perf_counter()
+
+    async def drive():
+        async with pool.page() as page:
+            if "instructions" in task:
+                validate_instructions(task["instructions"])
+                events = stream_on_page(page, task["instructions"], fast=True)
+            else:
+                events = autonomous_stream(page, task["goal"], planner=planner, **loop_options)
+            async for event in events:
+                if event["type"] == "budget":
+                    record["budget"] = event
+                if event["type"] != "step":
+                    continue
+                if event.get("error"):
+                    step_errors.append(event["error"])
+                elif event["result"] is not None:
+                    results.append(strip_image(event["result"]))
+
+    try:
+        await asyncio.wait_for(drive(), task_timeout)
+        if "instructions" in task and step_errors:
+            record.update(status="error", error=step_errors[0])
+        elif record.get("budget", {}).get("reason", "done") != "done":
+            # Stopped by a budget or loop detection before reaching the goal
+            record.update(status="error", error=record["budget"]["reason"])
+        else:
+            record["status"] = "ok"
+    except asyncio.TimeoutError:
+        record.update(status="error", error=f"Timed out after {task_timeout:g}s")
+    except Exception as e:
+        record.update(status="error", error=str(e) or type(e).__name__)
+    record.update(
+        results=results,
+        step_errors=len(step_errors),
+        seconds=round(time.perf_counter() - start, 3)
+    )
+    return record
+
+
+def _append(f, record: Dict[str, Any]) -> None:
+    # One line per task, flushed to disk so a crash loses at most the tasks in flight
+    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+    f.flush()
+    os.fsync(f.fileno())
+
+
+async def run_batch(
+    tasks: Iterable[Dict[str, Any]],
+    output_path: str,
+    pool: BrowserPool,
+    planner: Optional[Planner] = None,
+    concurrency: Optional[int] = None,
+    task_timeout: Optional[float] = None,
+    resume: bool = True,
+    retry_failed: bool = False,
+    quiet: bool = False,
+    **loop_options
+) -> Dict[str, Any]:
+    """
+    Run `tasks` (see load_tasks) with up to `concurrency` (default: the
+    pool's capacity) at once, appending each result record to
+    `output_path` as soon as it finishes. With `resume`, ids already in the
+    output file are skipped. Returns the counters for format_summary.
+    """
+    tasks = list(tasks)
+    done = finished_ids(output_path, retry_failed) if resume else set()
+    pending = [t for t in tasks if t["id"] not in done]
+    stats: Dict[str, Any] = {
+        "total": len(tasks),
+        "skipped": len(tasks) - len(pending),
+        "ok": 0,
+        "failed": 0,
+        "durations": [],
+        "elapsed": 0.0
+    }
+    loop_options.setdefault("fast", True)
+    limit = asyncio.Semaphore(max(1, concurrency or pool.capacity))
+
+    async def guarded(task):
+        async with limit:
+            return await run_task(pool, task, planner, task_timeout, **loop_options)
+
+    start = time.perf_counter()
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as f:
+        # 🏁 Record each task in the order it finishes
+        for finished in asyncio.as_completed([guarded(t) for t in pending]):
+            record = await finished
+            _append(f, record)
+            stats["ok" if record["status"] == "ok" else "failed"] += 1
+            stats["durations"].append(record["seconds"])
+            if not quiet:
+                mark = "✅" if record["status"] == "ok" else "❌"
+                count = stats["ok"] + stats["failed"]
+                detail = f" — {record['error']}" if "error" in record else ""
+                print(f"{mark} [{count}/{len(pending)}] {record['id']} "
+                      f"({record['seconds']:.1f}s){detail}", flush=True)
+    stats["elapsed"] = time.perf_counter() - start
+    return stats
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def format_summary(stats: Dict[str, Any]) -> str:
+    """Throughput summary of a run_batch result."""
+    ran = stats["ok"] + stats["failed"]
+    lines = [
+        f"[batch] {ran} run ({stats['ok']} ok, {stats['failed']} failed), "
+        f"{stats['skipped']} skipped, of {stats['total']} task(s)"
+    ]
+    if ran:
+        elapsed = stats["elapsed"]
+        durations = stats["durations"]
+        lines.append(
+            f"[batch] {elapsed:.1f}s wall, {ran / elapsed * 60 if elapsed else 0:.1f} tasks/min; "
+            f"per task p50 {_percentile(durations, 0.5):.1f}s, "
+            f"p90 {_percentile(durations, 0.9):.1f}s, max {max(durations):.1f}s"
+        )
+    return "\n".join(lines)
+
+
+@click.command()
+@click.argument("input_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--out", "output_path", default=None, metavar="PATH",
+              help="Results JSONL (default: <input>.results.jsonl)")
+@click.option("--browsers", default=2, help="Warm browser processes in the pool")
+@click.option("--contexts-per-browser", default=4, help="Concurrent sessions per browser")
+@click.option("--llm-concurrency", default=4, help="Maximum model calls in flight")
+@click.option("--task-timeout", default=None, type=float, metavar="SECONDS",
+              help="Give up on a task after this long")
+@click.option("--resume/--restart", default=True,
+              help="Skip tasks already in the results file, or start it over")
+@click.option("--retry-failed", is_flag=True, help="When resuming, rerun tasks that failed")
+@click.option("--headless/--show", default=True, help="Run in headless mode")
+@click.option("--batch/--single-step", default=False,
+              help="Let the model plan several actions per turn")
+@click.option("--compact/--full-page", default=True,
+              help="Observe pages as a compact, goal-ranked element list")
+@click.option("--block", "block_profile", type=click.Choice(sorted(PROFILES)), default="lean",
+              help="Resource blocking profile (lean: images, media, fonts, trackers)")
+@click.option("--cache-assets", is_flag=True,
+              help="Serve scripts and stylesheets from a local cache after the first fetch")
+@click.option("--nav-timeout", default=60.0, type=float, metavar="SECONDS",
+              help="Navigation timeout")
+def main(input_path, output_path, browsers, contexts_per_browser, llm_concurrency,
+         task_timeout, resume, retry_failed, headless, batch, compact, block_profile,
+         cache_assets, nav_timeout):
+    """
+    Run many goals or instruction lists from a JSONL or CSV file:
+
+      python batch_runner.py goals.jsonl --browsers 4 --llm-concurrency 8
+
+    Each JSONL line is {"id": ..., "goal": "..."}, {"id": ..., "instructions":
+    [...]} or a bare goal string; CSV files use the same column names.
+    Results are appended to the output file as tasks finish, so rerunning
+    the same command after a crash picks up where it stopped.
+    """
+    try:
+        tasks = load_tasks(input_path)
+    except (OSError, ValueError) as e:
+        print(f"[Error] {e}", file=sys.stderr)
+        sys.exit(1)
+    output_path = output_path or os.path.splitext(input_path)[0] + ".results.jsonl"
+
+    planner = None
+    # Instruction lists never call the model, so they need no API key
+    if any("goal" in task for task in tasks):
+        try:
+            planner = BoundedPlanner(default_planner(), llm_concurrency)
+        except RuntimeError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    request_filter = RequestFilter.from_options(block_profile, cache_assets=cache_assets)
+
+    async def run():
+        async with BrowserPool(
+            size=browsers,
+            contexts_per_browser=contexts_per_browser,
+            headless=headless,
+            timeout_ms=int(nav_timeout * 1000),
+            request_filter=request_filter
+        ) as pool:
+            return await run_batch(
+                tasks, output_path, pool, planner=planner,
+                task_timeout=task_timeout, resume=resume, retry_failed=retry_failed,
+                batch=batch, compact=compact
+            )
+
+    stats = asyncio.run(run())
+    print(format_summary(stats))
+    if request_filter.active:
+        print(request_filter.summary(), file=sys.stderr)
+    print(f"📄 Results: {output_path}")
+    if stats["failed"]:
+        sys.exit(1)
+
+
+__all__ = ["load_tasks", "finished_ids", "run_task", "run_batch", "format_summary"]
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark: serves the fixture site locally and drives
+snapshot_page, execute_on_page and autonomous_stream with a ScriptedPlanner in
+place of OpenAI, so no network access or API key is needed.
+
+Reports latency percentiles, steps per second and memory per session.
+
+    python benchmarks/bench_agent.py --rounds 20 --sessions 4
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import click
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("OPENAI_API_KEY", "offline-benchmark")
+
+from ai_agent import autonomous_stream  # noqa: E402
+from browser_controller import snapshot_page, execute_on_page, execute_single  # noqa: E402
+from browser_pool import BrowserPool  # noqa: E402
+from planner import ScriptedPlanner  # noqa: E402
+from fixture_site import serve  # noqa: E402
+
+try:
+    import psutil
+except ImportError:  # memory figures are skipped without psutil
+    psutil = None
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p90/p99/mean of `samples` (seconds), in milliseconds."""
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]  # noqa: E731
+    return {
+        "p50": pick(0.50) * 1000,
+        "p90": pick(0.90) * 1000,
+        "p99": pick(0.99) * 1000,
+        "mean": sum(ordered) / len(ordered) * 1000
+    }
+
+
+def _fmt(stats: Dict[str, float]) -> str:
+    return "  ".join(f"{k} {v:7.1f}ms" for k, v in stats.items())
+
+
+def tree_rss_mb() -> Optional[float]:
+    """Resident memory of this process plus all children (browsers), in MB."""
+    if psutil is None:
+        return None
+    me = psutil.Process()
+    total = 0
+    for proc in [me] + me.children(recursive=True):
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / 2**20
+
+
+def contact_script(base: str) -> List[dict]:
+    return [
+        {"action": "navigate",     "args": {"url": f"{base}/contact"}},
+        {"action": "fill",         "args": {"label": "Name", "text": "Ada Lovelace"}},
+        {"action": "fill",         "args": {"selector": "#email", "text": "ada@example.com"}},
+        {"action": "fill",         "args": {"label": "Message", "text": "Hello!"}},
+        {"action": "click",        "args": {"text": "Send"}},
+        {"action": "extract_text", "args": {"selector": "#thanks"}}
+    ]
+
+
+async def bench_snapshots(pool: BrowserPool, base: str, rounds: int) -> dict:
+    report = {}
+    async with pool.page() as page:
+        for label, path in (
+            ("forms x50",   "/forms?n=50&fields=10"),
+            ("links x5000", "/links?n=5000"),
+            ("spa x200",    "/spa?items=200")
+        ):
+            await page.goto(base + path)
+            samples = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                await snapshot_page(page)
+                samples.append(time.perf_counter() - start)
+            report[label] = percentiles(samples)
+            print(f"  snapshot {label:<12} {_fmt(report[label])}")
+    return report
+
+
+async def bench_instructions(pool: BrowserPool, base: str, rounds: int) -> dict:
+    script = contact_script(base)
+    step_samples: List[float] = []
+    start = time.perf_counter()
+    async with pool.page() as page:
+        for _ in range(rounds):
+            for instr in script:
+                t0 = time.perf_counter()
+                await execute_single(page, instr, fast=True)
+                step_samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    stats = percentiles(step_samples)
+    steps_per_s = len(step_samples) / elapsed
+    print(f"  instruction step     {_fmt(stats)}  {steps_per_s:6.1f} steps/s")
+    # Whole-script latency on the public entry point as well
+    async with pool.page() as page:
+        t0 = time.perf_counter()
+        results = await execute_on_page(page, script, fast=True)
+        print(f"  execute_on_page      {(time.perf_counter() - t0) * 1000:7.1f}ms for"
+              f" {len(script)} steps -> {results}")
+    return {"step": stats, "steps_per_s": steps_per_s}
+
+
+async def bench_autonomous(
+    pool: BrowserPool, base: str, sessions: int, planner_delay: float
+) -> dict:
+    decisions = [
+        (instr["action"], instr["args"]) for instr in contact_script(base)
+    ] + [("done", {})]
+    turn_samples: List[float] = []
+    rss_before = tree_rss_mb()
+    peak = [rss_before or 0.0]
+
+    async def session() -> int:
+        planner = ScriptedPlanner(list(decisions), delay=planner_delay)
+        async with pool.page() as page:
+            # A turn (observe, plan, act) ends with its step event; the
+            # closing "done" turn ends with the budget summary
+            t0 = time.perf_counter()
+            async for event in autonomous_stream(
+                page, "Send a message through the contact form", planner=planner, fast=True
+            ):
+                if event["type"] in ("step", "budget"):
+                    now = time.perf_counter()
+                    turn_samples.append(now - t0)
+                    t0 = now
+            turns = len(planner.calls)
+            rss = tree_rss_mb()
+            if rss is not None:
+                peak[0] = max(peak[0], rss)
+            return turns - 1  # the last turn is "done"
+
+    start = time.perf_counter()
+    steps = sum(await asyncio.gather(*(session() for _ in range(sessions))))
+    elapsed = time.perf_counter() - start
+    stats = percentiles(turn_samples)
+    report = {"turn": stats, "steps_per_s": steps / elapsed}
+    line = f"  autonomous turn      {_fmt(stats)}  {steps / elapsed:6.1f} steps/s"
+    if rss_before is not None:
+        report["mb_per_session"] = (peak[0] - rss_before) / sessions
+        line += f"  ~{report['mb_per_session']:.0f} MB/session"
+    print(line)
+    return report
+
+
+async def bench(rounds: int, sessions: int, planner_delay: float, out: Optional[str]) -> None:
+    with serve() as base:
+        async with BrowserPool(size=1, contexts_per_browser=max(2, sessions)) as pool:
+            print(f"Fixture site at {base}")
+            report = {
+                "snapshot": await bench_snapshots(pool, base, rounds),
+                "instructions": await bench_instructions(pool, base, max(1, rounds // 5)),
+                "autonomous": await bench_autonomous(pool, base, sessions, planner_delay)
+            }
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+@click.command()
+@click.option("--rounds",   default=20, help="Timed rounds per snapshot benchmark")
+@click.option("--sessions", default=4,  help="Concurrent autonomous sessions")
+@click.option("--planner-delay-ms", default=0, help="Simulated model latency per turn")
+@click.option("--json", "out", default=None, metavar="PATH", help="Also write the report as JSON")
+def main(rounds, sessions, planner_delay_ms, out):
+    """Offline agent benchmark against the local fixture site."""
+    asyncio.run(bench(rounds, sessions, planner_delay_ms / 1000, out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cold-start cost of the CLI entry points, measured with `python -X importtime`
+in a fresh interpreter per run (no API key set, so nothing is constructed).
+Reports the median cumulative import time of each module and the slowest
+dependencies it pulls in; exits non-zero if a module is over `--budget-ms`
+or imports one of the modules that must stay lazy.
+
+    python benchmarks/bench_import.py --runs 5 --budget-ms 300
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import click
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = ("ai_agent", "demo", "batch_runner", "browser_controller")
+
+# Loaded on first use only: the OpenAI SDK, Playwright, Pillow, jsonschema, dotenv
+LAZY_MODULES = ("openai", "playwright", "PIL", "jsonschema", "dotenv")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """(name, cumulative µs, nesting depth) for every module `module` imports."""
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            rows.append((name, int(cumulative), len(indent) // 2))
+    return rows
+
+
+def measure(module: str, runs: int) -> Dict[str, object]:
+    totals, slowest, loaded = [], {}, set()
+    for _ in range(runs):
+        rows = import_times(module)
+        totals.append(next(us for name, us, _ in rows if name == module))
+        for name, us, depth in rows:
+            loaded.add(name.split(".")[0])
+            if depth == 1:
+                slowest[name] = max(slowest.get(name, 0), us)
+    top = sorted(slowest.items(), key=lambda item: -item[1])[:3]
+    return {
+        "ms": statistics.median(totals) / 1000,
+        "top": [(name, us / 1000) for name, us in top],
+        "eager": sorted(m for m in LAZY_MODULES if m in loaded)
+    }
+
+
+@click.command()
+@click.option("--runs", default=5, help="Fresh interpreters per entry point")
+@click.option("--budget-ms", default=300.0, help="Fail if an entry point imports slower than this")
+@click.argument("modules", nargs=-1)
+def main(runs, budget_ms, modules):
+    """Benchmark and guard the import time of the CLI entry points."""
+    failed = False
+    for module in modules or ENTRY_POINTS:
+        report = measure(module, runs)
+        top = ", ".join(f"{name} {ms:.0f}ms" for name, ms in report["top"])
+        print(f"{module:>20}: {report['ms']:7.1f}ms  (slowest: {top})")
+        if report["ms"] > budget_ms:
+            print(f"[Error] {module} imports in {report['ms']:.0f}ms, over the {budget_ms:.0f}ms budget")
+            failed = True
+        if report["eager"]:
+            print(f"[Error] {module} imports {', '.join(report['eager'])} eagerly")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measure tasks per minute with a warm BrowserPool versus launching a new
+Chromium for every task (what execute_instructions/run_autonomous do).
+
+    python benchmarks/bench_pool.py --tasks 40 --concurrency 8
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+import click
+from playwright.async_api import async_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browser_controller import execute_on_page, execute_many  # noqa: E402
+from browser_pool import BrowserPool, run_bounded  # noqa: E402
+
+PAGE = "data:text/html," + quote(
+    "<html><body><h1 id='title'>Task page</h1>"
+    "<form id='f'><input name='q'/><button>Go</button></form></body></html>"
+)
+
+TASK = [
+    {"action": "navigate",     "args": {"url": PAGE}},
+    {"action": "fill",         "args": {"selector": "[name=q]", "text": "hello"}},
+    {"action": "extract_text", "args": {"selector": "#title"}}
+]
+
+
+async def launch_per_task(tasks: int, concurrency: int, fast: bool) -> None:
+    """execute_instructions without its 2s observation pause."""
+    async def one():
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            await execute_on_page(page, TASK, fast=fast)
+            await browser.close()
+
+    await run_bounded([one() for _ in range(tasks)], concurrency)
+
+
+async def pooled(tasks: int, concurrency: int, fast: bool) -> None:
+    async with BrowserPool(
+        size=max(1, -(-concurrency // 4)), contexts_per_browser=4
+    ) as pool:
+        # Pool start-up is paid once per process, so leave it out of the timing
+        start = time.perf_counter()
+        await execute_many([TASK] * tasks, concurrency=concurrency, pool=pool, fast=fast)
+        return time.perf_counter() - start
+
+
+async def bench(tasks: int, concurrency: int, fast: bool) -> None:
+    # Both sides run in the same mode so the speedup is the pool's alone
+    start = time.perf_counter()
+    await launch_per_task(tasks, concurrency, fast)
+    cold = time.perf_counter() - start
+    warm = await pooled(tasks, concurrency, fast)
+
+    for label, elapsed in (("launch-per-task", cold), ("pool", warm)):
+        print(
+            f"{label:>16}: {elapsed:6.2f} s total,"
+            f" {tasks / elapsed * 60:8.1f} tasks/min"
+        )
+    print(f"{'speedup':>16}: {cold / warm:6.1f}x")
+
+
+@click.command()
+@click.option("--tasks",       default=20, help="Number of instruction lists to run")
+@click.option("--concurrency", default=4,  help="Tasks running at once")
+@click.option("--fast/--no-fast", default=True,
+              help="Run steps in fast mode (both sides)")
+def main(tasks, concurrency, fast):
+    """Benchmark warm browser pool throughput."""
+    asyncio.run(bench(tasks, concurrency, fast))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Per-step validation cost: jsonschema.validate (what validate_instructions
+used to call on every step) versus the precompiled per-action fast path.
+
+    python benchmarks/bench_schema_validator.py --number 2000
+"""
+import sys
+import timeit
+from pathlib import Path
+
+import click
+from jsonschema import validate
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browseruse.schema_validator import validate_instructions, _load_schema  # noqa: E402
+
+STEP = [{"action": "fill", "args": {"selector": "[name=email]", "text": "a@b.c"}}]
+PLAN = [
+    {"action": "navigate", "args": {"url": "https://example.com/contact"}},
+    {"action": "fill",     "args": {"label": "Name", "text": "Ada"}},
+    {"action": "fill",     "args": {"selector": "[name=email]", "text": "a@b.c"}},
+    {"action": "click",    "args": {"text": "Send"}},
+    {"action": "wait",     "args": {"selector": "#thanks", "timeout_ms": 5000}},
+    {"action": "extract_text", "args": {"selector": "#thanks"}}
+] * 4
+
+
+@click.command()
+@click.option("--number", default=2000, help="Validations per measurement")
+def main(number):
+    """Benchmark schema validation per step and per plan."""
+    schema = _load_schema()
+    validate_instructions(STEP)  # compile outside the timing
+
+    for label, payload in (("1 step", STEP), (f"{len(PLAN)} steps", PLAN)):
+        old = timeit.timeit(lambda: validate(instance=payload, schema=schema), number=number)
+        new = timeit.timeit(lambda: validate_instructions(payload), number=number)
+        print(
+            f"{label:>9}: jsonschema.validate {old / number * 1e6:8.1f} us,"
+            f" validate_instructions {new / number * 1e6:8.1f} us"
+            f"  ({old / new:5.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Compare the single-evaluate snapshot_page against the per-handle walk on
+large synthetic DOMs.
+
+    python benchmarks/bench_snapshot.py --forms 50 --links 2000 --rounds 5
+"""
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import click
+from playwright.async_api import async_playwright
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from browser_controller import snapshot_page, _snapshot_page_handles  # noqa: E402
+
+
+def synthetic_html(forms: int, fields: int, links: int, buttons: int) -> str:
+    """Build a page with the requested number of forms, links and buttons."""
+    parts = ["<html><body>"]
+    for f in range(forms):
+        parts.append(f'<form id="form-{f}" class="bench form">')
+        for i in range(fields):
+            parts.append(f'<label>Field {i}</label><input name="f{f}_{i}"/>')
+        parts.append('<textarea id="notes"></textarea>')
+        parts.append('<button type="submit">Send</button></form>')
+    for i in range(links):
+        parts.append(f'<a href="#l{i}">Link number {i}</a>')
+    for i in range(buttons):
+        parts.append(f"<button>Button {i}</button>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+async def _time(fn, page, rounds: int) -> list[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await fn(page)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+async def bench(forms: int, fields: int, links: int, buttons: int, rounds: int) -> None:
+    html = synthetic_html(forms, fields, links, buttons)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(html)
+
+        fast = await snapshot_page(page)
+        slow = await _snapshot_page_handles(page)
+        if fast != slow:
+            raise SystemExit("snapshot_page and the per-handle walk disagree")
+
+        for label, fn in (("evaluate", snapshot_page), ("per-handle", _snapshot_page_handles)):
+            t = await _time(fn, page, rounds)
+            print(
+                f"{label:>10}: median {statistics.median(t) * 1000:8.1f} ms"
+                f"  min {min(t) * 1000:8.1f} ms  ({rounds} rounds)"
+            )
+        await browser.close()
+
+
+@click.command()
+@click.option("--forms",   default=50,   help="Number of forms")
+@click.option("--fields",  default=10,   help="Inputs per form")
+@click.option("--links",   default=2000, help="Number of links")
+@click.option("--buttons", default=200,  help="Number of standalone buttons")
+@click.option("--rounds",  default=5,    help="Timed rounds per implementation")
+def main(forms, fields, links, buttons, rounds):
+    """Benchmark snapshot_page implementations."""
+    print(f"DOM: {forms} forms x {fields} fields, {links} links, {buttons} buttons")
+    asyncio.run(bench(forms, fields, links, buttons, rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Local fixture site for offline benchmarks. Serves synthetic pages from a
+background thread on 127.0.0.1:
+
+  /forms?n=50&fields=10   many forms with labelled inputs
+  /links?n=5000           thousands of links
+  /spa?items=200          client-rendered list that re-renders on clicks
+                          and on a timer, like a SPA
+  /slow?delay_ms=500      page whose images are served slowly
+  /asset?delay_ms=500     a small image delivered after a delay
+  /contact                contact form; submitting shows /thanks
+
+    with serve() as base_url:
+        await page.goto(base_url + "/contact")
+"""
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+# 1x1 transparent GIF
+_PIXEL = (
+    b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04"
+    b"\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+)
+
+
+def forms_page(n: int = 50, fields: int = 10) -> str:
+    parts = ["<html><body><h1>Forms</h1>"]
+    for f in range(n):
+        parts.append(f'<form id="form-{f}" class="fixture form" action="/thanks">')
+        for i in range(fields):
+            parts.append(
+                f'<label for="f{f}_{i}">Field {f}.{i}</label>'
+                f'<input id="f{f}_{i}" name="f{f}_{i}"/>'
+            )
+        parts.append('<button type="submit">Submit</button></form>')
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def links_page(n: int = 5000) -> str:
+    links = "".join(f'<a href="/links?n=10&from={i}">Link number {i}</a> ' for i in range(n))
+    return f"<html><body><h1>Links</h1><nav>{links}</nav><button>Load more</button></body></html>"
+
+
+def spa_page(items: int = 200) -> str:
+    return f"""<html><body>
+<h1>Inbox</h1><button id="refresh">Refresh</button><ul id="list"></ul>
+<script>
+  let round = 0;
+  function render() {{
+    round += 1;
+    const list = document.getElementById("list");
+    list.innerHTML = "";
+    for (let i = 0; i < {items}; i++) {{
+      const li = document.createElement("li");
+      const a = document.createElement("a");
+      a.href = "#item-" + i;
+      a.textContent = "Message " + i + " (render " + round + ")";
+      li.appendChild(a);
+      list.appendChild(li);
+    }}
+  }}
+  document.getElementById("refresh").addEventListener("click", render);
+  render();
+  setInterval(render, 2000);
+</script>
+</body></html>"""
+
+
+def slow_page(delay_ms: int = 500, images: int = 5) -> str:
+    imgs = "".join(
+        f'<img src="/asset?delay_ms={delay_ms}&i={i}" width="1" height="1"/>'
+        for i in range(images)
+    )
+    return f'<html><body><h1 id="title">Slow page</h1>{imgs}<a href="/contact">Contact</a></body></html>'
+
+
+CONTACT_PAGE = """<html><body>
+<h1>Contact us</h1>
+<form id="contact-form" action="/thanks">
+  <label for="name">Name</label><input id="name" name="name"/>
+  <label for="email">Email</label><input id="email" name="email"/>
+  <label for="message">Message</label><textarea id="message" name="message"></textarea>
+  <button type="submit">Send</button>
+</form>
+</body></html>"""
+
+THANKS_PAGE = '<html><body><h1 id="thanks">Thanks for your message!</h1></body></html>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: bytes, content_type: str = "text/html; charset=utf-8") -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        q = {k: v[0] for k, v in parse_qs(url.query).items()}
+        num = lambda key, default: int(q.get(key, default))  # noqa: E731
+
+        if url.path == "/forms":
+            page = forms_page(num("n", 50), num("fields", 10))
+        elif url.path == "/links":
+            page = links_page(num("n", 5000))
+        elif url.path == "/spa":
+            page = spa_page(num("items", 200))
+        elif url.path == "/slow":
+            page = slow_page(num("delay_ms", 500), num("images", 5))
+        elif url.path == "/asset":
+            time.sleep(num("delay_ms", 500) / 1000)
+            return self._send(_PIXEL, "image/gif")
+        elif url.path in ("/", "/contact"):
+            page = CONTACT_PAGE
+        elif url.path == "/thanks":
+            page = THANKS_PAGE
+        else:
+            self.send_error(404)
+            return
+        self._send(page.encode("utf-8"))
+
+
+@contextmanager
+def serve(host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Run the fixture site in a daemon thread; yields its base URL."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    with serve(port=8765) as base:
+        print(f"Fixture site running at {base} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
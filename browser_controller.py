@@ -1,18 +1,338 @@
+from __future__ import annotations
+
 import asyncio
 import json
-from typing import Any, Dict, Optional
-from playwright.async_api import (
-    async_playwright,
-    Page,
-    TimeoutError as PlaywrightTimeoutError
-)
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Iterable, Optional, Sequence
+
+if TYPE_CHECKING:
+    # Playwright is imported when a browser is first started, not on import
+    from playwright.async_api import Page
+
+from browser_pool import BrowserPool, run_bounded
+from locator_resolver import LocatorResolver, default_resolver
+from request_filter import RequestFilter
+from tracing import span
+from screenshots import format_for, needs_transcode, capture, transcode, write_file
+from session_store import SessionStore, site_key
+
+class ActionFailed(RuntimeError):
+    """An instruction could not be carried out (e.g. no matching element)."""
+
+def _timeout_error() -> type:
+    """Playwright's TimeoutError; only looked up once an exception is raised."""
+    from playwright.async_api import TimeoutError
+    return TimeoutError
+
+TAB_ACTIONS = ("new_tab", "switch_tab", "close_tab")
+
+class TabSet:
+    """
+    The pages (tabs) one agent has open, addressed by short ids ("t0",
+    "t1", ...), and which of them actions currently run on. Only the
+    starting page, the tabs opened through new_tab and the popups they open
+    themselves (e.g. target=_blank links) belong to the set, so agents
+    sharing a BrowserContext never see or close each other's tabs.
+
+        tabs = TabSet(page)
+        await execute_single(tabs.current, instr, tabs=tabs)
+    """
+
+    def __init__(self, page: Page):
+        self.current = page
+        self._ids: Dict[Any, str] = {}
+        self._next = 0
+        self._adopt(page)
+
+    def _adopt(self, page: Page) -> None:
+        if page in self._ids:
+            return
+        self._ids[page] = f"t{self._next}"
+        self._next += 1
+        on = getattr(page, "on", None)
+        if on is not None:
+            on("popup", self._adopt)
+
+    def pages(self) -> Dict[str, Page]:
+        """Open tabs by id, in opening order."""
+        open_pages = self.current.context.pages
+        return {tab: p for p, tab in self._ids.items() if p in open_pages}
+
+    def __len__(self) -> int:
+        return len(self.pages())
 
-async def snapshot_page(page: Page) -> Dict[str, Any]:
+    def _get(self, tab: Optional[str]) -> Page:
+        if tab is None:
+            return self.current
+        page = self.pages().get(tab)
+        if page is None:
+            raise ActionFailed(f"No open tab {tab}")
+        return page
+
+    async def apply(self, action: str, args: Dict[str, Any]) -> None:
+        """Carry out new_tab(url), switch_tab(tab) or close_tab(tab)."""
+        if action == "new_tab":
+            page = await self.current.context.new_page()
+            self._adopt(page)
+            self.current = page
+            await page.goto(args["url"])
+        elif action == "switch_tab":
+            self.current = self._get(args["tab"])
+            await self.current.bring_to_front()
+        elif action == "close_tab":
+            page = self._get(args.get("tab"))
+            if len(self) == 1:
+                raise ActionFailed("Cannot close the last tab")
+            others = [p for p in self.pages().values() if p is not page]
+            await page.close()
+            if page is self.current:
+                self.current = others[-1]
+                await self.current.bring_to_front()
+
+    async def describe(self) -> list[str]:
+        """One line per tab, e.g. "*t1: Pricing (https://…)"; * marks the current tab."""
+        lines = []
+        for tab, page in self.pages().items():
+            mark = "*" if page is self.current else ""
+            lines.append(f"{mark}{tab}: {await page.title()} ({page.url})")
+        return lines
+
+# In-page element registry: tagElement(el) gives an element a short id
+# ("e12", also set as data-bu-id) that stays the same while it lives in this
+# document, and window.__buRegistry maps ids back to (weakly held) elements
+# so an action can look its target up in O(1). Prepended to the scripts
+# that report ids.
+ELEMENT_REGISTRY_JS = """
+const tagElement = el => {
+  const registry = window.__buRegistry || (window.__buRegistry = new Map());
+  let id = el.getAttribute("data-bu-id");
+  const owner = id && registry.has(id) ? registry.get(id).deref() : undefined;
+  if (owner === el) return id;
+  if (!id || owner) {
+    // New element, or a clone that copied another element's attribute
+    window.__buNextId = (window.__buNextId || 0) + 1;
+    id = "e" + window.__buNextId;
+    el.setAttribute("data-bu-id", id);
+  }
+  registry.set(id, new WeakRef(el));
+  return id;
+};
+"""
+
+_LOOKUP_ID_JS = """
+id => {
+  const ref = window.__buRegistry && window.__buRegistry.get(id);
+  const el = ref && ref.deref();
+  return el && el.isConnected ? el : null;
+}
+"""
+
+# Collects the same summary as the per-handle walk below, but in a single
+# page.evaluate round trip instead of one CDP call per attribute/text.
+_SNAPSHOT_JS = "({sections, ids}) => {" + ELEMENT_REGISTRY_JS + """
+  const want = key => !sections || sections.includes(key);
+  const label = (el, value) => ids ? `${tagElement(el)}: ${value}` : value;
+  const text = el => label(el, el.textContent);
+  const summary = {};
+  if (want("forms")) {
+    summary.forms = Array.from(document.querySelectorAll("form"), form => {
+      const id = form.getAttribute("id");
+      const cls = (form.getAttribute("class") || "").split(/\\s+/).filter(Boolean);
+      const selector = id ? `#${id}` : (cls.length ? `.${cls[0]}` : "form");
+      const fields = Array.from(
+        form.querySelectorAll("input,textarea,select"),
+        inp => label(inp, inp.getAttribute("name") || inp.getAttribute("id") || "")
+      );
+      const buttons = Array.from(
+        form.querySelectorAll("button, input[type=submit]"), text
+      );
+      return {form_selector: selector, fields: fields, buttons: buttons};
+    });
+  }
+  if (want("links")) {
+    summary.links = Array.from(document.querySelectorAll("a"), text);
+  }
+  if (want("buttons")) {
+    summary.buttons = Array.from(document.querySelectorAll("button"), text);
+  }
+  return summary;
+}
+"""
+
+SNAPSHOT_SECTIONS = ("forms", "links", "buttons")
+
+# Bulk extraction in one round trip: returns one page's worth of matches as
+# compact rows (text items, table cells or attribute values) plus the total
+# number available, so callers can paginate with offset/limit.
+_EXTRACT_JS = """
+({kind, selector, attributes, offset, limit}) => {
+  const clean = s => (s || "").replace(/\\s+/g, " ").trim();
+  if (kind === "table") {
+    const table = document.querySelector(selector);
+    if (!table) return null;
+    const rows = Array.from(table.querySelectorAll("tr"));
+    const header = rows.length && rows[0].querySelector("th") ? rows.shift() : null;
+    return {
+      columns: header ? Array.from(header.cells, c => clean(c.textContent)) : [],
+      rows: rows.slice(offset, offset + limit).map(r => Array.from(r.cells, c => clean(c.textContent))),
+      total: rows.length
+    };
+  }
+  const nodes = Array.from(document.querySelectorAll(selector));
+  const chunk = nodes.slice(offset, offset + limit);
+  if (kind === "attributes") {
+    // Properties give absolute URLs for href/src; "text" means the element text
+    const read = (el, name) => name === "text" ? clean(el.textContent)
+      : (typeof el[name] === "string" ? el[name] : el.getAttribute(name));
+    return {
+      columns: attributes,
+      rows: chunk.map(el => attributes.map(name => read(el, name))),
+      total: nodes.length
+    };
+  }
+  return {items: chunk.map(el => clean(el.textContent)), total: nodes.length};
+}
+"""
+
+_EXTRACT_KINDS = {
+    "extract_all": "items",
+    "extract_table": "table",
+    "extract_attributes": "attributes"
+}
+
+# Describes a resolved element by a selector that finds it again on a fresh
+# load: a unique id or data-testid/name/aria-label attribute if there is one
+# ("stable"), else its nth-of-type path from the nearest unique id.
+_STABLE_SELECTOR_JS = """
+el => {
+  const unique = sel => document.querySelectorAll(sel).length === 1;
+  const tag = el.tagName.toLowerCase();
+  if (el.id && unique(`#${CSS.escape(el.id)}`)) {
+    return {selector: `#${CSS.escape(el.id)}`, stable: true};
+  }
+  for (const attr of ["data-testid", "name", "aria-label"]) {
+    const value = el.getAttribute(attr);
+    const sel = `${tag}[${attr}="${CSS.escape(value || "")}"]`;
+    if (value && unique(sel)) return {selector: sel, stable: true};
+  }
+  const parts = [];
+  for (let node = el; node && node !== document.documentElement; node = node.parentElement) {
+    if (node.id && unique(`#${CSS.escape(node.id)}`)) {
+      parts.unshift(`#${CSS.escape(node.id)}`);
+      break;
+    }
+    let index = 1;
+    for (let sib = node.previousElementSibling; sib; sib = sib.previousElementSibling) {
+      if (sib.tagName === node.tagName) index++;
+    }
+    parts.unshift(`${node.tagName.toLowerCase()}:nth-of-type(${index})`);
+  }
+  return {selector: parts.join(" > "), stable: false};
+}
+"""
+
+# Fills a whole form in one round trip. Each key of `fields` names a control
+# of the form by element id, name, id, label, placeholder or aria-label; if
+# any key matches nothing, nothing is filled and the unmatched keys are
+# returned. Values go through the native setter plus input/change events so
+# framework-bound inputs see them. Submission is deferred to a task so the
+# result is delivered before any navigation starts.
+_FILL_FORM_JS = """
+({formSelector, fields, submit}) => {
+  const form = document.querySelector(formSelector);
+  if (!form) return null;
+  const controls = Array.from(form.querySelectorAll("input:not([type=hidden]),textarea,select"));
+  const clean = s => (s || "").replace(/\\s+/g, " ").trim().toLowerCase();
+  const names = el => [
+    el.getAttribute("data-bu-id"), el.getAttribute("name"), el.id,
+    ...Array.from(el.labels || [], l => l.textContent),
+    el.getAttribute("placeholder"), el.getAttribute("aria-label")
+  ].map(clean).filter(Boolean);
+  const find = key => {
+    // Snapshot fields read "e5: email"; accept the id, the name or both
+    const tagged = key.match(/^(e[0-9]+)(?::\\s*(.*))?$/);
+    const byId = tagged && controls.find(el => el.getAttribute("data-bu-id") === tagged[1]);
+    if (byId) return byId;
+    const want = clean(tagged && tagged[2] !== undefined ? tagged[2] : key);
+    return controls.find(el => names(el).includes(want));
+  };
+  const targets = Object.keys(fields).map(key => [key, find(key)]);
+  const missing = targets.filter(([, el]) => !el).map(([key]) => key);
+  if (missing.length) {
+    const available = controls.map(el => el.getAttribute("name") || el.id
+      || el.getAttribute("aria-label") || el.getAttribute("placeholder")).filter(Boolean);
+    return {missing: missing, available: available};
+  }
+  const setValue = (el, value) => {
+    const proto = Object.getPrototypeOf(el);
+    const setter = Object.getOwnPropertyDescriptor(proto, "value").set;
+    setter.call(el, value);
+  };
+  for (const [key, el] of targets) {
+    const value = fields[key];
+    const type = (el.getAttribute("type") || "").toLowerCase();
+    if (type === "checkbox") {
+      el.checked = value === true || ["true", "on", "yes", "1"].includes(clean(String(value)));
+    } else if (type === "radio") {
+      const group = controls.filter(r => r.type === "radio" && r.name === el.name);
+      const pick = group.find(r => clean(r.value) === clean(String(value))) || el;
+      pick.checked = true;
+      pick.dispatchEvent(new Event("input", {bubbles: true}));
+      pick.dispatchEvent(new Event("change", {bubbles: true}));
+      continue;
+    } else if (el.tagName === "SELECT") {
+      const option = Array.from(el.options).find(
+        o => clean(o.value) === clean(String(value)) || clean(o.textContent) === clean(String(value))
+      );
+      el.value = option ? option.value : String(value);
+    } else {
+      setValue(el, String(value));
+    }
+    el.dispatchEvent(new Event("input", {bubbles: true}));
+    el.dispatchEvent(new Event("change", {bubbles: true}));
+  }
+  if (submit) {
+    setTimeout(() => {
+      if (form.requestSubmit) form.requestSubmit();
+      else form.submit();
+    }, 0);
+  }
+  return {filled: targets.length};
+}
+"""
+
+async def snapshot_page(
+    page: Page,
+    sections: Optional[Sequence[str]] = None,
+    ids: bool = False
+) -> Dict[str, Any]:
     """
     Return a summary of the current page's interactive elements:
       - forms: each with a selector, list of field names, and button texts
       - links: visible link texts
       - buttons: visible button texts
+
+    The whole summary is collected by one in-page script, so the cost is a
+    single round trip regardless of how many elements the page has.
+    Pass `sections` (a subset of SNAPSHOT_SECTIONS) to collect only those keys.
+    With `ids`, every field, link and button is registered in the page and
+    listed as "<id>: <text>" (e.g. "e4: Contact"); click/fill/extract_text
+    accept that id to address the element without any locator search.
+    """
+    with span("snapshot") as sp:
+        summary = await page.evaluate(_SNAPSHOT_JS, {
+            "sections": list(sections) if sections is not None else None,
+            "ids": ids
+        })
+        sp.update({key: len(value) for key, value in summary.items()})
+    return summary
+
+async def _snapshot_page_handles(page: Page) -> Dict[str, Any]:
+    """
+    Reference implementation of snapshot_page that walks element handles,
+    paying one round trip per attribute/text lookup. Kept for benchmarks and
+    equivalence tests.
     """
     summary: Dict[str, Any] = {"forms": [], "links": [], "buttons": []}
 
@@ -64,169 +384,546 @@ async def _highlight(page: Page, handle) -> None:
         handle
     )
 
-async def execute_single(page: Page, instr: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+@contextmanager
+def _phase(report: Optional[Dict[str, Any]], name: str):
+    """Add the time spent in the block to report["timings"][name] (seconds)."""
+    if report is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = report.setdefault("timings", {})
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+# Resolves once the document has seen no mutations for `quietMs`
+_DOM_QUIET_JS = """
+(quietMs) => new Promise(resolve => {
+  const done = () => { observer.disconnect(); resolve(true); };
+  let timer = setTimeout(done, quietMs);
+  const observer = new MutationObserver(() => {
+    clearTimeout(timer);
+    timer = setTimeout(done, quietMs);
+  });
+  observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+})
+"""
+
+async def _settle(page: Page, timeout_ms: int = 3000, quiet_ms: int = 100) -> None:
+    """
+    Wait, at most `timeout_ms` in total, for the network to go idle and then
+    for the DOM to stop changing. Used by fast mode in place of fixed sleeps.
+    """
+    deadline = time.perf_counter() + timeout_ms / 1000
+    try:
+        await page.wait_for_load_state("networkidle", timeout=timeout_ms)
+    except _timeout_error():
+        pass
+    remaining = deadline - time.perf_counter()
+    if remaining <= 0:
+        return
+    try:
+        await asyncio.wait_for(page.evaluate(_DOM_QUIET_JS, quiet_ms), remaining)
+    except Exception:
+        # Timed out, or the page navigated away mid-wait
+        pass
+
+async def execute_single(
+    page: Page,
+    instr: Dict[str, Any],
+    fast: bool = False,
+    report: Optional[Dict[str, Any]] = None,
+    resolver: Optional[LocatorResolver] = None,
+    record: bool = False,
+    tabs: Optional[TabSet] = None,
+    strict: bool = False
+) -> Optional[Dict[str, Any]]:
     """
     Execute exactly one instruction on the given Playwright page.
     Returns a result dict for screenshot/extract_text, or None otherwise.
+    Raises ActionFailed when no element can be found to click or fill.
+
+    Click/fill targets are found by `resolver` (default: the shared,
+    disk-cached LocatorResolver), which races all locator strategies.
+    With `fast`, highlighting is skipped and navigations/clicks wait for
+    network idle and a quiet DOM rather than fixed delays.
+    Click/fill/extract_text with an "id" argument (from snapshot_page with
+    `ids` or compact_snapshot) look the element up in the in-page registry
+    instead, and raise ActionFailed at once if it is gone.
+    new_tab/switch_tab/close_tab act on `tabs`, whose `current` page the
+    caller should use for the following steps.
+    fill_form sets every field of a form in one page.evaluate and, with
+    "submit", submits it; it raises ActionFailed, filling nothing, if the
+    form or any named field is missing.
+    Screenshots are kept in memory as result["image"] (the full page, as
+    always, unless "full_page" is false; "clip" narrows it to a region) and
+    written to disk only with a "path".
+    A screenshot/extract_text selector that matches nothing prints a warning
+    and returns None, or with `strict` (replays, recorded runs) raises
+    ActionFailed so the step counts as failed.
+    If `report` is a dict, per-phase durations are added to report["timings"]
+    and the winning locator strategy to report["strategy"].
+    With `record` (requires `report`), the resolved click/fill target is
+    also described in report["selector"] / report["stable"] (see
+    script_recorder.compile_step).
     """
+    with span("action", action=instr["action"]) as sp:
+        if report is None and sp.active:
+            report = {}
+        try:
+            return await _execute_single(
+                page, instr, fast, report, resolver, record, tabs, strict
+            )
+        finally:
+            if report is not None:
+                sp.update(report)
+
+async def _execute_single(
+    page: Page,
+    instr: Dict[str, Any],
+    fast: bool,
+    report: Optional[Dict[str, Any]],
+    resolver: Optional[LocatorResolver],
+    record: bool = False,
+    tabs: Optional[TabSet] = None,
+    strict: bool = False
+) -> Optional[Dict[str, Any]]:
     action = instr["action"]
     args   = instr["args"]
 
+    if action in TAB_ACTIONS:
+        if tabs is None:
+            raise ActionFailed(f"{action} needs a TabSet")
+        with _phase(report, "act"):
+            await tabs.apply(action, args)
+        return None
+
     if action == "navigate":
-        await page.goto(args["url"])
+        if fast:
+            with _phase(report, "act"):
+                await page.goto(args["url"], wait_until="domcontentloaded")
+            with _phase(report, "settle"):
+                await _settle(page)
+        else:
+            with _phase(report, "act"):
+                await page.goto(args["url"])
         return None
 
     if action == "wait":
-        if "selector" in args:
-            await page.wait_for_selector(args["selector"], timeout=args["timeout_ms"])
-        else:
-            await asyncio.sleep(args["timeout_ms"] / 1000)
+        with _phase(report, "wait"):
+            if "selector" in args:
+                await page.wait_for_selector(args["selector"], timeout=args["timeout_ms"])
+            elif fast:
+                await _settle(page, timeout_ms=args["timeout_ms"])
+            else:
+                await asyncio.sleep(args["timeout_ms"] / 1000)
         return None
 
-    if action == "click":
-        clicked = False
-        text = args.get("text")
-        selector = args.get("selector")
-
-        # 1️⃣ text-first attempts
-        if text:
-            for getter in (
-                lambda: page.get_by_text(text, exact=True).first,
-                lambda: page.get_by_role("button", name=text),
-                lambda: page.get_by_role("link", name=text)
-            ):
-                try:
-                    elm = getter()
-                    await elm.wait_for(state="visible", timeout=5000)
-                    handle = await elm.element_handle()
-                    if handle:
-                        await _highlight(page, handle)
-                    await elm.click()
-                    clicked = True
-                    break
-                except Exception:
-                    continue
-
-        # 2️⃣ selector-fallback
-        if not clicked and selector:
-            try:
-                handle = await page.wait_for_selector(selector, timeout=5000)
-                await handle.scroll_into_view_if_needed()
-                await _highlight(page, handle)
-                await handle.click()
-                clicked = True
-            except PlaywrightTimeoutError:
-                pass
+    if "id" in args and action in ("click", "fill", "extract_text"):
+        return await _act_on_id(page, action, args, fast, report, record)
 
-        if not clicked:
-            print(f"[Error] Cannot click element for args: {args}")
+    if action in ("click", "fill"):
+        resolver = resolver or default_resolver()
+        with _phase(report, "locate"):
+            found = await resolver.resolve(page, action, args)
+        if found is None:
+            raise ActionFailed(f"Cannot {action} element for args: {args}")
+        strategy, elm = found
+        if report is not None:
+            report["strategy"] = strategy
+            if record:
+                # Described before acting: a click may navigate away
+                report.update(await elm.evaluate(_STABLE_SELECTOR_JS))
+        if not fast:
+            handle = await elm.element_handle()
+            if handle:
+                await _highlight(page, handle)
+        with _phase(report, "act"):
+            if action == "click":
+                await elm.click()
+            else:
+                await elm.fill(args.get("text", ""))
+        if fast and action == "click":
+            with _phase(report, "settle"):
+                await _settle(page)
         return None
 
-    if action == "fill":
-        filled = False
-        text = args.get("text", "")
-        label = args.get("label")
-        selector = args.get("selector")
-
-        # 1️⃣ label-first
-        if label:
-            try:
-                fld = page.get_by_label(label)
-                await fld.wait_for(state="visible", timeout=5000)
-                handle = await fld.element_handle()
-                if handle:
-                    await _highlight(page, handle)
-                await fld.fill(text)
-                filled = True
-            except PlaywrightTimeoutError:
-                pass
-
-        # 2️⃣ selector-fallback
-        if not filled and selector:
-            try:
-                fld = await page.wait_for_selector(selector, timeout=5000)
-                await fld.scroll_into_view_if_needed()
-                await _highlight(page, fld)
-                await fld.fill(text)
-                filled = True
-            except PlaywrightTimeoutError:
-                pass
-
-        # 3️⃣ name-attribute fallback
-        if not filled and label:
-            sel = f"[name='{label}']"
-            try:
-                fld = await page.wait_for_selector(sel, timeout=5000)
-                await _highlight(page, fld)
-                await fld.fill(text)
-                filled = True
-            except PlaywrightTimeoutError:
-                pass
-
-        if not filled:
-            print(f"[Error] Cannot fill element for args: {args}")
+    if action == "fill_form":
+        with _phase(report, "act"):
+            outcome = await page.evaluate(_FILL_FORM_JS, {
+                "formSelector": args["form_selector"],
+                "fields": args["fields"],
+                "submit": args.get("submit", False)
+            })
+        if outcome is None:
+            raise ActionFailed(f"Cannot find form: {args['form_selector']}")
+        if "missing" in outcome:
+            raise ActionFailed(
+                f"No field for {', '.join(outcome['missing'])} in {args['form_selector']}"
+                f" (fields: {', '.join(outcome['available'])})"
+            )
+        if args.get("submit"):
+            # The submission may navigate; let it land before the next step
+            with _phase(report, "settle"):
+                await _settle(page)
         return None
 
     if action == "scroll":
-        await page.evaluate(f"window.scrollBy({args['dx']}, {args['dy']})")
+        with _phase(report, "act"):
+            await page.evaluate(f"window.scrollBy({args['dx']}, {args['dy']})")
         return None
 
     if action == "screenshot":
-        path = args["path"]
+        path = args.get("path")
+        fmt = format_for(path, args.get("format"))
+        max_width = args.get("max_width")
+        target = page
         if "selector" in args:
             try:
-                handle = await page.wait_for_selector(args["selector"], timeout=5000)
-                await _highlight(page, handle)
-                await handle.screenshot(path=path)
-            except PlaywrightTimeoutError:
+                with _phase(report, "locate"):
+                    target = await page.wait_for_selector(args["selector"], timeout=5000)
+            except _timeout_error():
+                if strict:
+                    raise ActionFailed(f"Cannot find element for screenshot: {args['selector']}")
                 print(f"[Warning] Screenshot selector failed: {args['selector']}")
-        else:
-            await page.screenshot(path=path, full_page=True)
-        return {"screenshot": path}
+                return None
+            if not fast:
+                await _highlight(page, target)
+        with _phase(report, "act"):
+            data = await capture(
+                target, fmt, args.get("quality"),
+                full_page=args.get("full_page", True) and target is page,
+                clip=args.get("clip") if target is page else None,
+                max_width=max_width
+            )
+        if needs_transcode(fmt, max_width):
+            with _phase(report, "encode"):
+                data = await transcode(data, fmt, args.get("quality"), max_width)
+        if path:
+            with _phase(report, "save"):
+                await write_file(path, data)
+        return {"screenshot": path, "format": fmt, "bytes": len(data), "image": data}
 
     if action == "extract_text":
         sel = args["selector"]
         try:
-            handle = await page.wait_for_selector(sel, timeout=5000)
-            await _highlight(page, handle)
-            text = await handle.text_content()
+            with _phase(report, "locate"):
+                handle = await page.wait_for_selector(sel, timeout=5000)
+            if not fast:
+                await _highlight(page, handle)
+            with _phase(report, "act"):
+                text = await handle.text_content()
             return {"extracted_text": text}
-        except PlaywrightTimeoutError:
+        except _timeout_error():
+            if strict:
+                raise ActionFailed(f"Cannot find element for extract_text: {sel}")
             print(f"[Warning] extract_text selector failed: {sel}")
         return None
 
+    if action in _EXTRACT_KINDS:
+        return await _extract_bulk(page, action, args, report)
+
     print(f"[Error] Unsupported action: {action}")
     return None
 
-async def execute_instructions(
+async def _act_on_id(
+    page: Page,
+    action: str,
+    args: Dict[str, Any],
+    fast: bool,
+    report: Optional[Dict[str, Any]],
+    record: bool
+) -> Optional[Dict[str, Any]]:
+    """Run click/fill/extract_text on the element registered under args["id"]."""
+    with _phase(report, "locate"):
+        handle = await page.evaluate_handle(_LOOKUP_ID_JS, args["id"])
+    elm = handle.as_element()
+    if elm is None:
+        await handle.dispose()
+        raise ActionFailed(f"Unknown or stale element id: {args['id']}")
+    if report is not None:
+        report["strategy"] = "id"
+        if record:
+            report.update(await elm.evaluate(_STABLE_SELECTOR_JS))
+    if not fast:
+        await _highlight(page, elm)
+    with _phase(report, "act"):
+        if action == "click":
+            await elm.click()
+        elif action == "fill":
+            await elm.fill(args.get("text", ""))
+        else:
+            return {"extracted_text": await elm.text_content()}
+    if fast and action == "click":
+        with _phase(report, "settle"):
+            await _settle(page)
+    return None
+
+async def _extract_bulk(
+    page: Page,
+    action: str,
+    args: Dict[str, Any],
+    report: Optional[Dict[str, Any]]
+) -> Optional[Dict[str, Any]]:
+    """
+    Run extract_all / extract_table / extract_attributes: up to `limit`
+    records starting at `offset`, following `next_selector` for up to
+    `max_pages` pages. Returns {"extracted_items": [...]} or
+    {"extracted_table": {"columns", "rows"}}, plus "next_offset" when the
+    last page read still has unread matches.
+    """
+    kind = _EXTRACT_KINDS[action]
+    limit = args.get("limit", 100)
+    offset = args.get("offset", 0)
+    pages = args.get("max_pages", 1) if "next_selector" in args else 1
+    records: list = []
+    columns = None
+    next_offset = None
+    for n in range(pages):
+        with _phase(report, "act"):
+            chunk = await page.evaluate(_EXTRACT_JS, {
+                "kind": kind,
+                "selector": args["selector"],
+                "attributes": args.get("attributes", []),
+                "offset": offset,
+                "limit": limit - len(records)
+            })
+        if chunk is None:
+            if n == 0:
+                print(f"[Warning] {action} selector failed: {args['selector']}")
+                return None
+            break
+        got = chunk["items"] if kind == "items" else chunk["rows"]
+        columns = columns or chunk.get("columns")
+        records += got
+        next_offset = offset + len(got) if offset + len(got) < chunk["total"] else None
+        if len(records) >= limit or n == pages - 1:
+            break
+        # Move on to the next page of results
+        nxt = page.locator(args["next_selector"]).first
+        if not await nxt.is_visible():
+            break
+        with _phase(report, "settle"):
+            await nxt.click()
+            await _settle(page)
+        offset = 0
+
+    result = (
+        {"extracted_items": records} if kind == "items"
+        else {"extracted_table": {"columns": columns or [], "rows": records}}
+    )
+    if next_offset is not None:
+        result["next_offset"] = next_offset
+    return result
+
+def format_timings(instr: Dict[str, Any], report: Dict[str, Any]) -> str:
+    """One-line, human-readable breakdown of a step's report."""
+    phases = ", ".join(
+        f"{name} {seconds * 1000:.0f}ms"
+        for name, seconds in report.get("timings", {}).items()
+    )
+    return f"[timing] {instr['action']}: total {report['total'] * 1000:.0f}ms ({phases})"
+
+def step_event(
+    index: int,
+    instr: Dict[str, Any],
+    result: Optional[Dict[str, Any]],
+    report: Dict[str, Any],
+    error: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Progress event for one finished step, as yielded by the streaming
+    executors: {"type": "step", "index", "instruction", "result" (the
+    screenshot/extract_text dict or None), "timings", "total" (seconds)},
+    plus "error" if the step failed.
+    """
+    event = {
+        "type": "step",
+        "index": index,
+        "instruction": instr,
+        "result": result,
+        "timings": report.get("timings", {}),
+        "total": report.get("total", 0.0)
+    }
+    if error is not None:
+        event["error"] = error
+    return event
+
+async def collect_results(events: AsyncIterator[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """Drain an event stream, keeping only the step results."""
+    results: list[Dict[str, Any]] = []
+    async for event in events:
+        if event["type"] == "step" and event.get("result") is not None:
+            results.append(event["result"])
+    return results
+
+async def stream_on_page(
+    page: Page,
+    instructions: Iterable[Dict[str, Any]],
+    fast: bool = False,
+    profile: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run instructions on an already-open page, yielding a step_event as each
+    one finishes. `instructions` may be any iterable, read lazily, so long
+    runs never hold more than the current step. Tab actions switch the page
+    later steps run on.
+    With `profile`, prints where each step spent its time.
+    """
+    tabs = TabSet(page)
+    for index, instr in enumerate(instructions):
+        report: Dict[str, Any] = {}
+        start = time.perf_counter()
+        result = error = None
+        try:
+            result = await execute_single(
+                tabs.current, instr, fast=fast, report=report, tabs=tabs
+            )
+        except Exception as e:
+            print(f"[Error] executing {instr}: {e}")
+            error = str(e)
+        report["total"] = time.perf_counter() - start
+        if profile:
+            print(format_timings(instr, report))
+        yield step_event(index, instr, result, report, error)
+
+async def execute_on_page(
+    page: Page,
     instructions: list[Dict[str, Any]],
-    headless: bool = False,
-    slow_mo: int = 250
+    fast: bool = False,
+    profile: bool = False
 ) -> list[Dict[str, Any]]:
     """
-    Run a sequence of instructions via Playwright.
+    Run a sequence of instructions on an already-open page.
     Returns a list of result dicts for screenshot/extract_text.
+    With `profile`, prints where each step spent its time.
     """
-    results: list[Dict[str, Any]] = []
+    return await collect_results(stream_on_page(page, instructions, fast, profile))
+
+async def stream_instructions(
+    instructions: Iterable[Dict[str, Any]],
+    headless: bool = False,
+    slow_mo: int = 250,
+    fast: Optional[bool] = None,
+    profile: bool = False,
+    request_filter: Optional[RequestFilter] = None,
+    nav_timeout_ms: int = 60000,
+    sessions: Optional[SessionStore] = None,
+    site: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Like execute_instructions, but yield a step_event per instruction as
+    soon as it finishes instead of a list at the end.
+    """
+    if fast is None:
+        fast = headless
+    if sessions is None:
+        site = None
+    elif site is None and isinstance(instructions, (list, tuple)):
+        site = next(
+            (site_key(i["args"]["url"]) for i in instructions if i["action"] == "navigate"), None
+        )
+    from playwright.async_api import async_playwright
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=headless, slow_mo=slow_mo)
-        page    = await browser.new_page()
+        browser = await p.chromium.launch(
+            headless=headless, slow_mo=0 if fast else slow_mo
+        )
+        state   = sessions.load(site) if site else None
+        context = await browser.new_context(storage_state=state)
+        if request_filter is not None:
+            # On the context, so new tabs and popups are filtered as well
+            await request_filter.attach(context)
+        page    = await context.new_page()
         page.set_default_timeout(60000)
-        page.set_default_navigation_timeout(60000)
+        page.set_default_navigation_timeout(nav_timeout_ms)
 
-        for instr in instructions:
-            try:
-                res = await execute_single(page, instr)
-                if res is not None:
-                    results.append(res)
-            except Exception as e:
-                print(f"[Error] executing {instr}: {e}")
+        events = stream_on_page(page, instructions, fast=fast, profile=profile)
+        if site:
+            events = sessions.track(events, context, site, restored=state is not None)
+        async for event in events:
+            yield event
 
         # Pause so you can observe the final state
-        await asyncio.sleep(2)
+        if not headless:
+            await asyncio.sleep(2)
         await browser.close()
 
-    return results
+async def execute_instructions(
+    instructions: list[Dict[str, Any]],
+    headless: bool = False,
+    slow_mo: int = 250,
+    fast: Optional[bool] = None,
+    profile: bool = False,
+    request_filter: Optional[RequestFilter] = None,
+    nav_timeout_ms: int = 60000,
+    sessions: Optional[SessionStore] = None,
+    site: Optional[str] = None
+) -> list[Dict[str, Any]]:
+    """
+    Run a sequence of instructions via Playwright.
+    Returns a list of result dicts for screenshot/extract_text.
+
+    `fast` defaults to `headless`: it drops slow_mo, races locators and
+    waits on page activity instead of fixed delays (see execute_single).
+    The closing pause only happens when the browser is visible.
+    `request_filter` blocks or caches resources (see RequestFilter) and
+    `nav_timeout_ms` bounds each navigation.
+    With `sessions`, the browser starts from the state saved for `site`
+    (default: the site of the first navigate) and a successful run saves
+    it; see SessionStore.track.
+    """
+    return await collect_results(stream_instructions(
+        instructions, headless, slow_mo, fast, profile, request_filter, nav_timeout_ms,
+        sessions, site
+    ))
+
+async def execute_many(
+    instruction_lists: list[list[Dict[str, Any]]],
+    concurrency: int = 4,
+    pool: Optional[BrowserPool] = None,
+    headless: bool = True,
+    fast: bool = True
+) -> list[list[Dict[str, Any]]]:
+    """
+    Run several instruction lists at once, each in its own isolated browser
+    context from a warm BrowserPool (a temporary pool is created if none is
+    given), in `fast` mode by default. Returns one result list per input
+    list, in order.
+    """
+    async def one(instructions):
+        async with pool.page() as page:
+            return await execute_on_page(page, instructions, fast=fast)
+
+    if pool is not None:
+        return await run_bounded([one(i) for i in instruction_lists], concurrency)
+    async with BrowserPool(
+        size=max(1, -(-concurrency // 4)),
+        contexts_per_browser=4,
+        headless=headless
+    ) as pool:
+        return await run_bounded([one(i) for i in instruction_lists], concurrency)
+
+async def execute_parallel(
+    page: Page,
+    instruction_lists: list[list[Dict[str, Any]]],
+    concurrency: int = 4,
+    fast: bool = True
+) -> list[list[Dict[str, Any]]]:
+    """
+    Run independent instruction lists at once, each in a new tab of
+    `page`'s BrowserContext (so they share cookies and the browser
+    process), closing the tabs afterwards. Returns one result list per
+    input list, in order.
+    """
+    async def one(instructions):
+        tab = await page.context.new_page()
+        try:
+            return await execute_on_page(tab, instructions, fast=fast)
+        finally:
+            await tab.close()
+
+    return await run_bounded([one(i) for i in instruction_lists], concurrency)
 
 def run(
     instructions: list[Dict[str, Any]],
@@ -236,4 +933,7 @@ def run(
     """Synchronous wrapper around the async executor."""
     return asyncio.run(execute_instructions(instructions, headless, slow_mo))
 
-__all__ = ["snapshot_page", "execute_single", "execute_instructions", "run"]
+__all__ = ["ActionFailed", "snapshot_page", "SNAPSHOT_SECTIONS", "execute_single", "execute_on_page",
+           "execute_instructions", "execute_many", "format_timings", "run", "step_event",
+           "collect_results", "stream_on_page", "stream_instructions", "TabSet", "TAB_ACTIONS",
+           "execute_parallel"]
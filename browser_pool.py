@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, Page
+
+from request_filter import RequestFilter
+
+
+class BrowserPool:
+    """
+    A set of warm Chromium processes shared by many agent sessions.
+
+    Each session gets its own BrowserContext (separate cookies, storage and
+    cache), so sessions are isolated while skipping the browser cold start.
+    At most `size * contexts_per_browser` sessions are open at once; new
+    sessions go to the browser with the fewest open contexts. A
+    `request_filter`, if given, is attached to every context.
+
+        async with BrowserPool(size=2) as pool:
+            async with pool.page() as page:
+                await page.goto("https://example.com")
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        contexts_per_browser: int = 4,
+        headless: bool = True,
+        slow_mo: int = 0,
+        timeout_ms: int = 60000,
+        request_filter: Optional[RequestFilter] = None
+    ):
+        self.size = size
+        self.contexts_per_browser = contexts_per_browser
+        self.headless = headless
+        self.slow_mo = slow_mo
+        self.timeout_ms = timeout_ms
+        self.request_filter = request_filter
+        self._playwright = None
+        self._browsers: List[Optional[Browser]] = []
+        self._load: List[int] = []
+        self._slots = asyncio.Semaphore(size * contexts_per_browser)
+        self._lock = asyncio.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.size * self.contexts_per_browser
+
+    async def start(self) -> "BrowserPool":
+        """Launch every browser up front so the first sessions start warm."""
+        if self._playwright is None:
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self._browsers = list(await asyncio.gather(
+                *(self._launch() for _ in range(self.size))
+            ))
+            self._load = [0] * self.size
+        return self
+
+    async def close(self) -> None:
+        """Close all browsers and stop Playwright."""
+        for browser in self._browsers:
+            if browser is not None and browser.is_connected():
+                await browser.close()
+        self._browsers = []
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    async def _launch(self) -> Browser:
+        return await self._playwright.chromium.launch(
+            headless=self.headless, slow_mo=self.slow_mo
+        )
+
+    async def _checkout(self) -> int:
+        """Pick the least-loaded browser, relaunching it if it has crashed."""
+        async with self._lock:
+            index = min(range(self.size), key=lambda i: self._load[i])
+            browser = self._browsers[index]
+            if browser is None or not browser.is_connected():
+                self._browsers[index] = await self._launch()
+            self._load[index] += 1
+            return index
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[Any]:
+        """Yield a fresh, isolated BrowserContext; it is closed on exit."""
+        await self.start()
+        async with self._slots:
+            index = await self._checkout()
+            try:
+                ctx = await self._browsers[index].new_context(**context_options)
+                try:
+                    if self.request_filter is not None:
+                        await self.request_filter.attach(ctx)
+                    yield ctx
+                finally:
+                    await ctx.close()
+            finally:
+                self._load[index] -= 1
+
+    @asynccontextmanager
+    async def page(self, **context_options: Any) -> AsyncIterator[Page]:
+        """Yield a page in its own fresh BrowserContext."""
+        async with self.context(**context_options) as ctx:
+            page = await ctx.new_page()
+            page.set_default_timeout(self.timeout_ms)
+            page.set_default_navigation_timeout(self.timeout_ms)
+            yield page
+
+
+async def run_bounded(tasks: List[Any], concurrency: int) -> List[Any]:
+    """
+    Await the given coroutines with at most `concurrency` running at once,
+    returning their results in input order. A coroutine that raises yields
+    [{"error": "..."}] instead of cancelling its siblings.
+    """
+    limit = asyncio.Semaphore(max(1, concurrency))
+
+    async def guarded(coro) -> Any:
+        async with limit:
+            try:
+                return await coro
+            except Exception as e:
+                return [{"error": str(e)}]
+
+    return await asyncio.gather(*(guarded(t) for t in tasks))
+
+
+__all__ = ["BrowserPool", "run_bounded"]
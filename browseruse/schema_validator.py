@@ -1,23 +1,128 @@
+import copy
 import json
 import os
-from jsonschema import validate, ValidationError, SchemaError
+from functools import lru_cache
+
+# jsonschema is only imported for the full-schema check (errors, and
+# environments without fastjsonschema), which keeps this module cheap to import
+try:
+    import fastjsonschema
+except ImportError:  # optional: fall back to precompiled jsonschema validators
+    fastjsonschema = None
 
-# Load the JSON Schema from file
 _schema_path = os.path.join(os.path.dirname(__file__), "browseruse.schema.json")
-with open(_schema_path, "r", encoding="utf-8") as f:
-    _SCHEMA = json.load(f)
+
+# Argument keys each action can use. The per-action fast path only tries the
+# `args` branches of the schema built from these keys; anything it rejects
+# is re-checked against the full schema, so this table can only make
+# validation faster, never stricter.
+_ACTION_ARG_KEYS = {
+    "navigate":     {"url"},
+    "fill":         {"label", "selector", "text", "id"},
+    "click":        {"text", "selector", "id"},
+    "extract_text": {"selector", "id"},
+    "wait":         {"selector", "timeout_ms"},
+    "scroll":       {"dx", "dy"},
+    "screenshot":   {"path", "selector", "format", "quality", "full_page", "clip", "max_width"},
+    "extract_all":        {"selector", "limit", "offset", "next_selector", "max_pages"},
+    "extract_table":      {"selector", "limit", "offset", "next_selector", "max_pages"},
+    "extract_attributes": {"selector", "attributes", "limit", "offset", "next_selector", "max_pages"},
+    "new_tab":      {"url"},
+    "switch_tab":   {"tab"},
+    "close_tab":    {"tab"},
+    "fill_form":    {"form_selector", "fields", "submit"},
+}
+
+
+@lru_cache(maxsize=None)
+def _load_schema():
+    """Read the JSON Schema from disk on first use."""
+    with open(_schema_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def _full_validator():
+    """Check the schema once and build the validator for whole instruction lists."""
+    from jsonschema.validators import validator_for
+    schema = _load_schema()
+    cls = validator_for(schema)
+    cls.check_schema(schema)
+    return cls(schema)
+
+
+@lru_cache(maxsize=None)
+def _action_checker(action):
+    """
+    Compile a predicate for one instruction of the given action, checking
+    only the args branches that action can use. Returns None when there is
+    no fast path for the action.
+    """
+    keys = _ACTION_ARG_KEYS.get(action)
+    if keys is None:
+        return None
+    item = copy.deepcopy(_load_schema()["items"])
+    branches = [
+        b for b in item["properties"]["args"]["anyOf"]
+        if set(b.get("properties", {})) <= keys
+    ]
+    if not branches:
+        return None
+    item["properties"]["action"] = {"const": action}
+    item["properties"]["args"]["anyOf"] = branches
+
+    if fastjsonschema is not None:
+        try:
+            compiled = fastjsonschema.compile(item)
+        except fastjsonschema.JsonSchemaDefinitionException:
+            return None
+
+        def check(instr):
+            try:
+                compiled(instr)
+                return True
+            except fastjsonschema.JsonSchemaException:
+                return False
+        return check
+
+    from jsonschema.validators import validator_for
+    cls = validator_for(item)
+    return cls(item).is_valid
+
+
+def _fast_valid(instructions):
+    """True if every instruction passes its action's precompiled check."""
+    if not isinstance(instructions, list):
+        return False
+    for instr in instructions:
+        if not isinstance(instr, dict):
+            return False
+        action = instr.get("action")
+        check = _action_checker(action) if isinstance(action, str) else None
+        if check is None or not check(instr):
+            return False
+    return True
 
 
 def validate_instructions(instructions):
     """
     Validate a list of browser-use instructions against the JSON schema.
 
+    Valid instructions are accepted by a per-action precompiled check;
+    anything else is validated against the full schema to report the error.
+
     :param instructions: list of dicts, each with keys "action" and "args"
     :raises ValueError: if the instructions do not conform to the schema
     :raises RuntimeError: if the schema itself is invalid
     """
+    if _fast_valid(instructions):
+        return
+    from jsonschema import ValidationError, SchemaError
+    from jsonschema.exceptions import best_match
     try:
-        validate(instance=instructions, schema=_SCHEMA)
+        error = best_match(_full_validator().iter_errors(instructions))
+        if error is not None:
+            raise error
     except ValidationError as ve:
         # Construct a clear error message indicating where validation failed
         location = " -> ".join(str(p) for p in ve.path) or "root"
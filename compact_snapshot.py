@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+from browser_controller import ELEMENT_REGISTRY_JS
+from conversation_history import count_tokens
+from tracing import span
+
+# Registers every visible interactive element (see ELEMENT_REGISTRY_JS) and
+# returns one compact record per element, in document order.
+_COMPACT_JS = "(viewportOnly) => {" + ELEMENT_REGISTRY_JS + """
+  const candidates = document.querySelectorAll(
+    "a[href], button, input:not([type=hidden]), textarea, select, summary, " +
+    "[role=button], [role=link], [role=checkbox], [role=tab], [role=menuitem], " +
+    "[onclick], [contenteditable=true]"
+  );
+  const clean = s => (s || "").replace(/\\s+/g, " ").trim();
+  const kindOf = el => {
+    const tag = el.tagName.toLowerCase();
+    const type = (el.getAttribute("type") || "").toLowerCase();
+    if (tag === "a") return "link";
+    if (tag === "button" || (tag === "input" && ["submit", "button", "reset"].includes(type))) return "button";
+    if (tag === "input" || tag === "textarea" || tag === "select") return tag;
+    return el.getAttribute("role") || tag;
+  };
+  const textOf = (el, kind) => {
+    if (kind === "input" || kind === "textarea" || kind === "select") {
+      const label = el.labels && el.labels.length ? el.labels[0].textContent : "";
+      return clean(label || el.getAttribute("aria-label") || el.getAttribute("placeholder")
+        || el.getAttribute("name") || el.id);
+    }
+    return clean(el.textContent || el.getAttribute("aria-label") || el.getAttribute("title")
+      || el.getAttribute("value"));
+  };
+  const elements = [];
+  let offscreen = 0;
+  for (const el of candidates) {
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0) continue;
+    const style = getComputedStyle(el);
+    if (style.visibility === "hidden" || style.opacity === "0") continue;
+    const inView = rect.bottom > 0 && rect.right > 0
+      && rect.top < innerHeight && rect.left < innerWidth;
+    if (!inView) {
+      offscreen++;
+      if (viewportOnly) continue;
+    }
+    const kind = kindOf(el);
+    const record = {id: tagElement(el), kind: kind, text: textOf(el, kind)};
+    if (kind === "input") record.type = (el.getAttribute("type") || "text").toLowerCase();
+    elements.push(record);
+  }
+  return {url: location.href, title: document.title, elements: elements, offscreen: offscreen};
+}
+"""
+
+# Kinds the model fills in rather than clicks; forms are usually the point
+_FIELD_KINDS = ("input", "textarea", "select")
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+
+def _words(text: str) -> set:
+    return {w for w in re.findall(r"[a-z0-9]+", text.lower()) if len(w) > 2}
+
+
+def render_element(element: Dict[str, Any], max_text: int = 80) -> str:
+    """One line per element: `<id> <kind>[:<type>] "<text>"`."""
+    kind = element["kind"]
+    if element.get("type"):
+        kind += ":" + element["type"]
+    text = _truncate(element.get("text") or "", max_text)
+    if not text:
+        return f"{element['id']} {kind}"
+    return f"{element['id']} {kind} {json.dumps(text, ensure_ascii=False)}"
+
+
+def compact_elements(
+    elements: List[Dict[str, Any]],
+    goal: str = "",
+    max_tokens: int = 1500,
+    max_text: int = 80,
+    model: str = "gpt-4o-mini"
+) -> Dict[str, Any]:
+    """
+    Reduce raw element records to rendered lines under `max_tokens`:
+    links/buttons without text are dropped, repeated links/buttons with the
+    same (kind, text) are kept once (form fields never are: each needs its
+    own id, even when labels repeat), and when the budget is tight the
+    elements sharing the most words with `goal` (form fields first among
+    equals) win. The kept lines stay in document order; "omitted" counts
+    what did not fit.
+    """
+    seen = set()
+    candidates = []
+    for element in elements:
+        if element["kind"] in _FIELD_KINDS:
+            candidates.append(element)
+            continue
+        if not element.get("text"):
+            continue
+        key = (element["kind"], element.get("type"), (element.get("text") or "").lower())
+        if key in seen:
+            continue
+        seen.add(key)
+        candidates.append(element)
+
+    goal_words = _words(goal)
+
+    def score(element):
+        overlap = len(goal_words & _words(element.get("text") or ""))
+        return overlap + (0.5 if element["kind"] in _FIELD_KINDS else 0)
+
+    ranked = sorted(range(len(candidates)), key=lambda i: (-score(candidates[i]), i))
+    kept, used = [], 0
+    for i in ranked:
+        line = render_element(candidates[i], max_text)
+        cost = count_tokens(line, model) + 1
+        if used + cost > max_tokens:
+            continue
+        kept.append(i)
+        used += cost
+    kept.sort()
+    return {
+        "elements": [render_element(candidates[i], max_text) for i in kept],
+        "omitted": len(candidates) - len(kept)
+    }
+
+
+async def compact_snapshot(
+    page: Page,
+    goal: str = "",
+    max_tokens: int = 1500,
+    max_text: int = 80,
+    viewport_only: bool = True
+) -> Dict[str, Any]:
+    """
+    Token-budgeted page observation for the planner:
+
+        {"url": ..., "title": ..., "elements": ['e3 link "Pricing"',
+         'e7 input:email "Email"', 'e9 button "Send"'], "omitted": 4, "offscreen": 120}
+
+    Only visible elements are listed (in-viewport ones only, by default;
+    "offscreen" counts the rest so the model knows to scroll). The ids are
+    kept in the in-page registry, so click/fill/extract_text can target
+    them with {"id": "e9"}.
+    """
+    with span("snapshot", mode="compact") as sp:
+        raw = await page.evaluate(_COMPACT_JS, viewport_only)
+        compact = compact_elements(raw["elements"], goal, max_tokens, max_text)
+        sp.update(elements=len(compact["elements"]), omitted=compact["omitted"])
+    return {
+        "url": raw["url"],
+        "title": _truncate(raw["title"] or "", max_text),
+        **compact,
+        "offscreen": raw["offscreen"]
+    }
+
+
+__all__ = ["compact_snapshot", "compact_elements", "render_element"]
@@ -0,0 +1,181 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from incremental_snapshot import diff_summaries
+
+# Rough per-message framing cost of the chat format (role, separators)
+_MESSAGE_OVERHEAD = 4
+
+_encoders: Dict[str, Any] = {}
+
+
+def count_tokens(text: Optional[str], model: str = "gpt-4o-mini") -> int:
+    """
+    Count tokens with tiktoken when it is installed, otherwise estimate
+    ~4 characters per token.
+    """
+    if not text:
+        return 0
+    if model not in _encoders:
+        try:
+            import tiktoken
+            try:
+                _encoders[model] = tiktoken.encoding_for_model(model)
+            except KeyError:
+                _encoders[model] = tiktoken.get_encoding("cl100k_base")
+        except ImportError:
+            _encoders[model] = None
+    enc = _encoders[model]
+    if enc is None:
+        return max(1, len(text) // 4)
+    return len(enc.encode(text))
+
+
+def _outline(summary: Dict[str, Any]) -> Dict[str, Any]:
+    """One-line stand-in for an old full page summary."""
+    if "elements" in summary:  # compact_snapshot observation
+        return {"earlier_page": {
+            "url":      summary.get("url"),
+            "elements": len(summary["elements"])
+        }}
+    return {"earlier_page": {
+        "forms":   [f.get("form_selector") for f in summary.get("forms", [])],
+        "links":   len(summary.get("links", [])),
+        "buttons": len(summary.get("buttons", []))
+    }}
+
+
+class ConversationHistory:
+    """
+    Builds the message list for each autonomous turn under a token budget.
+
+      - the goal is stored once and always sent as the final user message
+      - only the last `keep_full` observations, and the newest full page
+        summary (later turns may be {"changes": ...} diffs against it), are
+        sent verbatim; older full summaries become a diff against their
+        predecessor or a short outline
+      - if still over `max_tokens`, the oldest turns are dropped
+
+    `turn_tokens` records, per rendered turn, the prompt size actually sent
+    next to the size the untrimmed history would have had.
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: int = 8000,
+        keep_full: int = 3,
+        model: str = "gpt-4o-mini"
+    ):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.keep_full = max(1, keep_full)
+        self.goal: Optional[str] = None
+        self.turn_tokens: List[Dict[str, int]] = []
+        self._system = self._entry({"role": "system", "content": system_prompt})
+        self._turns: List[Dict[str, Any]] = []
+        self._raw_tokens = self._system["tokens"]
+
+    def _entry(self, message: Dict[str, Any], summary=None) -> Dict[str, Any]:
+        text = message.get("content")
+        if message.get("function_call"):
+            call = message["function_call"]
+            text = f"{call['name']}({call['arguments']})"
+        return {
+            "message": message,
+            "summary": summary,
+            "tokens": count_tokens(text, self.model) + _MESSAGE_OVERHEAD
+        }
+
+    def set_goal(self, goal: str) -> None:
+        """Record the user goal; repeating the same goal is a no-op."""
+        if goal == self.goal:
+            # The untrimmed loop re-sent the goal every turn
+            self._raw_tokens += count_tokens(goal, self.model) + _MESSAGE_OVERHEAD
+            return
+        self.goal = goal
+        self._goal = self._entry({"role": "user", "content": goal})
+        self._raw_tokens += self._goal["tokens"]
+
+    def add_observation(self, summary: Dict[str, Any]) -> None:
+        """Start a new turn with the page summary (full or {"changes": ...})."""
+        entry = self._entry(
+            {"role": "assistant", "content": json.dumps(summary)}, summary
+        )
+        self._turns.append({"observation": entry, "call": None})
+        self._raw_tokens += entry["tokens"]
+
+    def add_function_call(self, name: str, arguments: str) -> None:
+        """Record the function the model chose for the current turn."""
+        entry = self._entry({
+            "role": "assistant",
+            "content": None,
+            "function_call": {"name": name, "arguments": arguments}
+        })
+        self._turns[-1]["call"] = entry
+        self._raw_tokens += entry["tokens"]
+
+    def _latest_full(self) -> Optional[int]:
+        """Index of the newest turn observed with a full page summary."""
+        for i in range(len(self._turns) - 1, -1, -1):
+            summary = self._turns[i]["observation"]["summary"]
+            if summary is not None and "changes" not in summary:
+                return i
+        return None
+
+    def _compact(self, index: int, latest_full: Optional[int] = None) -> Dict[str, Any]:
+        """Observation entry for turn `index`, shrunk if it is no longer recent."""
+        turn = self._turns[index]
+        entry = turn["observation"]
+        summary = entry["summary"]
+        recent = index >= len(self._turns) - self.keep_full or index == latest_full
+        if recent or summary is None or "changes" in summary:
+            return entry
+        if "compact" in turn:
+            return turn["compact"]
+        compact = _outline(summary)
+        if index > 0 and "elements" not in summary:
+            prev = self._turns[index - 1]["observation"]["summary"]
+            if prev is not None and "changes" not in prev:
+                diff = {"changes": diff_summaries(prev, summary)}
+                if len(json.dumps(diff)) < len(json.dumps(compact)):
+                    compact = diff
+        turn["compact"] = self._entry(
+            {"role": "assistant", "content": json.dumps(compact)}
+        )
+        return turn["compact"]
+
+    def messages(self) -> List[Dict[str, Any]]:
+        """Render the trimmed message list for the next model call."""
+        turns = []
+        latest_full = self._latest_full()
+        for i, turn in enumerate(self._turns):
+            entries = [self._compact(i, latest_full)]
+            if turn["call"] is not None:
+                entries.append(turn["call"])
+            turns.append(entries)
+
+        fixed = self._system["tokens"]
+        if self.goal is not None:
+            fixed += self._goal["tokens"]
+        sizes = [sum(e["tokens"] for e in entries) for entries in turns]
+        # Drop the oldest turns until we fit, but always keep the latest one
+        start = 0
+        while start < len(turns) - 1 and fixed + sum(sizes[start:]) > self.max_tokens:
+            start += 1
+
+        rendered = [self._system["message"]]
+        for entries in turns[start:]:
+            rendered.extend(e["message"] for e in entries)
+        if self.goal is not None:
+            rendered.append(self._goal["message"])
+
+        self.turn_tokens.append({
+            "turn": len(self._turns),
+            "prompt_tokens": fixed + sum(sizes[start:]),
+            "untrimmed_tokens": self._raw_tokens
+        })
+        return rendered
+
+
+__all__ = ["ConversationHistory", "count_tokens"]
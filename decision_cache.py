@@ -0,0 +1,188 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+from planner import Planner
+from storage import cache_dir, load_json, save_json
+
+
+def _normalize(value: Any) -> Any:
+    """Collapse whitespace in every string so cosmetic DOM changes still hit."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def decision_key(model: str, messages: List[Dict[str, Any]]) -> str:
+    """
+    Content address for a planner request: model, system prompt, goal, the
+    latest (normalized) page observation and the calls made so far. The
+    calls are part of the key because typing into a field does not change
+    the summary, so the same page can legitimately need a different step.
+    """
+    system = messages[0]["content"] if messages and messages[0]["role"] == "system" else ""
+    goal = ""
+    observation = None
+    calls = []
+    for m in messages:
+        if m["role"] == "user":
+            goal = m["content"]
+        elif m.get("function_call"):
+            calls.append([m["function_call"]["name"], m["function_call"]["arguments"]])
+        elif m["role"] == "assistant" and m.get("content"):
+            observation = m["content"]
+    try:
+        observation = _normalize(json.loads(observation)) if observation else None
+    except ValueError:
+        observation = _normalize(observation)
+    payload = json.dumps([model, system, goal, observation, calls], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DecisionCache:
+    """
+    On-disk, content-addressed store of planner decisions: one JSON file per
+    key under `path`. Entries older than `ttl` seconds are ignored and
+    removed; past `max_entries`, the least recently used files are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 5000
+    ):
+        self.path = path or cache_dir("decisions")
+        os.makedirs(self.path, exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._file(key)
+        entry = load_json(path)
+        # Another run may expire or evict the same entry at any moment;
+        # losing that race is just a miss
+        if entry is None or time.time() - entry.get("created", 0) > self.ttl:
+            if entry is not None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.misses += 1
+            return None
+        try:
+            # Mark as recently used for eviction
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["decision"]
+
+    def put(self, key: str, decision: Dict[str, Any]) -> None:
+        save_json(self._file(key), {"created": time.time(), "decision": decision})
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = [e for e in os.scandir(self.path) if e.name.endswith(".json")]
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+class CachingPlanner(Planner):
+    """Serve repeated requests from a DecisionCache, else ask `inner`."""
+
+    def __init__(self, inner: Planner, cache: DecisionCache):
+        self.inner = inner
+        self.cache = cache
+        self.model = inner.model
+
+    async def decide(self, messages, functions):
+        key = decision_key(self.model, messages)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True}
+        decision = await self.inner.decide(messages, functions)
+        self.cache.put(key, {"name": decision["name"], "arguments": decision["arguments"]})
+        return decision
+
+
+class RecordingPlanner(Planner):
+    """Ask `inner` and append every decision, with its request key, to a JSONL file."""
+
+    def __init__(self, inner: Planner, path: str):
+        self.inner = inner
+        self.path = path
+        self.model = inner.model
+        open(self.path, "w", encoding="utf-8").close()
+
+    async def decide(self, messages, functions):
+        decision = await self.inner.decide(messages, functions)
+        record = {
+            "model": self.model,
+            "key": decision_key(self.model, messages),
+            "decision": {"name": decision["name"], "arguments": decision["arguments"]}
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        return decision
+
+
+class ReplayDivergence(RuntimeError):
+    """The live session no longer matches the recording being replayed."""
+
+
+class ReplayPlanner(Planner):
+    """
+    Replay a session recorded by RecordingPlanner without any model calls.
+
+    In `strict` mode each request must match the recorded one (same page
+    observation, goal and call history), and running past the end of the
+    recording is an error; otherwise recorded decisions are returned in
+    order regardless, ending with "done".
+    """
+
+    def __init__(self, path: str, strict: bool = True):
+        with open(path, "r", encoding="utf-8") as f:
+            self._records = [json.loads(line) for line in f if line.strip()]
+        self.strict = strict
+        self.model = self._records[0]["model"] if self._records else "replay"
+        self._index = 0
+
+    async def decide(self, messages, functions):
+        if self._index >= len(self._records):
+            if self.strict:
+                raise ReplayDivergence("Recording exhausted before the session finished")
+            return {"name": "done", "arguments": "{}"}
+        record = self._records[self._index]
+        if self.strict and record["key"] != decision_key(record["model"], messages):
+            raise ReplayDivergence(
+                f"Step {self._index + 1} does not match the recording "
+                f"(expected {record['decision']['name']})"
+            )
+        self._index += 1
+        return dict(record["decision"])
+
+
+__all__ = [
+    "DecisionCache", "CachingPlanner", "RecordingPlanner", "ReplayPlanner",
+    "ReplayDivergence", "decision_key"
+]
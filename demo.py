@@ -2,13 +2,28 @@
 import sys
 import click
 import asyncio
-from ai_agent import run_autonomous
+from ai_agent import run_autonomous_stream, describe_event
+from request_filter import RequestFilter, PROFILES
+from screenshots import strip_image
 
 @click.command(context_settings={"ignore_unknown_options": True})
 @click.argument("user_goal", nargs=-1)
 @click.option("--headless/--show", default=False, help="Run in headless mode")
 @click.option("--slow-mo",     default=300,   help="Delay between actions (ms)")
-def main(user_goal, headless, slow_mo):
+@click.option("--batch/--single-step", default=False,
+              help="Let the model plan several actions per turn")
+@click.option("--block", "block_profile", type=click.Choice(sorted(PROFILES)), default="none",
+              help="Resource blocking profile (lean: images, media, fonts, trackers)")
+@click.option("--block-type", multiple=True, metavar="TYPE",
+              help="Also block this resource type; repeatable")
+@click.option("--block-domain", multiple=True, metavar="DOMAIN",
+              help="Also block this domain and its subdomains; repeatable")
+@click.option("--cache-assets", is_flag=True,
+              help="Serve scripts and stylesheets from a local cache")
+@click.option("--nav-timeout", default=None, type=float, metavar="SECONDS",
+              help="Navigation timeout")
+def main(user_goal, headless, slow_mo, batch, block_profile, block_type, block_domain,
+         cache_assets, nav_timeout):
     """
     Autonomous demo: Describe your goal in plain English, and watch the agent
     navigate, click, fill, wait, screenshot, etc., until completion.
@@ -16,6 +31,8 @@ def main(user_goal, headless, slow_mo):
     Examples:
       python demo.py "Go to mujjumujahid.com and fill in the contact form and submit it"
       python demo.py --show --slow-mo 500 "Log into Gmail and list unread subjects"
+      python demo.py --batch "Go to mujjumujahid.com and fill in the contact form"
+      python demo.py --block lean --nav-timeout 20 "Find the pricing page on example.com"
     """
     # Reconstruct the goal string (or fallback to a sensible default)
     if user_goal:
@@ -24,15 +41,34 @@ def main(user_goal, headless, slow_mo):
         goal = "Go to mujjumujahid.com and fill in the contact form fill it two times first time the information should be of a hollywood actress and second time the information should be of a british actress and then end the operation"
 
     print(f"\n🔍 USER GOAL: {goal}\n")
-    print(f"▶️ Starting autonomous execution (headless={headless}, slowMo={slow_mo}ms)…\n")
+    print(f"▶️ Starting autonomous execution (headless={headless}, slowMo={slow_mo}ms, batch={batch})…\n")
+
+    request_filter = RequestFilter.from_options(
+        block_profile, block_type, block_domain, cache_assets
+    )
+
+    async def stream():
+        # Print each decision and step as it happens
+        results = []
+        async for event in run_autonomous_stream(
+            goal, headless=headless, slow_mo=slow_mo, batch=batch,
+            request_filter=request_filter,
+            nav_timeout_ms=int(nav_timeout * 1000) if nav_timeout else None
+        ):
+            print(describe_event(event), flush=True)
+            if event["type"] == "step" and event["result"] is not None:
+                # Keep only what is printed below, not screenshot bytes
+                results.append(strip_image(event["result"]))
+        return results
 
     try:
-        # This will print each function call as it happens
-        results = asyncio.run(run_autonomous(goal, headless=headless, slow_mo=slow_mo))
+        results = asyncio.run(stream())
     except Exception as e:
         print(f"\n[Error] {e}", file=sys.stderr)
         sys.exit(1)
 
+    if request_filter.active:
+        print(request_filter.summary())
     print("\n✅ ALL DONE! Collected results:")
     for r in results:
         print("  •", r)
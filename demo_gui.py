@@ -4,9 +4,9 @@ import threading
 import asyncio
 import tkinter as tk
 from tkinter import scrolledtext, ttk
-from PIL import Image, ImageTk
 
-from ai_agent import run_autonomous
+from ai_agent import run_autonomous_stream, describe_event
+from screenshots import thumbnail
 
 class BrowserUseGUI(tk.Tk):
     def __init__(self):
@@ -53,36 +53,35 @@ class BrowserUseGUI(tk.Tk):
         show = not self.headless_var.get()
         self._log(f"🔍 Starting task (headless={not show}): {task}\n\n")
         try:
-            results = asyncio.run(run_autonomous(task, headless=not show, slow_mo=300))
+            asyncio.run(self._stream_task(task, headless=not show))
         except Exception as e:
             self._log(f"[Error] {e}\n")
             return
 
-        for res in results:
-            if "screenshot" in res:
-                path = res["screenshot"]
-                self._log(f"📸 Screenshot saved: {path}\n")
-                self._show_image(path)
-            if "extracted_text" in res:
-                txt = res["extracted_text"]
-                self._log(f"✂️ Extracted text: {txt}\n")
-
         self._log("\n✅ Task complete!\n")
 
+    async def _stream_task(self, task: str, headless: bool):
+        # Show every decision, step and screenshot as soon as it happens
+        async for event in run_autonomous_stream(task, headless=headless, slow_mo=300):
+            self._log(describe_event(event) + "\n")
+            result = event.get("result") or {}
+            if "image" in result:
+                # Decode and fit to the preview on a worker thread, off the event loop
+                size = (self.preview.winfo_width(), self.preview.winfo_height())
+                try:
+                    self._show_image(await thumbnail(result["image"], size))
+                except Exception as e:
+                    self._log(f"[Error displaying image] {e}\n")
+
     def _log(self, msg: str):
         self.log_widget.insert(tk.END, msg)
         self.log_widget.see(tk.END)
 
-    def _show_image(self, path: str):
-        try:
-            img = Image.open(path)
-            # fit thumbnail into preview area
-            img.thumbnail((self.preview.winfo_width(), self.preview.winfo_height()))
-            photo = ImageTk.PhotoImage(img)
-            self.preview.image = photo
-            self.preview.config(image=photo)
-        except Exception as e:
-            self._log(f"[Error displaying image] {e}\n")
+    def _show_image(self, img):
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(img)
+        self.preview.image = photo
+        self.preview.config(image=photo)
 
 if __name__ == "__main__":
     app = BrowserUseGUI()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+from browser_controller import snapshot_page, SNAPSHOT_SECTIONS
+
+# Installs a MutationObserver on first call for the current document and
+# returns null; afterwards returns (and resets) the set of summary sections
+# whose elements changed since the previous call. A new document (i.e. a
+# navigation) has no observer, so the caller gets null again and knows to
+# take a full snapshot.
+_TAKE_DIRTY_JS = """
+() => {
+  if (!window.__buObserver) {
+    const selectors = {forms: "form", links: "a", buttons: "button"};
+    window.__buDirty = {};
+    const mark = (el, deep) => {
+      if (!el || el.nodeType !== 1) return;
+      for (const [key, sel] of Object.entries(selectors)) {
+        if (window.__buDirty[key]) continue;
+        if (el.closest(sel) || (deep && el.querySelector(sel))) {
+          window.__buDirty[key] = true;
+        }
+      }
+    };
+    window.__buObserver = new MutationObserver(mutations => {
+      for (const m of mutations) {
+        const target = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+        mark(target, false);
+        for (const node of m.addedNodes) mark(node, true);
+        for (const node of m.removedNodes) mark(node, true);
+      }
+    });
+    window.__buObserver.observe(document, {
+      subtree: true,
+      childList: true,
+      characterData: true,
+      attributes: true,
+      attributeFilter: ["id", "class", "name", "type"]
+    });
+    return null;
+  }
+  const dirty = window.__buDirty;
+  window.__buDirty = {};
+  return dirty;
+}
+"""
+
+
+def _diff_texts(old: list, new: list) -> Dict[str, list]:
+    """Multiset difference between two lists of link/button texts."""
+    before, after = Counter(old), Counter(new)
+    return {
+        "added":   list((after - before).elements()),
+        "removed": list((before - after).elements())
+    }
+
+
+def diff_summaries(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return only the parts of `new` that differ from `old`:
+      - forms: the full new form list, if any form changed
+      - links/buttons: {"added": [...], "removed": [...]} texts
+    Sections missing from `new` are treated as unchanged.
+    """
+    changes: Dict[str, Any] = {}
+    if "forms" in new and new["forms"] != old.get("forms"):
+        changes["forms"] = new["forms"]
+    for key in ("links", "buttons"):
+        if key in new and new[key] != old.get(key):
+            delta = _diff_texts(old.get(key, []), new[key])
+            if delta["added"] or delta["removed"]:
+                changes[key] = delta
+    return changes
+
+
+class IncrementalSnapshotter:
+    """
+    Tracks one page's summary across turns. The first observation (and the
+    first after every navigation) is a full snapshot_page summary; later ones
+    re-collect only the sections the MutationObserver saw change and report
+    the difference.
+    """
+
+    def __init__(self, page: Page, ids: bool = False):
+        self.page = page
+        self.ids = ids
+        self.summary: Optional[Dict[str, Any]] = None
+
+    async def observe(self) -> Dict[str, Any]:
+        """
+        Return {"mode": "full", "summary": {...}} or
+        {"mode": "diff", "changes": {...}}; `changes` is empty when nothing
+        on the page moved since the last call.
+        """
+        try:
+            dirty = await self.page.evaluate(_TAKE_DIRTY_JS)
+        except Exception:
+            # Execution context was torn down mid-navigation; settle and rescan
+            await self.page.wait_for_load_state("domcontentloaded")
+            dirty = await self.page.evaluate(_TAKE_DIRTY_JS)
+
+        if dirty is None or self.summary is None:
+            if dirty is not None:
+                # Observer survived but we have no baseline yet
+                await self.page.evaluate("() => { window.__buDirty = {}; }")
+            self.summary = await snapshot_page(self.page, ids=self.ids)
+            # A copy: the baseline is updated in place by later diffs, and
+            # callers (e.g. ConversationHistory) keep what they were given
+            return {"mode": "full", "summary": dict(self.summary)}
+
+        sections = [key for key in SNAPSHOT_SECTIONS if dirty.get(key)]
+        if not sections:
+            return {"mode": "diff", "changes": {}}
+
+        fresh = await snapshot_page(self.page, sections, ids=self.ids)
+        changes = diff_summaries(self.summary, fresh)
+        self.summary.update(fresh)
+        return {"mode": "diff", "changes": changes}
+
+
+__all__ = ["IncrementalSnapshotter", "diff_summaries"]
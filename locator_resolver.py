@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from playwright.async_api import Locator, Page
+
+from storage import cache_dir, load_json, save_json
+
+
+async def first_visible(candidates: List[Locator], timeout_ms: int = 5000):
+    """
+    Wait for all candidate locators concurrently and return the first that
+    becomes visible (the others are cancelled), or None if none does.
+    """
+    async def probe(locator):
+        await locator.wait_for(state="visible", timeout=timeout_ms)
+        return locator
+
+    tasks = [asyncio.ensure_future(probe(loc)) for loc in candidates]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                return await next_done
+            except Exception:
+                continue
+        return None
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def strategies(page: Page, kind: str, args: Dict[str, Any]) -> List[Tuple[str, Locator]]:
+    """
+    Candidate (name, locator) pairs for a click or fill target, in the same
+    order execute_single has always tried them.
+    """
+    text = args.get("text")
+    label = args.get("label")
+    selector = args.get("selector")
+    found: List[Tuple[str, Locator]] = []
+    if kind == "click":
+        if text:
+            found += [
+                ("text",   page.get_by_text(text, exact=True).first),
+                ("button", page.get_by_role("button", name=text).first),
+                ("link",   page.get_by_role("link", name=text).first)
+            ]
+        if selector:
+            found.append(("selector", page.locator(selector).first))
+    elif kind == "fill":
+        if label:
+            found.append(("label", page.get_by_label(label).first))
+        if selector:
+            found.append(("selector", page.locator(selector).first))
+        if label:
+            found.append(("name", page.locator(f"[name='{label}']").first))
+    return found
+
+
+class LocatorResolver:
+    """
+    Finds the element for a click/fill by racing every locator strategy and
+    taking the first visible match.
+
+    The winning strategy is remembered per (host, action, target, selector)
+    in an LRU cache persisted as JSON, so later runs on the same site check
+    that strategy first and usually resolve without waiting. The target is
+    the text for a click and the label for a fill; a fill's text is the
+    value typed, which may be a password, and never goes into the cache.
+    """
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        max_entries: int = 2000,
+        persist: bool = True
+    ):
+        self.cache_path = cache_path or os.path.join(cache_dir(), "locators.json")
+        self.max_entries = max_entries
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[str, str]" = OrderedDict(
+            load_json(self.cache_path, {}) if persist else {}
+        )
+
+    @staticmethod
+    def key(page: Page, kind: str, args: Dict[str, Any]) -> str:
+        host = urlparse(page.url).netloc
+        if kind == "click":
+            target = args.get("text") or ""
+        else:
+            target = args.get("label") or ""
+        return f"{host}|{kind}|{target}|{args.get('selector') or ''}"
+
+    def _remember(self, key: str, strategy: str) -> None:
+        changed = self._cache.get(key) != strategy
+        self._cache[key] = strategy
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            changed = True
+        if changed and self.persist:
+            save_json(self.cache_path, self._cache)
+
+    async def resolve(
+        self,
+        page: Page,
+        kind: str,
+        args: Dict[str, Any],
+        timeout_ms: int = 5000
+    ) -> Optional[Tuple[str, Locator]]:
+        """Return (strategy name, locator) for the target, or None."""
+        candidates = strategies(page, kind, args)
+        if not candidates:
+            return None
+        key = self.key(page, kind, args)
+
+        cached = self._cache.get(key)
+        for name, locator in candidates:
+            if name == cached:
+                try:
+                    if await locator.is_visible():
+                        self.hits += 1
+                        self._cache.move_to_end(key)
+                        return name, locator
+                except Exception:
+                    pass
+                break
+
+        self.misses += 1
+        by_locator = {id(loc): name for name, loc in candidates}
+        winner = await first_visible([loc for _, loc in candidates], timeout_ms)
+        if winner is None:
+            return None
+        name = by_locator[id(winner)]
+        self._remember(key, name)
+        return name, winner
+
+
+_default_resolver: Optional[LocatorResolver] = None
+
+def default_resolver() -> LocatorResolver:
+    """Process-wide resolver backed by the on-disk cache."""
+    global _default_resolver
+    if _default_resolver is None:
+        _default_resolver = LocatorResolver()
+    return _default_resolver
+
+
+__all__ = ["LocatorResolver", "default_resolver", "first_visible", "strategies"]
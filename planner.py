@@ -0,0 +1,183 @@
+import asyncio
+import json
+import random
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+
+@lru_cache(maxsize=None)
+def _retryable() -> tuple:
+    """Errors worth another attempt: timeouts, dropped connections, 429s and 5xx."""
+    # openai is imported on first use; it dominates the agent's import time
+    import openai
+    return (
+        asyncio.TimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError
+    )
+
+
+class Planner(ABC):
+    """
+    Decides the next function call for the autonomous loop.
+
+    Subclasses must implement `decide`, which receives the chat messages and the
+    FUNCTIONS list and returns {"name": str, "arguments": str (JSON)}. It may
+    also include "tokens": {"prompt": int, "completion": int} and
+    "retries": int.
+    """
+
+    model = "planner"
+
+    @abstractmethod
+    async def decide(
+        self,
+        messages: List[Dict[str, Any]],
+        functions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Return the next function call for `messages`."""
+
+
+class OpenAIPlanner(Planner):
+    """
+    Planner backed by the async OpenAI client, so the event loop keeps
+    running other sessions while a request is in flight.
+
+    Each attempt is bounded by `timeout` seconds; timeouts, connection
+    errors, rate limits and server errors are retried up to `max_retries`
+    times with exponential backoff (`backoff * 2**attempt`, plus jitter).
+    Cancelling the awaiting task cancels the request immediately.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = "gpt-4o-mini",
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_tokens: int = 200,
+        client: Optional[Any] = None
+    ):
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_tokens = max_tokens
+        self.retries = 0
+        self._api_key = api_key
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        """The AsyncOpenAI client, created on the first request."""
+        if self._client is None:
+            from openai import AsyncOpenAI
+            # Retries are handled here, so the SDK's own retry loop is disabled
+            self._client = AsyncOpenAI(api_key=self._api_key, max_retries=0)
+        return self._client
+
+    async def decide(self, messages, functions):
+        retries = 0
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        functions=functions,
+                        function_call="auto",
+                        temperature=0.0,
+                        max_tokens=self.max_tokens
+                    ),
+                    timeout=self.timeout
+                )
+                break
+            except _retryable():
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                retries += 1
+                delay = self.backoff * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+        msg = resp.choices[0].message
+        if not msg.function_call:
+            raise RuntimeError("Agent did not call a function")
+        decision = {
+            "name": msg.function_call.name,
+            "arguments": msg.function_call.arguments,
+            "retries": retries
+        }
+        usage = getattr(resp, "usage", None)
+        if usage is not None:
+            decision["tokens"] = {
+                "prompt": usage.prompt_tokens,
+                "completion": usage.completion_tokens
+            }
+        return decision
+
+
+class ScriptedPlanner(Planner):
+    """
+    Offline planner that replays a fixed list of decisions, for tests and
+    benchmarks. Each decision is {"name": ..., "arguments": {...} or "..."}
+    or a (name, arguments) tuple. Once the script runs out it answers
+    "done". `delay` simulates model latency in seconds.
+    """
+
+    model = "scripted"
+
+    def __init__(
+        self,
+        decisions: Iterable[Union[Dict[str, Any], tuple]],
+        delay: float = 0.0
+    ):
+        self._decisions = list(decisions)
+        self.delay = delay
+        self.calls: List[List[Dict[str, Any]]] = []
+
+    async def decide(self, messages, functions):
+        self.calls.append(list(messages))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if not self._decisions:
+            return {"name": "done", "arguments": "{}"}
+        step = self._decisions.pop(0)
+        if isinstance(step, tuple):
+            step = {"name": step[0], "arguments": step[1]}
+        arguments = step.get("arguments", {})
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments)
+        return {"name": step["name"], "arguments": arguments}
+
+
+class BoundedPlanner(Planner):
+    """
+    Let at most `limit` decisions of `inner` be in flight at once, however
+    many sessions share it, so a large batch stays under the provider's
+    rate limits. `waiting` counts sessions queued for a slot.
+    """
+
+    def __init__(self, inner: Planner, limit: int = 4):
+        self.inner = inner
+        self.model = inner.model
+        self.limit = max(1, limit)
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(self.limit)
+
+    async def decide(self, messages, functions):
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            return await self.inner.decide(messages, functions)
+        finally:
+            self._slots.release()
+
+
+__all__ = ["Planner", "OpenAIPlanner", "ScriptedPlanner", "BoundedPlanner"]
@@ -0,0 +1,217 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from storage import cache_dir, load_json, save_json
+
+# Ad, analytics and tag-manager hosts the agent never needs
+TRACKER_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "adservice.google.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "hotjar.com",
+    "segment.io",
+    "segment.com",
+    "mixpanel.com",
+    "amplitude.com",
+    "scorecardresearch.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "adnxs.com",
+)
+
+# Named blocking profiles for the CLIs; "lean" keeps stylesheets so that
+# visibility checks still behave, "text" drops them too.
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "none": {},
+    "lean": {
+        "block_types": ("image", "media", "font"),
+        "block_domains": TRACKER_DOMAINS
+    },
+    "text": {
+        "block_types": ("image", "media", "font", "stylesheet"),
+        "block_domains": TRACKER_DOMAINS
+    },
+}
+
+
+def _freshness(cache_control: str, default: float) -> Optional[float]:
+    """
+    Seconds a response may be reused for: its max-age, else `default`.
+    None if it must not be reused without revalidation (no-store, no-cache,
+    max-age=0).
+    """
+    directives = cache_control.lower()
+    if "no-store" in directives or "no-cache" in directives:
+        return None
+    match = re.search(r"(?:^|[,\s])max-age=(\d+)", directives)
+    ttl = float(match.group(1)) if match else default
+    return ttl if ttl > 0 else None
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    """True if `host` is one of `domains` or a subdomain of one."""
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+class RequestFilter:
+    """
+    Routing layer for a page or BrowserContext. Requests whose resource
+    type is in `block_types` or whose host is (a subdomain of) one of
+    `block_domains` are aborted. GET responses for `cache_types` (e.g.
+    scripts and stylesheets) are kept under `cache_path`, keyed by the full
+    URL, and served from disk on later runs until they expire: after their
+    Cache-Control max-age, else after `asset_ttl` seconds. no-store and
+    no-cache responses are never kept. Counters for the run are kept in
+    `stats`.
+
+        request_filter = RequestFilter.from_options("lean", cache_assets=True)
+        await request_filter.attach(context)
+        ...
+        print(request_filter.summary())
+    """
+
+    def __init__(
+        self,
+        block_types: Iterable[str] = (),
+        block_domains: Iterable[str] = (),
+        cache_types: Iterable[str] = (),
+        cache_path: Optional[str] = None,
+        max_asset_bytes: int = 5 * 2**20,
+        asset_ttl: float = 24 * 3600
+    ):
+        self.block_types = frozenset(block_types)
+        self.block_domains = tuple(d.lower().lstrip(".") for d in block_domains)
+        self.cache_types = frozenset(cache_types)
+        self.cache_path = cache_path or (cache_dir("assets") if self.cache_types else None)
+        self.max_asset_bytes = max_asset_bytes
+        self.asset_ttl = asset_ttl
+        self.stats = {
+            "requests": 0,
+            "blocked": 0,
+            "cache_hits": 0,
+            "cache_stores": 0,
+            "bytes_from_cache": 0
+        }
+
+    @classmethod
+    def from_options(
+        cls,
+        profile: str = "none",
+        block_types: Iterable[str] = (),
+        block_domains: Iterable[str] = (),
+        cache_assets: bool = False
+    ) -> "RequestFilter":
+        """
+        Build a filter from CLI-style options: a profile plus extra types
+        and domains to block; `cache_assets` caches scripts and stylesheets.
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown blocking profile: {profile}")
+        base = PROFILES[profile]
+        return cls(
+            block_types=tuple(base.get("block_types", ())) + tuple(block_types),
+            block_domains=tuple(base.get("block_domains", ())) + tuple(block_domains),
+            cache_types=("script", "stylesheet") if cache_assets else ()
+        )
+
+    @property
+    def active(self) -> bool:
+        return bool(self.block_types or self.block_domains or self.cache_types)
+
+    async def attach(self, target: Any) -> None:
+        """Route every request of `target` (a Page or BrowserContext) through this filter."""
+        if self.active:
+            await target.route("**/*", self._handle)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.block_types:
+            return True
+        host = (urlparse(url).hostname or "").lower()
+        return bool(self.block_domains) and _host_matches(host, self.block_domains)
+
+    def _asset_file(self, url: str) -> str:
+        return os.path.join(self.cache_path, hashlib.sha256(url.encode("utf-8")).hexdigest())
+
+    async def _handle(self, route: Any, request: Any) -> None:
+        self.stats["requests"] += 1
+        if self.should_block(request.resource_type, request.url):
+            self.stats["blocked"] += 1
+            await route.abort("blockedbyclient")
+            return
+        if request.resource_type not in self.cache_types or request.method != "GET":
+            await route.continue_()
+            return
+
+        path = self._asset_file(request.url)
+        meta = load_json(path + ".json")
+        if meta is not None and meta.get("expires", 0) <= time.time():
+            meta = None  # stale: fetch it again and overwrite
+        if meta is not None:
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+            except OSError:
+                meta = None
+        if meta is not None:
+            self.stats["cache_hits"] += 1
+            self.stats["bytes_from_cache"] += len(body)
+            await route.fulfill(status=200, headers=meta["headers"], body=body)
+            return
+
+        try:
+            response = await route.fetch()
+            body = await response.body()
+        except Exception:
+            # Never leave the request hanging: let the browser load it itself
+            await self._fall_back(route)
+            return
+        ttl = _freshness(response.headers.get("cache-control", ""), self.asset_ttl)
+        if response.status == 200 and len(body) <= self.max_asset_bytes and ttl is not None:
+            self._store(path, response.headers, body, time.time() + ttl)
+        await route.fulfill(response=response, body=body)
+
+    @staticmethod
+    async def _fall_back(route: Any) -> None:
+        try:
+            await route.continue_()
+        except Exception:
+            # The page or context is closing; all that is left is to abort
+            try:
+                await route.abort()
+            except Exception:
+                pass
+
+    def _store(self, path: str, headers: Dict[str, str], body: bytes, expires: float) -> None:
+        # Body first, then metadata, so a reader never finds meta without a body
+        fd, tmp = tempfile.mkstemp(dir=self.cache_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        keep = {k: v for k, v in headers.items() if k.lower() in ("content-type", "cache-control")}
+        save_json(path + ".json", {"headers": keep, "expires": expires})
+        self.stats["cache_stores"] += 1
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"[requests] {s['requests']} routed, {s['blocked']} blocked, "
+            f"{s['cache_hits']} served from cache ({s['bytes_from_cache'] / 1024:.0f} KiB saved)"
+        )
+
+
+__all__ = ["RequestFilter", "PROFILES", "TRACKER_DOMAINS"]
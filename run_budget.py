@@ -0,0 +1,124 @@
+import hashlib
+import json
+import time
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# What to do when the model repeats an action on an unchanged page
+LOOP_POLICIES = ("abort", "reprompt", "escalate")
+
+LOOP_HINT = (
+    "You already called {name} with these arguments {count} times on this same "
+    "page and nothing changed. Do something different, or call done() if the "
+    "goal cannot be reached."
+)
+
+
+def summary_hash(summary: Dict[str, Any]) -> str:
+    """Stable digest of a page summary, for spotting unchanged pages."""
+    data = json.dumps(summary, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class RunBudget:
+    """
+    Limits for one autonomous run, and the account of how they were spent.
+
+    `max_steps` caps model turns, `max_seconds` wall-clock time and
+    `max_tokens` the prompt plus completion tokens (as reported by the
+    planner, else the prompt size the history estimated; cached decisions
+    are free). Limits are checked before each turn; None means unlimited.
+
+    A decision whose (action, arguments, page summary) was already seen
+    `loop_threshold` - 1 times is a loop. `on_loop` decides what happens:
+    "abort" stops the run, "reprompt" skips the action and tells the model
+    on the next turn, "escalate" does the same but also hands the rest of
+    the run to a stronger planner. A loop that recurs after that aborts.
+    """
+
+    def __init__(
+        self,
+        max_steps: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        loop_threshold: int = 3,
+        on_loop: str = "reprompt"
+    ):
+        if on_loop not in LOOP_POLICIES:
+            raise ValueError(f"Unknown loop policy: {on_loop}")
+        self.max_steps = max_steps
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.loop_threshold = max(2, loop_threshold)
+        self.on_loop = on_loop
+        self.steps = 0
+        self.actions = 0
+        self.tokens = 0
+        self.loops = 0
+        self._seen: Counter = Counter()
+        self._warned: set = set()
+        self._start = time.perf_counter()
+
+    @property
+    def seconds(self) -> float:
+        return time.perf_counter() - self._start
+
+    def exceeded(self) -> Optional[str]:
+        """The name of the first limit reached, or None."""
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            return "max_steps"
+        if self.max_seconds is not None and self.seconds >= self.max_seconds:
+            return "max_seconds"
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return "max_tokens"
+        return None
+
+    def charge(self, decision: Dict[str, Any], prompt_estimate: int = 0) -> None:
+        """Count one model turn and the tokens it used."""
+        self.steps += 1
+        if decision.get("cached"):
+            return
+        tokens = decision.get("tokens")
+        if tokens:
+            self.tokens += tokens.get("prompt", 0) + tokens.get("completion", 0)
+        else:
+            self.tokens += prompt_estimate
+
+    def check_loop(self, name: str, arguments: Dict[str, Any], page_hash: str) -> Optional[str]:
+        """
+        Record a decision taken on a page. Returns None if it is new enough,
+        else the action to take: "abort", "reprompt" or "escalate".
+        """
+        key = (name, json.dumps(arguments, sort_keys=True), page_hash)
+        self._seen[key] += 1
+        if self._seen[key] < self.loop_threshold:
+            return None
+        self.loops += 1
+        if key in self._warned or self.on_loop == "abort":
+            return "abort"
+        self._warned.add(key)
+        return self.on_loop
+
+    def hint(self, name: str, arguments: Dict[str, Any], page_hash: str) -> str:
+        key = (name, json.dumps(arguments, sort_keys=True), page_hash)
+        return LOOP_HINT.format(name=name, count=self._seen[key])
+
+    def summary(self, reason: str) -> Dict[str, Any]:
+        """The run's closing {"type": "budget"} event."""
+        return {
+            "type": "budget",
+            "reason": reason,
+            "steps": self.steps,
+            "actions": self.actions,
+            "seconds": round(self.seconds, 3),
+            "tokens": self.tokens,
+            "loops": self.loops,
+            "limits": {
+                "max_steps": self.max_steps,
+                "max_seconds": self.max_seconds,
+                "max_tokens": self.max_tokens
+            }
+        }
+
+
+__all__ = ["RunBudget", "LOOP_POLICIES", "summary_hash"]
@@ -0,0 +1,126 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+SCREENSHOT_FORMATS = ("png", "jpeg", "webp")
+
+_EXTENSIONS = {".jpg": "jpeg", ".jpeg": "jpeg", ".webp": "webp", ".png": "png"}
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _pool() -> ThreadPoolExecutor:
+    """Worker threads shared by encoding, thumbnailing and disk writes (started on first use)."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1), thread_name_prefix="screenshot"
+        )
+    return _executor
+
+
+async def _off_loop(fn, *args) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_pool(), fn, *args)
+
+
+def format_for(path: Optional[str], fmt: Optional[str] = None) -> str:
+    """The explicit `fmt`, else the one implied by the file extension, else PNG."""
+    if fmt:
+        return fmt
+    ext = os.path.splitext(path or "")[1].lower()
+    return _EXTENSIONS.get(ext, "png")
+
+
+def needs_transcode(fmt: str, max_width: Optional[int] = None) -> bool:
+    """Chromium encodes PNG and JPEG itself; WebP and downscaling go through Pillow."""
+    return fmt == "webp" or bool(max_width)
+
+
+async def capture(
+    target: Any,
+    fmt: str = "png",
+    quality: Optional[int] = None,
+    full_page: bool = False,
+    clip: Optional[Dict[str, float]] = None,
+    max_width: Optional[int] = None
+) -> bytes:
+    """
+    Screenshot a Page (viewport, `full_page` or `clip` region) or an
+    ElementHandle into memory, at CSS-pixel scale. When the result will be
+    transcoded (see needs_transcode) the capture is a lossless PNG.
+    """
+    native = "png" if needs_transcode(fmt, max_width) else fmt
+    options: Dict[str, Any] = {"type": native, "scale": "css"}
+    if native == "jpeg" and quality is not None:
+        options["quality"] = quality
+    if full_page:
+        options["full_page"] = True
+    if clip:
+        options["clip"] = clip
+    return await target.screenshot(**options)
+
+
+def _transcode(data: bytes, fmt: str, quality: Optional[int], max_width: Optional[int]) -> bytes:
+    try:
+        from PIL import Image
+    except ImportError:
+        print("[Warning] Pillow is not installed; keeping the screenshot as PNG")
+        return data
+    img = Image.open(io.BytesIO(data))
+    if max_width and img.width > max_width:
+        height = max(1, round(img.height * max_width / img.width))
+        img = img.resize((max_width, height), Image.LANCZOS)
+    if fmt == "jpeg" and img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    options = {"quality": quality} if quality is not None and fmt != "png" else {}
+    out = io.BytesIO()
+    img.save(out, format=fmt.upper(), **options)
+    return out.getvalue()
+
+
+async def transcode(
+    data: bytes,
+    fmt: str,
+    quality: Optional[int] = None,
+    max_width: Optional[int] = None
+) -> bytes:
+    """Downscale to `max_width` and re-encode as `fmt`, on a worker thread."""
+    return await _off_loop(_transcode, data, fmt, quality, max_width)
+
+
+def _write(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+async def write_file(path: str, data: bytes) -> None:
+    """Write image bytes to `path` on a worker thread."""
+    await _off_loop(_write, path, data)
+
+
+def _thumbnail(data: bytes, size: Tuple[int, int]) -> Any:
+    from PIL import Image
+    img = Image.open(io.BytesIO(data))
+    img.thumbnail((max(1, size[0]), max(1, size[1])))
+    return img
+
+
+async def thumbnail(data: bytes, size: Tuple[int, int]) -> Any:
+    """Decode image bytes into a PIL Image fitted to `size`, on a worker thread."""
+    return await _off_loop(_thumbnail, data, size)
+
+
+def strip_image(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A step result without its in-memory image bytes, for JSON output."""
+    return {k: v for k, v in result.items() if k != "image"}
+
+
+__all__ = [
+    "SCREENSHOT_FORMATS", "format_for", "needs_transcode", "capture", "transcode",
+    "write_file", "thumbnail", "strip_image"
+]
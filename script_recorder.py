@@ -0,0 +1,70 @@
+import json
+from typing import Any, Dict, List, Optional
+
+from browseruse.schema_validator import validate_instructions
+from storage import save_json
+
+
+def compile_step(instr: Dict[str, Any], report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Turn an executed step into one that replays without locator guessing.
+
+    Click/fill steps executed with `record=True` (and extract_text steps
+    addressed by element id, which do not survive a reload) carry the
+    element they resolved to in report["selector"]. Stable selectors (id,
+    data-testid, name, aria-label) are used as-is; otherwise the winning
+    text/role strategy is pinned as a Playwright selector, and the
+    structural path is the last resort. Every other step is kept unchanged.
+    """
+    action = instr["action"]
+    if action not in ("click", "fill", "extract_text") or not report or "selector" not in report:
+        return {"action": action, "args": dict(instr["args"])}
+
+    args = instr["args"]
+    selector = report["selector"]
+    if not report.get("stable"):
+        strategy = report.get("strategy")
+        if strategy == "text":
+            selector = f"text={json.dumps(args['text'])}"
+        elif strategy in ("button", "link"):
+            selector = f"role={strategy}[name={json.dumps(args['text'])}]"
+        elif strategy == "selector":
+            selector = args["selector"]
+    compiled = {"selector": selector}
+    if action == "fill":
+        compiled["text"] = args.get("text", "")
+    return {"action": action, "args": compiled}
+
+
+class ScriptRecorder:
+    """
+    Collects the steps of an autonomous run that succeeded, compiled with
+    the locators that actually resolved. The saved file is a plain
+    instruction list that browser_controller.run / execute_instructions can
+    replay directly:
+
+        recorder = ScriptRecorder()
+        await autonomous_loop(page, goal, recorder=recorder)
+        recorder.save("contact.json")
+    """
+
+    def __init__(self):
+        self.steps: List[Dict[str, Any]] = []
+
+    def add(self, instr: Dict[str, Any], report: Optional[Dict[str, Any]] = None) -> None:
+        self.steps.append(compile_step(instr, report))
+
+    def save(self, path: str) -> None:
+        validate_instructions(self.steps)
+        save_json(path, self.steps)
+
+
+def load_script(path: str) -> List[Dict[str, Any]]:
+    """Read and validate an instruction file written by ScriptRecorder.save."""
+    with open(path, "r", encoding="utf-8") as f:
+        steps = json.load(f)
+    validate_instructions(steps)
+    return steps
+
+
+__all__ = ["compile_step", "ScriptRecorder", "load_script"]
@@ -0,0 +1,125 @@
+import os
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+
+from storage import cache_dir, load_json, save_json
+
+# A URL, or the first bare domain named in a goal ("go to example.com and …"),
+# skipping both halves of e-mail addresses ("log in as bob@gmail.com on …")
+_DOMAIN = re.compile(
+    r"(?<![@\w.-])(?:https?://)?((?:[a-z0-9-]+\.)+[a-z]{2,})\b(?!@)", re.IGNORECASE
+)
+
+# Paths of pages that ask the user to log in
+LOGIN_PATH = re.compile(r"/(log-?in|sign-?in|auth|sso|session/new)\b", re.IGNORECASE)
+
+_PASSWORD_FIELD_JS = """() => [...document.querySelectorAll("input[type=password]")]
+  .some(el => { const r = el.getBoundingClientRect(); return r.width > 0 && r.height > 0; })"""
+
+
+def site_key(text: Optional[str]) -> Optional[str]:
+    """The site a URL or goal is about: its host, lower-cased, without "www."."""
+    match = _DOMAIN.search(text or "")
+    if not match:
+        return None
+    host = match.group(1).lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+async def looks_logged_out(page: Any) -> bool:
+    """True if the page is a login page: a login URL or a visible password field."""
+    if LOGIN_PATH.search(urlparse(page.url).path):
+        return True
+    try:
+        return bool(await page.evaluate(_PASSWORD_FIELD_JS))
+    except Exception:
+        # Closed, or navigating away
+        return False
+
+
+class SessionStore:
+    """
+    Playwright storage state (cookies and localStorage) per site, so that
+    runs against a site the agent has logged into before skip the login.
+    States are written with owner-only permissions under `path` (default
+    cache_dir("sessions")) and ignored once older than `max_age` seconds;
+    expired cookies are dropped when a state is loaded.
+
+        sessions = SessionStore()
+        state = sessions.load("example.com")
+        context = await browser.new_context(storage_state=state)
+        async for event in sessions.track(events, context, "example.com", state is not None):
+            ...
+    """
+
+    def __init__(self, path: Optional[str] = None, max_age: float = 24 * 3600):
+        self.path = path or cache_dir("sessions")
+        self.max_age = max_age
+
+    def _file(self, site: str) -> str:
+        return os.path.join(self.path, re.sub(r"[^a-z0-9.-]", "_", site) + ".json")
+
+    def load(self, site: str) -> Optional[Dict[str, Any]]:
+        """The saved state for `site`, or None if there is none or it has expired."""
+        record = load_json(self._file(site))
+        if record is None:
+            return None
+        now = time.time()
+        if now - record.get("saved_at", 0) > self.max_age:
+            self.invalidate(site)
+            return None
+        state = record["state"]
+        # Session cookies have expires == -1
+        cookies = [c for c in state.get("cookies", []) if c.get("expires", -1) <= 0 or c["expires"] > now]
+        return {**state, "cookies": cookies}
+
+    async def save(self, context: Any, site: str) -> None:
+        """Store the cookies and localStorage of `context` for `site`."""
+        state = await context.storage_state()
+        save_json(self._file(site), {"saved_at": time.time(), "state": state})
+
+    def invalidate(self, site: str) -> None:
+        """Forget the saved state for `site`."""
+        try:
+            os.remove(self._file(site))
+        except FileNotFoundError:
+            pass
+
+    async def track(
+        self,
+        events: AsyncIterator[Dict[str, Any]],
+        context: Any,
+        site: str,
+        restored: bool
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Pass a run's events through. If the run started from a saved state
+        (`restored`) and the first page it navigates to asks for a login,
+        that state is discarded. When the run finishes without raising, the
+        context's state is saved, unless it ended on a login page or was
+        stopped by its budget or loop detection (a "budget" event whose
+        reason is not "done").
+        """
+        checked = not restored
+        finished = True
+        async for event in events:
+            yield event
+            if event["type"] == "budget":
+                finished = event["reason"] == "done"
+            if checked or event["type"] != "step" or event.get("error") \
+                    or event["instruction"]["action"] != "navigate":
+                continue
+            checked = True
+            if context.pages and await looks_logged_out(context.pages[-1]):
+                print(f"[Warning] Saved session for {site} is logged out; discarding it")
+                self.invalidate(site)
+
+        if context.pages and await looks_logged_out(context.pages[-1]):
+            self.invalidate(site)
+        elif finished:
+            await self.save(context, site)
+
+
+__all__ = ["SessionStore", "site_key", "looks_logged_out"]
@@ -8,6 +8,21 @@ setup(
     py_modules=[
       "ai_agent",
       "agent_functions",
-      "browser_controller"
+      "browser_controller",
+      "incremental_snapshot",
+      "conversation_history",
+      "browser_pool",
+      "planner",
+      "storage",
+      "locator_resolver",
+      "tracing",
+      "decision_cache",
+      "script_recorder",
+      "request_filter",
+      "compact_snapshot",
+      "batch_runner",
+      "screenshots",
+      "session_store",
+      "run_budget"
     ],  
 )
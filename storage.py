@@ -0,0 +1,39 @@
+import json
+import os
+import tempfile
+from typing import Any
+
+def cache_dir(*parts: str) -> str:
+    """
+    Directory for on-disk caches ($BROWSERUSE_CACHE_DIR, default
+    ~/.cache/browseruse), joined with `parts` and created if missing.
+    """
+    root = os.environ.get("BROWSERUSE_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "browseruse"
+    )
+    path = os.path.join(root, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def load_json(path: str, default: Any = None) -> Any:
+    """Read a JSON file, returning `default` if it is missing or corrupt."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json(path: str, data: Any) -> None:
+    """Write JSON atomically so concurrent readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+__all__ = ["cache_dir", "load_json", "save_json"]
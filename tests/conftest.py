@@ -0,0 +1,13 @@
+from types import SimpleNamespace
+
+
+class SingleTabPage:
+    """
+    Base for Playwright page doubles: the page is the only tab of its
+    context, which is all TabSet needs. Subclasses add evaluate/goto.
+    """
+    url = "about:blank"
+
+    @property
+    def context(self):
+        return SimpleNamespace(pages=[self])
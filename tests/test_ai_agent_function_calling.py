@@ -1,8 +1,13 @@
 import json
+import os
 import pytest
 
-from ai_agent import generate_browser_tasks
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import autonomous_loop
 from agent_functions import FUNCTIONS
+from planner import OpenAIPlanner
+from conftest import SingleTabPage
 
 class DummyFunctionCall:
     def __init__(self, name, arguments):
@@ -24,30 +29,55 @@ class DummyResponse:
         msg = DummyMessage(func_name, func_args)
         self.choices = [DummyChoice(msg)]
 
+class DummyCompletions:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return self.responses.pop(0)
+
+class DummyClient:
+    def __init__(self, completions):
+        self.chat = type("Chat", (), {"completions": completions})
+
+class RecordingPage(SingleTabPage):
+    """Stands in for a Playwright page; records the instructions it receives."""
+    url = "about:blank"
+
+    def __init__(self):
+        self.visited = []
 
-def test_generate_browser_tasks_function_calling(monkeypatch):
+    async def evaluate(self, script, arg=None):
+        return {"forms": [], "links": [], "buttons": []}
+
+    async def goto(self, url, **kwargs):
+        self.visited.append(url)
+
+
+@pytest.mark.asyncio
+async def test_autonomous_loop_function_calling():
     # Prepare a sequence of dummy responses: first navigate, then done
     responses = [
         DummyResponse("navigate", {"url": "https://example.com"}),
         DummyResponse("done", {})
     ]
+    completions = DummyCompletions(responses)
+    planner = OpenAIPlanner(client=DummyClient(completions))
 
-    # Monkey-patch the OpenAI client's chat.completions.create to return successive dummy responses
-    def fake_create(*args, **kwargs):
-        return responses.pop(0)
+    page = RecordingPage()
+    results = await autonomous_loop(page, "Go to example.com", planner=planner)
 
-    monkeypatch.setattr(
-        "ai_agent.client.chat.completions.create",
-        fake_create
-    )
+    # Only the navigate action is executed, since done ends the loop
+    assert page.visited == ["https://example.com"]
+    assert results == []
 
-    # Invoke generate_browser_tasks
-    tasks = generate_browser_tasks("Go to example.com")
-
-    # Should only return the navigate action, since done is filtered out
-    assert tasks == [
-        {"action": "navigate", "args": {"url": "https://example.com"}}
-    ]
+    # Every request offered the agent functions and carried the goal
+    assert all(r["functions"] == FUNCTIONS for r in completions.requests)
+    assert completions.requests[0]["messages"][-1] == {
+        "role": "user", "content": "Go to example.com"
+    }
 
     # Ensure no responses left
-    assert not responses
\ No newline at end of file
+    assert not responses
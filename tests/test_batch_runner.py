@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+
+import pytest
+from click.testing import CliRunner
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+import batch_runner
+from batch_runner import load_tasks, finished_ids, run_batch, format_summary
+from planner import BoundedPlanner, Planner, ScriptedPlanner
+from conftest import SingleTabPage
+
+class FakePage(SingleTabPage):
+    """Just enough of a Playwright page for navigate and snapshot_page."""
+    def __init__(self):
+        self.url = "about:blank"
+
+    async def evaluate(self, script, arg=None):
+        return {"forms": [], "links": [], "buttons": []}
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    async def goto(self, url, wait_until=None):
+        if "broken" in url:
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+        self.url = url
+
+class FakePool:
+    capacity = 3
+
+    def __init__(self, **options):
+        self.opened = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    @asynccontextmanager
+    async def page(self):
+        self.opened += 1
+        yield FakePage()
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_load_tasks_from_jsonl_and_csv(tmp_path):
+    steps = [{"action": "navigate", "args": {"url": "https://example.com"}}]
+    jsonl = _write(tmp_path / "goals.jsonl", [
+        json.dumps({"id": "a", "goal": "Find the pricing page"}),
+        "",
+        json.dumps("Read the blog"),
+        json.dumps({"instructions": steps})
+    ])
+    assert load_tasks(jsonl) == [
+        {"id": "a", "goal": "Find the pricing page"},
+        {"id": "3", "goal": "Read the blog"},
+        {"id": "4", "instructions": steps}
+    ]
+
+    csv_path = tmp_path / "goals.csv"
+    csv_path.write_text(
+        'id,goal,instructions\n'
+        'x,Open the docs,\n'
+        ',,"[{""action"": ""navigate"", ""args"": {""url"": ""https://example.com""}}]"\n',
+        encoding="utf-8"
+    )
+    assert load_tasks(str(csv_path)) == [
+        {"id": "x", "goal": "Open the docs"},
+        {"id": "2", "instructions": steps}
+    ]
+
+def test_load_tasks_rejects_bad_rows(tmp_path):
+    with pytest.raises(ValueError, match="goals.jsonl:1"):
+        load_tasks(_write(tmp_path / "goals.jsonl", [json.dumps({"id": "a"})]))
+    with pytest.raises(ValueError, match="duplicate"):
+        load_tasks(_write(tmp_path / "dupes.jsonl", ['"one"', json.dumps({"id": "1", "goal": "two"})]))
+
+def test_finished_ids_ignores_torn_lines(tmp_path):
+    out = _write(tmp_path / "out.jsonl", [
+        json.dumps({"id": "a", "status": "ok"}),
+        json.dumps({"id": "b", "status": "error"}),
+        '{"id": "c", "sta'
+    ])
+    assert finished_ids(out) == {"a", "b"}
+    assert finished_ids(out, retry_failed=True) == {"a"}
+    assert finished_ids(str(tmp_path / "missing.jsonl")) == set()
+
+@pytest.mark.asyncio
+async def test_run_batch_writes_results_and_resumes(tmp_path):
+    tasks = [
+        {"id": "goal", "goal": "Go to example.com"},
+        {"id": "ok", "instructions": [{"action": "navigate", "args": {"url": "https://example.com"}}]},
+        {"id": "bad", "instructions": [{"action": "navigate", "args": {"url": "https://broken.test"}}]}
+    ]
+    out = str(tmp_path / "results.jsonl")
+    planner = ScriptedPlanner([("navigate", {"url": "https://example.com"}), ("done", {})])
+    pool = FakePool()
+
+    stats = await run_batch(tasks, out, pool, planner=planner, quiet=True)
+    assert (stats["ok"], stats["failed"], stats["skipped"]) == (2, 1, 0)
+    with open(out, encoding="utf-8") as f:
+        records = {r["id"]: r for r in map(json.loads, f)}
+    assert records["goal"]["status"] == "ok"
+    assert records["goal"]["goal"] == "Go to example.com"
+    assert records["ok"]["status"] == "ok"
+    assert records["bad"]["status"] == "error"
+    assert "ERR_NAME_NOT_RESOLVED" in records["bad"]["error"]
+
+    # A rerun skips everything already recorded; retry_failed reruns "bad" only
+    stats = await run_batch(tasks, out, pool, planner=planner, quiet=True)
+    assert (stats["ok"], stats["failed"], stats["skipped"]) == (0, 0, 3)
+    stats = await run_batch(tasks, out, pool, planner=planner, retry_failed=True, quiet=True)
+    assert (stats["failed"], stats["skipped"]) == (1, 2)
+    assert pool.opened == 4
+    assert "1 run (0 ok, 1 failed), 2 skipped, of 3 task(s)" in format_summary(stats)
+
+@pytest.mark.asyncio
+async def test_run_batch_times_out_slow_tasks(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    planner = ScriptedPlanner([], delay=10)
+    stats = await run_batch(
+        [{"id": "slow", "goal": "Wait forever"}], out, FakePool(),
+        planner=planner, task_timeout=0.05, quiet=True
+    )
+    assert stats["failed"] == 1
+    with open(out, encoding="utf-8") as f:
+        assert json.loads(f.readline())["error"] == "Timed out after 0.05s"
+
+@pytest.mark.asyncio
+async def test_run_batch_fails_goals_stopped_by_budget(tmp_path):
+    out = str(tmp_path / "results.jsonl")
+    planner = ScriptedPlanner([("navigate", {"url": f"https://example.com/{i}"}) for i in range(3)])
+    stats = await run_batch(
+        [{"id": "long", "goal": "Browse forever"}], out, FakePool(),
+        planner=planner, quiet=True, max_steps=1
+    )
+    assert stats["failed"] == 1
+    with open(out, encoding="utf-8") as f:
+        record = json.loads(f.readline())
+    assert (record["status"], record["error"]) == ("error", "max_steps")
+    assert finished_ids(out, retry_failed=True) == set()
+
+def test_instruction_only_batch_needs_no_api_key(tmp_path, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.setattr(batch_runner, "BrowserPool", FakePool)
+    path = _write(tmp_path / "tasks.jsonl", [json.dumps(
+        {"id": "ok", "instructions": [{"action": "navigate", "args": {"url": "https://example.com"}}]}
+    )])
+    result = CliRunner().invoke(batch_runner.main, [path])
+    assert result.exit_code == 0, result.output
+    assert "1 run (1 ok, 0 failed)" in result.output
+
+    goals = _write(tmp_path / "goals.jsonl", [json.dumps({"id": "g", "goal": "Go to example.com"})])
+    result = CliRunner().invoke(batch_runner.main, [goals])
+    assert result.exit_code == 1 and "OPENAI_API_KEY not set" in result.output
+
+@pytest.mark.asyncio
+async def test_bounded_planner_limits_calls_in_flight():
+    class Counting(Planner):
+        def __init__(self):
+            self.active = self.peak = 0
+
+        async def decide(self, messages, functions):
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            return {"name": "done", "arguments": "{}"}
+
+    inner = Counting()
+    planner = BoundedPlanner(inner, limit=2)
+    await asyncio.gather(*(planner.decide([], []) for _ in range(6)))
+    assert inner.peak == 2
+    assert planner.waiting == 0
@@ -0,0 +1,127 @@
+import asyncio
+import pytest
+
+from browser_controller import ActionFailed, _phase, execute_single, stream_on_page
+from locator_resolver import first_visible as _first_visible
+
+class FakeLocator:
+    """Becomes visible after `delay` seconds, or never if delay is None."""
+    def __init__(self, name, delay):
+        self.name = name
+        self.delay = delay
+        self.cancelled = False
+
+    async def wait_for(self, state, timeout):
+        try:
+            if self.delay is None:
+                await asyncio.sleep(timeout / 1000)
+                raise TimeoutError(self.name)
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+@pytest.mark.asyncio
+async def test_first_visible_races_and_cancels_the_rest():
+    slow = FakeLocator("slow", 1.0)
+    missing = FakeLocator("missing", None)
+    quick = FakeLocator("quick", 0.01)
+    start = asyncio.get_running_loop().time()
+    winner = await _first_visible([slow, missing, quick], timeout_ms=2000)
+    assert winner is quick
+    assert asyncio.get_running_loop().time() - start < 0.5
+    await asyncio.sleep(0)
+    assert slow.cancelled and missing.cancelled
+
+@pytest.mark.asyncio
+async def test_first_visible_returns_none_when_nothing_shows():
+    assert await _first_visible([FakeLocator("a", None)], timeout_ms=10) is None
+
+def test_phase_accumulates_per_name():
+    report = {}
+    with _phase(report, "locate"):
+        pass
+    with _phase(report, "locate"):
+        pass
+    with _phase(None, "act"):
+        pass
+    assert list(report["timings"]) == ["locate"]
+    assert report["timings"]["locate"] >= 0
+
+class ScrollPage:
+    """Records the scroll scripts it is asked to run."""
+    def __init__(self):
+        self.scripts = []
+
+    async def evaluate(self, script, arg=None):
+        self.scripts.append(script)
+
+@pytest.mark.asyncio
+async def test_stream_on_page_reads_instructions_lazily():
+    page = ScrollPage()
+
+    def instructions():
+        for i in range(3):
+            # Each step has finished before the next one is even produced
+            assert len(page.scripts) == i
+            yield {"action": "scroll", "args": {"dx": 0, "dy": i}}
+
+    events = [e async for e in stream_on_page(page, instructions())]
+    assert [e["index"] for e in events] == [0, 1, 2]
+    assert all(e["type"] == "step" and e["result"] is None for e in events)
+    assert "act" in events[0]["timings"]
+
+class FakeElement:
+    def __init__(self):
+        self.actions = []
+
+    async def click(self):
+        self.actions.append("click")
+
+    async def fill(self, text):
+        self.actions.append(("fill", text))
+
+    async def text_content(self):
+        return "Hello"
+
+class FakeHandle:
+    def __init__(self, element):
+        self.element = element
+
+    def as_element(self):
+        return self.element
+
+    async def dispose(self):
+        pass
+
+class RegistryPage:
+    """Resolves ids from a dict, like the in-page registry."""
+    def __init__(self, registry):
+        self.registry = registry
+        self.lookups = []
+
+    async def evaluate(self, script, arg=None):  # highlight
+        pass
+
+    async def evaluate_handle(self, script, element_id):
+        self.lookups.append(element_id)
+        return FakeHandle(self.registry.get(element_id))
+
+@pytest.mark.asyncio
+async def test_actions_address_elements_by_id():
+    button, field, heading = FakeElement(), FakeElement(), FakeElement()
+    page = RegistryPage({"e1": button, "e2": field, "e3": heading})
+    report = {}
+    await execute_single(page, {"action": "click", "args": {"id": "e1"}}, fast=False, report=report)
+    await execute_single(page, {"action": "fill", "args": {"id": "e2", "text": "ada"}}, fast=True)
+    result = await execute_single(page, {"action": "extract_text", "args": {"id": "e3"}}, fast=True)
+    assert button.actions == ["click"] and field.actions == [("fill", "ada")]
+    assert result == {"extracted_text": "Hello"}
+    assert report["strategy"] == "id"
+    assert page.lookups == ["e1", "e2", "e3"]
+
+@pytest.mark.asyncio
+async def test_stale_id_fails_immediately():
+    page = RegistryPage({})
+    with pytest.raises(ActionFailed):
+        await execute_single(page, {"action": "click", "args": {"id": "e9"}}, fast=True)
@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+
+from browser_pool import BrowserPool, run_bounded
+
+def test_run_bounded_limits_concurrency_and_keeps_order():
+    running = 0
+    peak = 0
+
+    async def task(i):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if i == 3:
+            raise RuntimeError("boom")
+        return [i]
+
+    results = asyncio.run(run_bounded([task(i) for i in range(8)], 3))
+    assert peak == 3
+    assert results[:3] == [[0], [1], [2]]
+    assert results[3] == [{"error": "boom"}]
+
+@pytest.mark.asyncio
+async def test_pool_contexts_are_isolated():
+    async with BrowserPool(size=1, contexts_per_browser=2) as pool:
+        async with pool.page() as first, pool.page() as second:
+            await first.set_content("<p>first</p>")
+            await first.context.add_cookies(
+                [{"name": "k", "value": "v", "url": "https://example.com"}]
+            )
+            assert await second.context.cookies() == []
+            assert first.context is not second.context
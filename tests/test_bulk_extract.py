@@ -0,0 +1,89 @@
+import pytest
+from playwright.async_api import async_playwright
+
+from browser_controller import execute_single
+
+HTML = """
+<html><body>
+  <ul><li class="item"> First </li><li class="item">Second</li><li class="item">Third</li></ul>
+  <a class="doc" href="/a.pdf" title="A">Doc A</a>
+  <a class="doc" href="/b.pdf" title="B">Doc B</a>
+  <table id="people">
+    <tr><th>Name</th><th>Age</th></tr>
+    <tr><td>Ada</td><td>36</td></tr>
+    <tr><td>Grace</td><td>85</td></tr>
+  </table>
+</body></html>
+"""
+
+class PagedPage:
+    """Serves `pages` lists of items; clicking "next" moves to the next one."""
+    def __init__(self, pages):
+        self.pages = pages
+        self.current = 0
+        self.evaluations = 0
+
+    async def evaluate(self, script, arg=None):
+        if not isinstance(arg, dict):  # _settle's quiet-DOM wait
+            return True
+        self.evaluations += 1
+        items = self.pages[self.current]
+        chunk = items[arg["offset"]:arg["offset"] + arg["limit"]]
+        return {"items": chunk, "total": len(items)}
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    def locator(self, selector):
+        page = self
+
+        class Next:
+            first = None
+
+            async def is_visible(self):
+                return page.current + 1 < len(page.pages)
+
+            async def click(self):
+                page.current += 1
+
+        Next.first = Next()
+        return Next
+
+@pytest.mark.asyncio
+async def test_extract_all_follows_pagination_up_to_limit():
+    page = PagedPage([["a", "b"], ["c", "d"], ["e", "f"]])
+    result = await execute_single(page, {"action": "extract_all", "args": {
+        "selector": "li", "next_selector": "a.next", "max_pages": 5, "limit": 5
+    }})
+    assert result == {"extracted_items": ["a", "b", "c", "d", "e"], "next_offset": 1}
+    assert page.evaluations == 3
+
+@pytest.mark.asyncio
+async def test_extract_all_offset_and_limit_on_one_page():
+    page = PagedPage([["a", "b", "c", "d"]])
+    result = await execute_single(page, {"action": "extract_all", "args": {
+        "selector": "li", "offset": 1, "limit": 2
+    }})
+    assert result == {"extracted_items": ["b", "c"], "next_offset": 3}
+
+@pytest.mark.asyncio
+async def test_bulk_extraction_in_browser():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(HTML)
+
+        items = await execute_single(page, {"action": "extract_all", "args": {"selector": ".item"}})
+        assert items == {"extracted_items": ["First", "Second", "Third"]}
+
+        table = await execute_single(page, {"action": "extract_table", "args": {"selector": "#people"}})
+        assert table == {"extracted_table": {
+            "columns": ["Name", "Age"], "rows": [["Ada", "36"], ["Grace", "85"]]
+        }}
+
+        attrs = await execute_single(page, {"action": "extract_attributes", "args": {
+            "selector": "a.doc", "attributes": ["title", "text"]
+        }})
+        assert attrs["extracted_table"]["rows"] == [["A", "Doc A"], ["B", "Doc B"]]
+
+        await browser.close()
@@ -0,0 +1,69 @@
+import pytest
+from playwright.async_api import async_playwright
+
+from compact_snapshot import compact_elements, compact_snapshot, render_element
+
+def _links(*texts):
+    return [{"id": f"e{i}", "kind": "link", "text": t} for i, t in enumerate(texts, 1)]
+
+def test_dedupes_drops_empty_and_truncates():
+    elements = _links("Home", "home", "", "x" * 200) + [
+        {"id": "e9", "kind": "input", "type": "email", "text": ""}
+    ]
+    compact = compact_elements(elements, max_text=20)
+    assert compact["elements"] == [
+        'e1 link "Home"',
+        'e4 link "' + "x" * 19 + '…"',
+        "e9 input:email"
+    ]
+    assert compact["omitted"] == 0
+
+def test_repeated_form_fields_keep_their_ids():
+    elements = [
+        {"id": "e1", "kind": "input", "type": "email", "text": "Email"},
+        {"id": "e2", "kind": "input", "type": "email", "text": "Email"},
+        {"id": "e3", "kind": "input", "type": "number", "text": "Quantity"},
+        {"id": "e4", "kind": "input", "type": "number", "text": "Quantity"},
+        {"id": "e5", "kind": "button", "text": "Remove"},
+        {"id": "e6", "kind": "button", "text": "Remove"}
+    ]
+    lines = compact_elements(elements)["elements"]
+    assert [line.split()[0] for line in lines] == ["e1", "e2", "e3", "e4", "e5"]
+
+def test_budget_keeps_goal_relevant_elements_in_document_order():
+    elements = _links(*[f"Article number {i}" for i in range(200)], "Pricing plans", "Contact sales")
+    compact = compact_elements(elements, goal="Find the pricing plans", max_tokens=30)
+    assert 'e201 link "Pricing plans"' in compact["elements"]
+    assert compact["omitted"] > 150
+    ids = [int(line.split()[0][1:]) for line in compact["elements"]]
+    assert ids == sorted(ids)
+
+def test_render_element():
+    assert render_element({"id": "e3", "kind": "button", "text": 'Say "hi"'}) == 'e3 button "Say \\"hi\\""'
+
+HTML = """
+<html><body style="margin:0">
+  <a href="#a">Pricing</a>
+  <a href="#b" style="display:none">Hidden</a>
+  <label for="email">Email</label><input id="email" type="email"/>
+  <button>Send</button>
+  <div style="height:5000px"></div>
+  <a href="#c">Far below</a>
+</body></html>
+"""
+
+@pytest.mark.asyncio
+async def test_compact_snapshot_stamps_stable_ids():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(HTML)
+
+        first = await compact_snapshot(page, "send an email")
+        assert first["elements"] == ['e1 link "Pricing"', 'e2 input:email "Email"', 'e3 button "Send"']
+        assert first["offscreen"] == 1
+        # Ids are stable across observations and address the element directly
+        assert (await compact_snapshot(page))["elements"] == first["elements"]
+        assert await page.locator("[data-bu-id=e3]").text_content() == "Send"
+
+        await browser.close()
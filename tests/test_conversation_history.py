@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from ai_agent import autonomous_loop
+from conftest import SingleTabPage
+from conversation_history import ConversationHistory
+from planner import ScriptedPlanner
+
+def _summary(n_links):
+    return {
+        "forms": [{"form_selector": "#contact", "fields": ["name"], "buttons": ["Send"]}],
+        "links": [f"Link {i}" for i in range(n_links)],
+        "buttons": ["Menu"]
+    }
+
+def _run_turns(history, turns, goal="Fill the contact form"):
+    for i in range(turns):
+        history.add_observation(_summary(50 + i))
+        history.set_goal(goal)
+        messages = history.messages()
+        history.add_function_call("click", json.dumps({"text": f"Link {i}"}))
+    return messages
+
+def test_goal_sent_once_and_last():
+    history = ConversationHistory("system", max_tokens=100000)
+    messages = _run_turns(history, 4)
+    goals = [m for m in messages if m["role"] == "user"]
+    assert len(goals) == 1
+    assert messages[-1] == {"role": "user", "content": "Fill the contact form"}
+
+def test_only_recent_observations_sent_in_full():
+    history = ConversationHistory("system", max_tokens=100000, keep_full=2)
+    messages = _run_turns(history, 5)
+    observations = [
+        json.loads(m["content"]) for m in messages
+        if m["role"] == "assistant" and m["content"]
+    ]
+    assert len(observations) == 5
+    assert all("links" in o for o in observations[-2:])
+    # Older ones are diffs against the previous page or a short outline
+    assert all("changes" in o or "earlier_page" in o for o in observations[:-2])
+
+def test_token_budget_drops_oldest_turns_and_reports_savings():
+    history = ConversationHistory("system", max_tokens=1500, keep_full=1)
+    messages = _run_turns(history, 10)
+    report = history.turn_tokens[-1]
+    assert report["prompt_tokens"] <= 1500
+    assert report["untrimmed_tokens"] > report["prompt_tokens"]
+    assert len(history.turn_tokens) == 10
+    assert messages[0] == {"role": "system", "content": "system"}
+    # The latest observation is always kept
+    assert json.loads(messages[-2]["content"])["links"][-1] == "Link 58"
+
+def test_old_compact_observations_become_outlines():
+    history = ConversationHistory("system", keep_full=1)
+    for i in range(2):
+        history.add_observation({
+            "url": f"https://example.com/{i}", "title": "",
+            "elements": ['e1 link "Home"', 'e2 button "Go"'], "omitted": 0, "offscreen": 0
+        })
+        history.add_function_call("scroll", '{"dx": 0, "dy": 500}')
+    messages = history.messages()
+    assert json.loads(messages[1]["content"]) == {
+        "earlier_page": {"url": "https://example.com/0", "elements": 2}
+    }
+
+def test_latest_full_summary_survives_a_run_of_diffs():
+    history = ConversationHistory("system", max_tokens=100000, keep_full=2)
+    history.add_observation(_summary(3))
+    history.set_goal("Fill the contact form")
+    for i in range(5):
+        history.messages()
+        history.add_function_call("scroll", json.dumps({"dx": 0, "dy": 300}))
+        history.add_observation({"changes": {"links_added": [f"More {i}"]}})
+    messages = history.messages()
+    observations = [
+        json.loads(m["content"]) for m in messages
+        if m["role"] == "assistant" and m["content"]
+    ]
+    # The only full page is well outside keep_full but still sent verbatim
+    assert observations[0] == _summary(3)
+    assert all("changes" in o for o in observations[1:])
+
+class StaticPage(SingleTabPage):
+    async def evaluate(self, script, arg=None):
+        return _summary(3)
+
+@pytest.mark.asyncio
+async def test_prompt_sizes_are_printed_only_when_profiling(capsys):
+    scroll = ("scroll", {"dx": 0, "dy": 100})
+    await autonomous_loop(StaticPage(), "scroll", planner=ScriptedPlanner([scroll]))
+    assert "[tokens]" not in capsys.readouterr().err
+    await autonomous_loop(StaticPage(), "scroll", planner=ScriptedPlanner([scroll]), profile=True)
+    assert "[tokens] turn 1:" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+import os
+import time
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import autonomous_loop
+from decision_cache import (
+    CachingPlanner, DecisionCache, RecordingPlanner, ReplayDivergence,
+    ReplayPlanner, decision_key
+)
+from planner import ScriptedPlanner
+from conftest import SingleTabPage
+
+class FakePage(SingleTabPage):
+    def __init__(self, links=("Home",)):
+        self.url = "about:blank"
+        self.links = list(links)
+
+    async def evaluate(self, script, arg=None):
+        if script.startswith("window.scrollBy"):
+            return None
+        return {"forms": [], "links": self.links, "buttons": []}
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+SCRIPT = [
+    ("scroll", {"dx": 0, "dy": 100}),
+    ("scroll", {"dx": 0, "dy": 100}),
+    ("navigate", {"url": "https://example.com"}),
+]
+
+def _messages(observation, calls=()):
+    messages = [{"role": "system", "content": "sys"},
+                {"role": "assistant", "content": observation}]
+    for name, args in calls:
+        messages.append({"role": "assistant", "content": None,
+                         "function_call": {"name": name, "arguments": args}})
+    return messages + [{"role": "user", "content": "goal"}]
+
+def test_key_ignores_whitespace_but_not_history():
+    a = decision_key("m", _messages('{"links": ["Home  page"]}'))
+    b = decision_key("m", _messages('{"links": [" Home page\\n"]}'))
+    c = decision_key("m", _messages('{"links": ["Home page"]}', [("scroll", "{}")]))
+    assert a == b != c
+    assert decision_key("other", _messages('{"links": ["Home page"]}')) != a
+
+@pytest.mark.asyncio
+async def test_second_run_is_served_from_cache(tmp_path):
+    cache = DecisionCache(path=str(tmp_path))
+    first = ScriptedPlanner(SCRIPT)
+    await autonomous_loop(FakePage(), "goal", planner=CachingPlanner(first, cache))
+    assert len(first.calls) == 4
+
+    # The same goal on the same pages never reaches the inner planner
+    second = ScriptedPlanner([])
+    await autonomous_loop(FakePage(), "goal", planner=CachingPlanner(second, cache))
+    assert second.calls == []
+    assert cache.hits == 4
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = DecisionCache(path=str(tmp_path), ttl=60, max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, {"name": "done", "arguments": "{}"})
+    old = time.time() - 100
+    os.utime(tmp_path / "a.json", (old, old))
+    cache.put("c", {"name": "done", "arguments": "{}"})
+    assert sorted(os.listdir(tmp_path)) == ["b.json", "c.json"]
+
+    expired = DecisionCache(path=str(tmp_path), ttl=0)
+    time.sleep(0.01)
+    assert expired.get("b") is None
+    assert not (tmp_path / "b.json").exists()
+
+def test_entry_removed_by_another_run_is_a_miss(tmp_path, monkeypatch):
+    cache = DecisionCache(path=str(tmp_path), ttl=60)
+    cache.put("a", {"name": "done", "arguments": "{}"})
+
+    def gone(*args, **kwargs):
+        raise FileNotFoundError(str(tmp_path / "a.json"))
+
+    # Read, then evicted by a concurrent run before the LRU touch
+    monkeypatch.setattr(os, "utime", gone)
+    assert cache.get("a") is None
+    # Read as expired, then already removed by a concurrent run
+    monkeypatch.setattr(os, "remove", gone)
+    cache.ttl = -1
+    assert cache.get("a") is None
+    assert (cache.hits, cache.misses) == (0, 2)
+
+@pytest.mark.asyncio
+async def test_strict_replay_runs_without_model_and_detects_divergence(tmp_path):
+    path = str(tmp_path / "session.jsonl")
+    await autonomous_loop(FakePage(), "goal", planner=RecordingPlanner(ScriptedPlanner(SCRIPT), path))
+
+    page = FakePage()
+    await autonomous_loop(page, "goal", planner=ReplayPlanner(path))
+    assert page.url == "https://example.com"
+
+    with pytest.raises(ReplayDivergence):
+        await autonomous_loop(FakePage(links=["Changed"]), "goal", planner=ReplayPlanner(path))
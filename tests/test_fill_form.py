@@ -0,0 +1,104 @@
+import pytest
+from playwright.async_api import async_playwright
+
+from agent_functions import FUNCTIONS
+from browser_controller import ActionFailed, execute_single
+from browseruse.schema_validator import _load_schema, validate_instructions
+
+HTML = """
+<html><body>
+  <form id="contact" onsubmit="event.preventDefault(); document.title = 'sent'">
+    <label>Your name <input name="name"></label>
+    <input name="email" type="email">
+    <textarea id="message" placeholder="Message"></textarea>
+    <select name="topic"><option value="sales">Sales</option><option value="support">Support</option></select>
+    <input type="checkbox" name="subscribe">
+    <button type="submit">Send</button>
+  </form>
+</body></html>
+"""
+
+class FormPage:
+    """Answers the fill_form script with a canned outcome."""
+    def __init__(self, outcome):
+        self.outcome = outcome
+        self.calls = []
+
+    async def evaluate(self, script, arg=None):
+        if not isinstance(arg, dict):  # _settle's quiet-DOM wait
+            return True
+        self.calls.append(arg)
+        return self.outcome
+
+    async def wait_for_load_state(self, state, timeout=None):
+        pass
+
+FILL = {"action": "fill_form", "args": {
+    "form_selector": "#contact",
+    "fields": {"name": "Ada Lovelace", "email": "ada@example.com"},
+    "submit": True
+}}
+
+def test_fill_form_is_validated():
+    validate_instructions([FILL])
+    with pytest.raises(ValueError):
+        validate_instructions([{"action": "fill_form", "args": {"form_selector": "#contact", "fields": {}}}])
+
+@pytest.mark.asyncio
+async def test_fill_form_is_one_round_trip():
+    page = FormPage({"filled": 2})
+    report = {}
+    assert await execute_single(page, FILL, fast=True, report=report) is None
+    assert page.calls == [{
+        "formSelector": "#contact",
+        "fields": {"name": "Ada Lovelace", "email": "ada@example.com"},
+        "submit": True
+    }]
+    assert set(report["timings"]) == {"act", "settle"}
+
+@pytest.mark.asyncio
+async def test_fill_form_reports_missing_form_and_fields():
+    with pytest.raises(ActionFailed, match="Cannot find form"):
+        await execute_single(FormPage(None), FILL)
+    page = FormPage({"missing": ["email"], "available": ["name", "mail"]})
+    with pytest.raises(ActionFailed, match=r"No field for email in #contact \(fields: name, mail\)"):
+        await execute_single(page, FILL)
+
+@pytest.mark.asyncio
+async def test_fill_form_in_browser():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(HTML)
+
+        await execute_single(page, {"action": "fill_form", "args": {
+            "form_selector": "#contact",
+            "fields": {"Your name": "Ada", "email": "ada@example.com", "Message": "Hello",
+                       "topic": "Support", "subscribe": True},
+            "submit": True
+        }}, fast=True)
+        values = await page.evaluate("""() => [
+            document.querySelector("[name=name]").value,
+            document.querySelector("[name=email]").value,
+            document.querySelector("#message").value,
+            document.querySelector("[name=topic]").value,
+            document.querySelector("[name=subscribe]").checked,
+            document.title
+        ]""")
+        assert values == ["Ada", "ada@example.com", "Hello", "support", True, "sent"]
+
+        # Nothing is filled when a field is unknown
+        with pytest.raises(ActionFailed, match="phone"):
+            await execute_single(page, {"action": "fill_form", "args": {
+                "form_selector": "#contact", "fields": {"name": "Grace", "phone": "123"}
+            }})
+        assert await page.evaluate("() => document.querySelector('[name=name]').value") == "Ada"
+
+        await browser.close()
+
+def test_fill_form_function_matches_the_schema():
+    branches = _load_schema()["items"]["properties"]["args"]["anyOf"]
+    schema = next(b for b in branches if "form_selector" in b["properties"])
+    function = next(f for f in FUNCTIONS if f["name"] == "fill_form")["parameters"]
+    assert function["properties"] == schema["properties"]
+    assert function["required"] == schema["required"]
@@ -0,0 +1,30 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from planner import OpenAIPlanner
+
+ROOT = Path(__file__).resolve().parent.parent
+
+LAZY_MODULES = ("openai", "playwright", "PIL", "jsonschema", "dotenv")
+
+@pytest.mark.parametrize("module", ["ai_agent", "demo", "batch_runner", "browser_controller"])
+def test_entry_points_import_without_key_or_heavy_modules(module):
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    code = (
+        f"import sys, {module}\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
+
+def test_openai_client_is_created_on_first_use():
+    planner = OpenAIPlanner(api_key="test-key")
+    assert planner._client is None
+    assert planner.client is planner.client
@@ -0,0 +1,111 @@
+import json
+
+import pytest
+from urllib.parse import quote
+from playwright.async_api import async_playwright
+
+from conversation_history import ConversationHistory
+from incremental_snapshot import _TAKE_DIRTY_JS, IncrementalSnapshotter, diff_summaries
+
+HTML = """
+<html>
+  <body>
+    <a href="#foo">Foo Link</a>
+    <form id="contact-form">
+      <input name="name"/>
+      <button type="submit">Send</button>
+    </form>
+    <button>ClickMe</button>
+  </body>
+</html>
+"""
+
+def test_diff_summaries_reports_only_changes():
+    old = {
+        "forms": [{"form_selector": "#a", "fields": ["x"], "buttons": ["Go"]}],
+        "links": ["Home", "About", "Home"],
+        "buttons": ["Go"]
+    }
+    new = {
+        "forms": old["forms"],
+        "links": ["Home", "Contact"],
+        "buttons": ["Go"]
+    }
+    assert diff_summaries(old, new) == {
+        "links": {"added": ["Contact"], "removed": ["Home", "About"]}
+    }
+    assert diff_summaries(old, dict(old)) == {}
+
+def test_diff_summaries_sends_whole_form_list():
+    old = {"forms": [{"form_selector": "#a", "fields": ["x"], "buttons": []}]}
+    new = {"forms": [{"form_selector": "#a", "fields": ["x", "y"], "buttons": []}]}
+    assert diff_summaries(old, new) == {"forms": new["forms"]}
+
+@pytest.mark.asyncio
+async def test_incremental_snapshotter_diffs_and_resets_on_navigation():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(HTML)
+        snap = IncrementalSnapshotter(page)
+
+        first = await snap.observe()
+        assert first["mode"] == "full"
+        assert "Foo Link" in first["summary"]["links"]
+
+        # Typing only changes the value property: nothing to resend
+        await page.fill("[name=name]", "Ada")
+        assert await snap.observe() == {"mode": "diff", "changes": {}}
+
+        await page.evaluate("""() => {
+            const a = document.createElement('a');
+            a.textContent = 'New Link';
+            document.body.appendChild(a);
+        }""")
+        second = await snap.observe()
+        assert second == {
+            "mode": "diff",
+            "changes": {"links": {"added": ["New Link"], "removed": []}}
+        }
+
+        await page.goto("data:text/html," + quote(HTML))
+        assert (await snap.observe())["mode"] == "full"
+
+        await browser.close()
+
+class ChangingPage:
+    """Serves snapshot_page from `state`; reports the sections in `dirty` once."""
+    def __init__(self, links):
+        self.state = {"forms": [], "links": links, "buttons": []}
+        self.dirty = None
+
+    async def evaluate(self, script, arg=None):
+        if script == _TAKE_DIRTY_JS:
+            dirty, self.dirty = self.dirty, {}
+            return dirty
+        if isinstance(arg, dict):
+            sections = arg["sections"] or list(self.state)
+            return {key: list(self.state[key]) for key in sections}
+        return None
+
+@pytest.mark.asyncio
+async def test_history_keeps_earlier_full_observations_intact():
+    page = ChangingPage(["Home"])
+    snapshotter = IncrementalSnapshotter(page)
+    history = ConversationHistory("system", max_tokens=100000, keep_full=1)
+
+    first = await snapshotter.observe()
+    history.add_observation(first["summary"])
+    history.add_function_call("click", "{}")
+    page.state["links"] = ["Home", "Pricing", "Blog"]
+    page.dirty = {"links": True}
+    second = await snapshotter.observe()
+    assert second == {"mode": "diff", "changes": {"links": {"added": ["Pricing", "Blog"], "removed": []}}}
+    history.add_observation({"changes": second["changes"]})
+    history.add_function_call("click", "{}")
+    history.add_observation({"forms": [], "links": ["Elsewhere"], "buttons": []})
+
+    # The first turn is outlined as the page it saw, not the page as it is now
+    assert first["summary"]["links"] == ["Home"]
+    outline = json.loads(history.messages()[1]["content"])
+    assert outline == {"earlier_page": {"forms": [], "links": 1, "buttons": 0}}
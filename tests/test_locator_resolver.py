@@ -0,0 +1,87 @@
+import asyncio
+import json
+import pytest
+
+from locator_resolver import LocatorResolver
+
+class FakeLocator:
+    def __init__(self, name, visible_after):
+        self.name = name
+        self.visible_after = visible_after
+        self.waited = False
+
+    @property
+    def first(self):
+        return self
+
+    async def wait_for(self, state, timeout):
+        self.waited = True
+        if self.visible_after is None:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(self.name)
+        await asyncio.sleep(self.visible_after)
+
+    async def is_visible(self):
+        return self.visible_after is not None
+
+class FakePage:
+    """Only the link strategy matches, after a short delay."""
+    url = "https://shop.example.com/cart"
+
+    def __init__(self):
+        self.made = {}
+
+    def _make(self, name, delay):
+        self.made[name] = FakeLocator(name, delay)
+        return self.made[name]
+
+    def get_by_text(self, text, exact=False):
+        return self._make("text", None)
+
+    def get_by_role(self, role, name=None):
+        return self._make(role, 0.02 if role == "link" else None)
+
+    def locator(self, selector):
+        return self._make("selector", None)
+
+    def get_by_label(self, label):
+        return self._make("label", None)
+
+@pytest.mark.asyncio
+async def test_resolver_races_then_remembers_strategy(tmp_path):
+    path = tmp_path / "locators.json"
+    resolver = LocatorResolver(cache_path=str(path))
+    page = FakePage()
+
+    name, locator = await resolver.resolve(page, "click", {"text": "Checkout"}, timeout_ms=200)
+    assert name == "link"
+    assert json.loads(path.read_text()) == {"shop.example.com|click|Checkout|": "link"}
+
+    # A fresh resolver (next run) reads the cache and skips the race
+    again = LocatorResolver(cache_path=str(path))
+    page = FakePage()
+    name, locator = await again.resolve(page, "click", {"text": "Checkout"}, timeout_ms=200)
+    assert name == "link"
+    assert (again.hits, again.misses) == (1, 0)
+    assert not any(loc.waited for loc in page.made.values())
+
+@pytest.mark.asyncio
+async def test_resolver_returns_none_and_evicts_lru(tmp_path):
+    resolver = LocatorResolver(cache_path=str(tmp_path / "c.json"), max_entries=1)
+    page = FakePage()
+    assert await resolver.resolve(page, "fill", {"label": "Email", "text": "x"}, timeout_ms=10) is None
+    await resolver.resolve(page, "click", {"text": "A"}, timeout_ms=200)
+    await resolver.resolve(page, "click", {"text": "B"}, timeout_ms=200)
+    assert list(resolver._cache) == ["shop.example.com|click|B|"]
+
+@pytest.mark.asyncio
+async def test_fill_values_are_not_persisted(tmp_path):
+    path = tmp_path / "locators.json"
+    resolver = LocatorResolver(cache_path=str(path))
+    page = FakePage()
+    page.get_by_label = lambda label: page._make("label", 0.01)
+    await resolver.resolve(page, "fill", {"label": "Password", "text": "hunter2"}, timeout_ms=200)
+    await resolver.resolve(page, "fill", {"label": "Password", "text": "correct horse"}, timeout_ms=200)
+    assert "hunter2" not in path.read_text()
+    assert json.loads(path.read_text()) == {"shop.example.com|fill|Password|": "label"}
+    assert resolver.hits == 1
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import os
+
+import openai
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import autonomous_loop, autonomous_stream
+from planner import OpenAIPlanner, Planner, ScriptedPlanner
+from conftest import SingleTabPage
+
+class _Call:
+    def __init__(self, name, arguments):
+        self.name = name
+        self.arguments = arguments
+
+class _Response:
+    def __init__(self, name, arguments):
+        message = type("Message", (), {"function_call": _Call(name, arguments)})
+        self.choices = [type("Choice", (), {"message": message})]
+        self.usage = type("Usage", (), {"prompt_tokens": 10, "completion_tokens": 2})
+
+class FlakyCompletions:
+    """Times out `failures` times, then answers with a navigate call."""
+    def __init__(self, failures):
+        self.failures = failures
+        self.attempts = 0
+
+    async def create(self, **kwargs):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise openai.APIConnectionError(request=None)
+        return _Response("navigate", '{"url": "https://example.com"}')
+
+def _client(completions):
+    chat = type("Chat", (), {"completions": completions})
+    return type("Client", (), {"chat": chat})
+
+class FakePage(SingleTabPage):
+    """Just enough of a Playwright page for snapshot_page and navigate."""
+    def __init__(self):
+        self.url = "about:blank"
+        self.visited = []
+        self.scripts = []
+
+    async def evaluate(self, script, arg=None):
+        if script.startswith("window.scrollBy"):
+            self.scripts.append(script)
+            return None
+        return {"forms": [], "links": ["Home"], "buttons": []}
+
+    async def goto(self, url):
+        self.url = url
+        self.visited.append(url)
+
+def test_planner_subclass_must_implement_decide():
+    class Incomplete(Planner):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+@pytest.mark.asyncio
+async def test_openai_planner_retries_with_backoff():
+    completions = FlakyCompletions(failures=2)
+    planner = OpenAIPlanner(client=_client(completions), backoff=0.001)
+    decision = await planner.decide([], [])
+    assert decision["name"] == "navigate"
+    assert decision["tokens"] == {"prompt": 10, "completion": 2}
+    assert completions.attempts == 3
+    assert planner.retries == 2
+
+@pytest.mark.asyncio
+async def test_openai_planner_gives_up_after_max_retries():
+    planner = OpenAIPlanner(
+        client=_client(FlakyCompletions(failures=5)), max_retries=1, backoff=0.001
+    )
+    with pytest.raises(openai.APIConnectionError):
+        await planner.decide([], [])
+
+@pytest.mark.asyncio
+async def test_openai_planner_times_out_slow_calls():
+    class Slow:
+        async def create(self, **kwargs):
+            await asyncio.sleep(10)
+
+    planner = OpenAIPlanner(client=_client(Slow()), timeout=0.01, max_retries=0)
+    with pytest.raises(asyncio.TimeoutError):
+        await planner.decide([], [])
+
+@pytest.mark.asyncio
+async def test_autonomous_loop_with_scripted_planner():
+    planner = ScriptedPlanner([
+        ("navigate", {"url": "https://example.com"}),
+        ("done", {})
+    ])
+    page = FakePage()
+    results = await autonomous_loop(page, "Go to example.com", planner=planner)
+    assert results == []
+    assert page.visited == ["https://example.com"]
+    # The second decision saw the first function call in its history
+    last_messages = planner.calls[-1]
+    calls = [m["function_call"] for m in last_messages if m.get("function_call")]
+    assert calls == [{"name": "navigate", "arguments": json.dumps({"url": "https://example.com"})}]
+
+@pytest.mark.asyncio
+async def test_batch_stops_after_navigation():
+    steps = [
+        {"action": "scroll",   "args": {"dx": 0, "dy": 100}},
+        {"action": "navigate", "args": {"url": "https://example.com/next"}},
+        {"action": "scroll",   "args": {"dx": 0, "dy": 200}}
+    ]
+    planner = ScriptedPlanner([("batch", {"steps": steps}), ("done", {})])
+    page = FakePage()
+    await autonomous_loop(page, "Scroll then go next", planner=planner, batch=True)
+
+    assert page.scripts == ["window.scrollBy(0, 100)"]
+    assert page.visited == ["https://example.com/next"]
+    # Only one model round trip was needed before done
+    assert len(planner.calls) == 2
+    recorded = [m["function_call"] for m in planner.calls[-1] if m.get("function_call")]
+    assert json.loads(recorded[0]["arguments"]) == {"steps": steps[:2]}
+
+@pytest.mark.asyncio
+async def test_batch_is_validated_as_a_whole():
+    steps = [
+        {"action": "scroll", "args": {"dx": 0, "dy": 100}},
+        {"action": "teleport", "args": {}}
+    ]
+    planner = ScriptedPlanner([("batch", {"steps": steps})])
+    page = FakePage()
+    with pytest.raises(ValueError):
+        await autonomous_loop(page, "Scroll", planner=planner, batch=True)
+    assert page.scripts == []
+
+@pytest.mark.asyncio
+async def test_autonomous_stream_yields_events_as_they_happen():
+    page = FakePage()
+    planner = ScriptedPlanner([
+        ("navigate", {"url": "https://example.com"}),
+        ("navigate", {"url": "https://example.com/next"}),
+    ])
+    events = []
+    async for event in autonomous_stream(page, "visit example", planner=planner):
+        events.append(event)
+        if len(events) == 2:
+            # The step has already run before the next decision is requested
+            assert page.visited == ["https://example.com"]
+            assert len(planner.calls) == 1
+    assert [e["type"] for e in events] == ["decision", "step", "decision", "step", "budget"]
+    assert events[4]["reason"] == "done" and events[4]["actions"] == 2
+    assert events[1]["index"] == 0 and events[3]["index"] == 1
+    assert events[1]["result"] is None and "error" not in events[1]
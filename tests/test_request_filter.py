@@ -0,0 +1,127 @@
+import time
+
+import pytest
+
+import request_filter as rf
+from request_filter import RequestFilter
+
+class FakeRequest:
+    def __init__(self, url, resource_type="document", method="GET"):
+        self.url = url
+        self.resource_type = resource_type
+        self.method = method
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, cache_control=None):
+        self.headers = {"content-type": "text/css", "set-cookie": "x=1"}
+        if cache_control:
+            self.headers["cache-control"] = cache_control
+
+    async def body(self):
+        return b"body { color: red }"
+
+class FakeRoute:
+    def __init__(self, cache_control=None):
+        self.outcome = None
+        self.fetches = 0
+        self.cache_control = cache_control
+
+    async def abort(self, reason="failed"):
+        self.outcome = ("abort", reason)
+
+    async def continue_(self):
+        self.outcome = ("continue",)
+
+    async def fetch(self):
+        self.fetches += 1
+        return FakeResponse(self.cache_control)
+
+    async def fulfill(self, **kwargs):
+        self.outcome = ("fulfill", kwargs)
+
+async def _route(request_filter, request, cache_control=None):
+    route = FakeRoute(cache_control)
+    await request_filter._handle(route, request)
+    return route
+
+@pytest.mark.asyncio
+async def test_blocks_by_type_and_domain():
+    f = RequestFilter.from_options("lean", block_domains=["ads.example"])
+    assert (await _route(f, FakeRequest("https://a.com/x.png", "image"))).outcome[0] == "abort"
+    assert (await _route(f, FakeRequest("https://www.google-analytics.com/g.js", "script"))).outcome[0] == "abort"
+    assert (await _route(f, FakeRequest("https://cdn.ads.example/t.js", "script"))).outcome[0] == "abort"
+    # Look-alike hosts are not subdomains
+    assert (await _route(f, FakeRequest("https://notads.example/", "document"))).outcome == ("continue",)
+    assert f.stats["requests"] == 4 and f.stats["blocked"] == 3
+
+@pytest.mark.asyncio
+async def test_caches_static_assets_across_runs(tmp_path):
+    first = RequestFilter(cache_types=["stylesheet"], cache_path=str(tmp_path))
+    route = await _route(first, FakeRequest("https://a.com/site.css", "stylesheet"))
+    assert route.fetches == 1 and route.outcome[0] == "fulfill"
+    assert first.stats["cache_stores"] == 1
+
+    second = RequestFilter(cache_types=["stylesheet"], cache_path=str(tmp_path))
+    route = await _route(second, FakeRequest("https://a.com/site.css", "stylesheet"))
+    assert route.fetches == 0
+    kind, kwargs = route.outcome
+    assert kwargs["body"] == b"body { color: red }"
+    assert kwargs["headers"] == {"content-type": "text/css"}
+    assert second.stats["cache_hits"] == 1
+    assert second.stats["bytes_from_cache"] == len(b"body { color: red }")
+
+    # Other methods and types go straight to the network
+    route = await _route(second, FakeRequest("https://a.com/site.css", "stylesheet", "POST"))
+    assert route.outcome == ("continue",)
+
+class BrokenRoute(FakeRoute):
+    def __init__(self, closed=False):
+        super().__init__()
+        self.closed = closed
+
+    async def fetch(self):
+        raise RuntimeError("net::ERR_CONNECTION_RESET")
+
+    async def continue_(self):
+        if self.closed:
+            raise RuntimeError("Target page, context or browser has been closed")
+        await super().continue_()
+
+@pytest.mark.asyncio
+async def test_failed_fetch_never_leaves_the_request_hanging(tmp_path):
+    f = RequestFilter(cache_types=["script"], cache_path=str(tmp_path))
+    request = FakeRequest("https://a.com/app.js", "script")
+    route = BrokenRoute()
+    await f._handle(route, request)
+    assert route.outcome == ("continue",)
+    route = BrokenRoute(closed=True)
+    await f._handle(route, request)
+    assert route.outcome == ("abort", "failed")
+    assert f.stats["cache_stores"] == 0
+
+@pytest.mark.asyncio
+async def test_cached_assets_expire(tmp_path, monkeypatch):
+    f = RequestFilter(cache_types=["script"], cache_path=str(tmp_path), asset_ttl=3600)
+    now = time.time()
+    await _route(f, FakeRequest("https://a.com/app.js?v=1", "script"), "public, max-age=60")
+    await _route(f, FakeRequest("https://a.com/app.js?v=2", "script"))
+    await _route(f, FakeRequest("https://a.com/live.js", "script"), "no-cache")
+    await _route(f, FakeRequest("https://a.com/now.js", "script"), "max-age=0")
+    assert f.stats["cache_stores"] == 2
+
+    # Each query string is its own entry
+    assert (await _route(f, FakeRequest("https://a.com/app.js?v=1", "script"))).fetches == 0
+    assert (await _route(f, FakeRequest("https://a.com/app.js?v=2", "script"))).fetches == 0
+    assert (await _route(f, FakeRequest("https://a.com/live.js", "script"))).fetches == 1
+
+    # Past its max-age the asset is fetched and stored again; the default TTL still holds
+    monkeypatch.setattr(rf.time, "time", lambda: now + 120)
+    assert (await _route(f, FakeRequest("https://a.com/app.js?v=1", "script"))).fetches == 1
+    assert (await _route(f, FakeRequest("https://a.com/app.js?v=2", "script"))).fetches == 0
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        RequestFilter.from_options("everything")
+    assert not RequestFilter.from_options().active
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+from ai_agent import autonomous_stream, describe_event
+from planner import ScriptedPlanner
+from run_budget import RunBudget
+from conftest import SingleTabPage
+
+class FakePage(SingleTabPage):
+    """A page whose summary never changes, whatever is done to it."""
+    def __init__(self):
+        self.url = "about:blank"
+        self.visited = []
+        self.scripts = []
+
+    async def evaluate(self, script, arg=None):
+        if script.startswith("window.scrollBy"):
+            self.scripts.append(script)
+            return None
+        return {"forms": [], "links": ["Home"], "buttons": ["More"]}
+
+    async def goto(self, url):
+        self.url = url
+        self.visited.append(url)
+
+SCROLL = ("scroll", {"dx": 0, "dy": 300})
+
+async def _run(page, goal, **options):
+    return [event async for event in autonomous_stream(page, goal, **options)]
+
+def test_run_budget_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        RunBudget(on_loop="retry")
+
+def test_cached_decisions_cost_no_tokens():
+    budget = RunBudget(max_tokens=100)
+    budget.charge({"name": "click", "tokens": {"prompt": 60, "completion": 5}})
+    budget.charge({"name": "click", "cached": True}, prompt_estimate=60)
+    budget.charge({"name": "click"}, prompt_estimate=40)
+    assert (budget.steps, budget.tokens) == (3, 105)
+    assert budget.exceeded() == "max_tokens"
+
+@pytest.mark.asyncio
+async def test_step_budget_stops_the_run():
+    planner = ScriptedPlanner([("navigate", {"url": f"https://example.com/{i}"}) for i in range(5)])
+    page = FakePage()
+    events = await _run(page, "browse", planner=planner, max_steps=2)
+    assert len(page.visited) == 2
+    summary = events[-1]
+    assert summary["type"] == "budget"
+    assert (summary["reason"], summary["steps"], summary["actions"]) == ("max_steps", 2, 2)
+    assert summary["limits"]["max_steps"] == 2
+    assert describe_event(summary).startswith("📊 Stopped early (max_steps): 2 turn(s)")
+
+@pytest.mark.asyncio
+async def test_token_budget_uses_the_history_estimate():
+    planner = ScriptedPlanner([SCROLL] * 5)
+    events = await _run(FakePage(), "scroll", planner=planner, max_tokens=1)
+    assert events[-1]["reason"] == "max_tokens"
+    assert events[-1]["steps"] == 1 and events[-1]["tokens"] > 0
+
+@pytest.mark.asyncio
+async def test_repeated_action_is_reprompted_then_aborted():
+    planner = ScriptedPlanner([SCROLL] * 6)
+    page = FakePage()
+    events = await _run(page, "scroll", planner=planner)
+
+    # Third identical scroll on the same page is skipped with a hint; the fourth aborts
+    assert len(page.scripts) == 2
+    assert events[-1]["reason"] == "loop" and events[-1]["loops"] == 2
+    hinted = [m for m in planner.calls[3] if m["role"] != "system" and "hint" in (m.get("content") or "")]
+    assert "3 times" in json.loads(hinted[-1]["content"])["hint"]
+
+@pytest.mark.asyncio
+async def test_loop_abort_policy_stops_at_once():
+    planner = ScriptedPlanner([SCROLL] * 6)
+    events = await _run(FakePage(), "scroll", planner=planner, on_loop="abort")
+    assert events[-1]["reason"] == "loop"
+    assert events[-1]["steps"] == 3 and events[-1]["actions"] == 2
+
+@pytest.mark.asyncio
+async def test_loop_escalates_to_another_planner():
+    planner = ScriptedPlanner([SCROLL] * 6)
+    stronger = ScriptedPlanner([("navigate", {"url": "https://example.com"})])
+    page = FakePage()
+    events = await _run(page, "scroll", planner=planner, on_loop="escalate",
+                        escalation_planner=stronger)
+    assert page.visited == ["https://example.com"]
+    assert len(planner.calls) == 3 and len(stronger.calls) == 2
+    assert events[-1]["reason"] == "done" and events[-1]["loops"] == 1
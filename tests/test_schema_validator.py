@@ -13,3 +13,64 @@ def test_missing_action():
         validate_instructions(bad)
     # Ensure the error message matches the schema validation output
     assert "'action' is a required property" in str(exc.value)
+
+def _reference_error(payload):
+    from jsonschema import validate, ValidationError
+    from browseruse.schema_validator import _load_schema
+    try:
+        validate(instance=payload, schema=_load_schema())
+    except ValidationError as ve:
+        location = " -> ".join(str(p) for p in ve.path) or "root"
+        return f"Instruction validation error at '{location}': {ve.message}"
+    return None
+
+@pytest.mark.parametrize("payload", [
+    [{"action": "wait", "args": {"timeout_ms": True}}],
+    [{"action": "click", "args": {}}],
+    [{"action": "teleport", "args": {"url": "https://foo"}}],
+    [{"action": "navigate", "args": {"url": "https://x"}, "extra": 1}],
+    {"action": "navigate"},
+])
+def test_error_messages_match_jsonschema(payload):
+    with pytest.raises(ValueError) as exc:
+        validate_instructions(payload)
+    assert str(exc.value) == _reference_error(payload)
+
+def test_fast_path_only_narrows_never_rejects():
+    # Not a click-shaped args object, but the full schema allows it
+    validate_instructions([{"action": "click", "args": {"url": "https://example.com"}}])
+    # fastjsonschema checks "uri" formats; the full schema does not
+    validate_instructions([{"action": "navigate", "args": {"url": "not a uri"}}])
+
+def test_without_fastjsonschema(monkeypatch):
+    import browseruse.schema_validator as sv
+    monkeypatch.setattr(sv, "fastjsonschema", None)
+    sv._action_checker.cache_clear()
+    try:
+        validate_instructions([{"action": "scroll", "args": {"dx": 0, "dy": 10}}])
+        with pytest.raises(ValueError):
+            validate_instructions([{"action": "scroll", "args": {"dx": "0", "dy": 10}}])
+    finally:
+        sv._action_checker.cache_clear()
+
+def test_bulk_extraction_actions():
+    validate_instructions([
+        {"action": "extract_all", "args": {"selector": "li", "limit": 50, "next_selector": ".next"}},
+        {"action": "extract_table", "args": {"selector": "table", "offset": 100}},
+        {"action": "extract_attributes", "args": {"selector": "a", "attributes": ["href"]}}
+    ])
+    with pytest.raises(ValueError):
+        validate_instructions([
+            {"action": "extract_attributes", "args": {"selector": "a", "attributes": []}}
+        ])
+    with pytest.raises(ValueError):
+        validate_instructions([{"action": "extract_all", "args": {"selector": "li", "max_pages": 0}}])
+
+def test_element_id_arguments():
+    validate_instructions([
+        {"action": "click", "args": {"id": "e12"}},
+        {"action": "fill", "args": {"id": "e3", "text": "Ada"}},
+        {"action": "extract_text", "args": {"id": "e7"}}
+    ])
+    with pytest.raises(ValueError):
+        validate_instructions([{"action": "click", "args": {"id": "#submit"}}])
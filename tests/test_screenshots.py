@@ -0,0 +1,77 @@
+import io
+
+import pytest
+from PIL import Image
+
+from ai_agent import _with_defaults
+from browser_controller import execute_single
+from browseruse.schema_validator import validate_instructions
+from screenshots import format_for, strip_image
+
+def _png(width, height):
+    out = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 30, 255)).save(out, format="PNG")
+    return out.getvalue()
+
+class ShotPage:
+    """Records the options of every screenshot call."""
+    def __init__(self):
+        self.calls = []
+
+    async def screenshot(self, **options):
+        self.calls.append(options)
+        return _png(800, 600)
+
+def test_format_follows_the_extension_unless_given():
+    assert format_for("shot.JPG") == "jpeg"
+    assert format_for("shot.webp") == "webp"
+    assert format_for(None) == "png"
+    assert format_for("shot.png", "jpeg") == "jpeg"
+
+def test_screenshot_args_are_validated():
+    validate_instructions([
+        {"action": "screenshot", "args": {"format": "png"}},
+        {"action": "screenshot", "args": {"format": "webp", "quality": 70, "max_width": 400}},
+        {"action": "screenshot", "args": {"path": "a.png", "clip": {"x": 0, "y": 0, "width": 10, "height": 10}}}
+    ])
+    with pytest.raises(ValueError):
+        validate_instructions([{"action": "screenshot", "args": {"format": "gif"}}])
+    with pytest.raises(ValueError):
+        validate_instructions([{"action": "screenshot", "args": {}}])
+
+@pytest.mark.asyncio
+async def test_screenshot_stays_in_memory_without_a_path():
+    page = ShotPage()
+    report = {}
+    result = await execute_single(page, {"action": "screenshot", "args": {"format": "jpeg", "quality": 60}},
+                                  fast=True, report=report)
+    assert page.calls == [{"type": "jpeg", "scale": "css", "quality": 60, "full_page": True}]
+    assert result["screenshot"] is None
+    assert result["format"] == "jpeg"
+    assert result["bytes"] == len(result["image"])
+    assert "encode" not in report["timings"]
+    assert strip_image(result) == {"screenshot": None, "format": "jpeg", "bytes": result["bytes"]}
+
+@pytest.mark.asyncio
+async def test_screenshot_downscales_and_saves_off_loop(tmp_path):
+    page = ShotPage()
+    path = str(tmp_path / "shots" / "page.webp")
+    report = {}
+    result = await execute_single(page, {"action": "screenshot", "args": {
+        "path": path, "max_width": 200, "full_page": False, "quality": 50
+    }}, fast=True, report=report)
+
+    # Transcoded captures are taken losslessly, then re-encoded once
+    assert page.calls == [{"type": "png", "scale": "css"}]
+    assert {"act", "encode", "save"} <= set(report["timings"])
+    with open(path, "rb") as f:
+        assert f.read() == result["image"]
+    img = Image.open(io.BytesIO(result["image"]))
+    assert (img.format, img.size) == ("WEBP", (200, 150))
+
+def test_bare_screenshot_call_defaults_to_png():
+    instr = _with_defaults({"action": "screenshot", "args": {}})
+    assert instr == {"action": "screenshot", "args": {"format": "png"}}
+    validate_instructions([instr])
+    selector = {"action": "screenshot", "args": {"selector": "#chart"}}
+    assert _with_defaults(selector) is selector
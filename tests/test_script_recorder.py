@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import replay_script, replay_stream
+from planner import ScriptedPlanner
+from script_recorder import ScriptRecorder, compile_step, load_script
+from conftest import SingleTabPage
+
+class FakePage(SingleTabPage):
+    """Navigates anywhere except URLs containing "gone"."""
+    def __init__(self):
+        self.url = "about:blank"
+        self.visited = []
+
+    async def evaluate(self, script, arg=None):
+        return {"forms": [], "links": ["Home"], "buttons": []}
+
+    async def goto(self, url):
+        if "gone" in url:
+            raise RuntimeError("net::ERR_NAME_NOT_RESOLVED")
+        self.url = url
+        self.visited.append(url)
+
+def test_compile_step_uses_stable_selector():
+    instr = {"action": "fill", "args": {"label": "Email", "text": "ada@example.com"}}
+    report = {"strategy": "label", "selector": "#email", "stable": True}
+    assert compile_step(instr, report) == {
+        "action": "fill", "args": {"selector": "#email", "text": "ada@example.com"}
+    }
+
+def test_compile_step_pins_winning_strategy_over_structural_path():
+    instr = {"action": "click", "args": {"text": "Send"}}
+    report = {"strategy": "button", "selector": "form > button:nth-of-type(1)", "stable": False}
+    assert compile_step(instr, report)["args"] == {"selector": 'role=button[name="Send"]'}
+    report["strategy"] = "text"
+    assert compile_step(instr, report)["args"] == {"selector": 'text="Send"'}
+
+def test_compile_step_keeps_other_actions():
+    instr = {"action": "navigate", "args": {"url": "https://example.com"}}
+    assert compile_step(instr, {}) == instr
+
+def test_saved_script_round_trips(tmp_path):
+    recorder = ScriptRecorder()
+    recorder.add({"action": "navigate", "args": {"url": "https://example.com"}})
+    recorder.add(
+        {"action": "click", "args": {"text": "More"}},
+        {"strategy": "link", "selector": "#more", "stable": True}
+    )
+    path = str(tmp_path / "script.json")
+    recorder.save(path)
+    assert load_script(path) == recorder.steps
+    # A plain instruction list, as browser_controller.run expects
+    with open(path, encoding="utf-8") as f:
+        assert isinstance(json.load(f), list)
+
+@pytest.mark.asyncio
+async def test_replay_runs_without_planner():
+    page = FakePage()
+    planner = ScriptedPlanner([])
+    steps = [
+        {"action": "navigate", "args": {"url": "https://example.com/a"}},
+        {"action": "navigate", "args": {"url": "https://example.com/b"}}
+    ]
+    await replay_script(page, steps, "visit b", planner=planner)
+    assert page.visited == ["https://example.com/a", "https://example.com/b"]
+    assert planner.calls == []
+
+@pytest.mark.asyncio
+async def test_replay_falls_back_to_autonomous_from_failed_step():
+    page = FakePage()
+    planner = ScriptedPlanner([("navigate", {"url": "https://example.com/new"})])
+    recorder = ScriptRecorder()
+    steps = [
+        {"action": "navigate", "args": {"url": "https://example.com/a"}},
+        {"action": "navigate", "args": {"url": "https://gone.example.com"}},
+        {"action": "navigate", "args": {"url": "https://example.com/never"}}
+    ]
+    await replay_script(page, steps, "visit the new page", planner=planner, recorder=recorder)
+    assert page.visited == ["https://example.com/a", "https://example.com/new"]
+    assert len(planner.calls) == 2
+    # The re-recorded script skips the failed step and keeps the model's fix
+    assert [s["args"]["url"] for s in recorder.steps] == [
+        "https://example.com/a", "https://example.com/new"
+    ]
+
+class StalePage(FakePage):
+    """No selector matches any more."""
+    async def wait_for_selector(self, selector, timeout=None):
+        from playwright.async_api import TimeoutError
+        raise TimeoutError(f"waiting for {selector}")
+
+@pytest.mark.asyncio
+async def test_replay_falls_back_when_an_extraction_selector_is_gone():
+    page = StalePage()
+    planner = ScriptedPlanner([("navigate", {"url": "https://example.com/new"})])
+    steps = [
+        {"action": "navigate", "args": {"url": "https://example.com/a"}},
+        {"action": "extract_text", "args": {"selector": "#total"}},
+        {"action": "screenshot", "args": {"selector": "#chart"}}
+    ]
+    events = [e async for e in replay_stream(page, steps, "read the total", planner=planner)]
+    assert "Cannot find element for extract_text: #total" in events[1]["error"]
+    assert page.visited == ["https://example.com/a", "https://example.com/new"]
+    assert len(planner.calls) == 2
+
+def test_compile_step_replaces_element_ids():
+    instr = {"action": "extract_text", "args": {"id": "e7"}}
+    report = {"strategy": "id", "selector": "#total", "stable": True}
+    assert compile_step(instr, report) == {"action": "extract_text", "args": {"selector": "#total"}}
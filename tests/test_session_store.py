@@ -0,0 +1,115 @@
+import json
+import os
+import time
+
+import pytest
+
+from session_store import SessionStore, site_key
+
+class LoginPage:
+    def __init__(self, url, password_field=False):
+        self.url = url
+        self.password_field = password_field
+
+    async def evaluate(self, script, arg=None):
+        return self.password_field
+
+class FakeContext:
+    def __init__(self, page):
+        self.pages = [page]
+        self.saved = 0
+
+    async def storage_state(self):
+        self.saved += 1
+        return {"cookies": [{"name": "sid", "value": "abc", "expires": -1}], "origins": []}
+
+def _step(action, url=None, error=None):
+    event = {"type": "step", "instruction": {"action": action, "args": {"url": url} if url else {}},
+             "result": None}
+    if error:
+        event["error"] = error
+    return event
+
+async def _events(*events):
+    for event in events:
+        yield event
+
+async def _drain(events):
+    return [event async for event in events]
+
+def test_site_key_from_urls_and_goals():
+    assert site_key("https://www.Example.com/account?x=1") == "example.com"
+    assert site_key("Go to mujjumujahid.com and fill in the contact form") == "mujjumujahid.com"
+    assert site_key("Log into mail.google.com") == "mail.google.com"
+    assert site_key("Search for cheap flights") is None
+    assert site_key("log in as bob@gmail.com on shop.example.com") == "shop.example.com"
+    assert site_key("Sign in as jane.doe@corp.example.org at https://portal.example.net/") == "portal.example.net"
+
+def test_load_drops_expired_states_and_cookies(tmp_path):
+    store = SessionStore(str(tmp_path), max_age=3600)
+    now = time.time()
+    state = {"cookies": [
+        {"name": "session", "expires": -1},
+        {"name": "old", "expires": now - 10},
+        {"name": "remember", "expires": now + 3600}
+    ], "origins": []}
+    with open(store._file("example.com"), "w") as f:
+        json.dump({"saved_at": now, "state": state}, f)
+    assert [c["name"] for c in store.load("example.com")["cookies"]] == ["session", "remember"]
+
+    with open(store._file("example.com"), "w") as f:
+        json.dump({"saved_at": now - 7200, "state": state}, f)
+    assert store.load("example.com") is None
+    assert not os.path.exists(store._file("example.com"))
+
+@pytest.mark.asyncio
+async def test_successful_run_saves_state(tmp_path):
+    store = SessionStore(str(tmp_path))
+    context = FakeContext(LoginPage("https://example.com/inbox"))
+    events = [_step("navigate", "https://example.com"), _step("click")]
+    assert await _drain(store.track(_events(*events), context, "example.com", restored=False)) == events
+    assert store.load("example.com")["cookies"][0]["name"] == "sid"
+    assert oct(os.stat(store._file("example.com")).st_mode & 0o777) == "0o600"
+
+@pytest.mark.asyncio
+async def test_logged_out_state_is_discarded(tmp_path, capsys):
+    store = SessionStore(str(tmp_path))
+    page = LoginPage("https://example.com/login")
+    context = FakeContext(page)
+    await store.save(context, "example.com")
+
+    events = store.track(_events(_step("navigate", "https://example.com")), context,
+                         "example.com", restored=True)
+    async for _ in events:
+        pass
+    assert "is logged out" in capsys.readouterr().out
+    # The run ended on the login page, so nothing new was saved either
+    assert store.load("example.com") is None
+    assert context.saved == 1
+
+@pytest.mark.asyncio
+async def test_failed_run_saves_nothing(tmp_path):
+    store = SessionStore(str(tmp_path))
+    context = FakeContext(LoginPage("https://example.com/inbox"))
+
+    async def failing():
+        yield _step("navigate", "https://example.com")
+        raise RuntimeError("browser crashed")
+
+    with pytest.raises(RuntimeError):
+        await _drain(store.track(failing(), context, "example.com", restored=False))
+    assert store.load("example.com") is None
+    # A visible password field also counts as logged out
+    assert await _drain(store.track(
+        _events(), FakeContext(LoginPage("https://example.com/", password_field=True)),
+        "example.com", restored=False
+    )) == []
+    assert store.load("example.com") is None
+
+@pytest.mark.asyncio
+async def test_run_stopped_by_budget_saves_nothing(tmp_path):
+    store = SessionStore(str(tmp_path))
+    context = FakeContext(LoginPage("https://example.com/inbox"))
+    events = [_step("navigate", "https://example.com"), {"type": "budget", "reason": "loop"}]
+    assert await _drain(store.track(_events(*events), context, "example.com", restored=False)) == events
+    assert store.load("example.com") is None and context.saved == 0
@@ -1,6 +1,6 @@
 import asyncio
 import pytest
-from browser_controller import snapshot_page, execute_instructions
+from browser_controller import snapshot_page, _snapshot_page_handles, execute_instructions, execute_single
 from playwright.async_api import async_playwright
 
 HTML = """
@@ -39,3 +39,39 @@ async def test_snapshot_page_basic(tmp_path):
         assert "ClickMe" in summary["buttons"]
 
         await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_page_matches_per_handle_walk():
+    html = HTML + """
+    <form class="  search   wide"><input id="q"/><input type="submit" value="Go"/></form>
+    <form><select name="pick"></select><a href="#x"></a></form>
+    """
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(html)
+
+        assert await snapshot_page(page) == await _snapshot_page_handles(page)
+
+        await browser.close()
+
+@pytest.mark.asyncio
+async def test_snapshot_ids_address_elements():
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(HTML)
+
+        summary = await snapshot_page(page, ids=True)
+        # Forms are walked first, so their fields and button are numbered first
+        assert summary["forms"][0]["fields"] == ["e1: name", "e2: email"]
+        assert summary["links"] == ["e4: Foo Link"]
+        assert summary["buttons"] == ["e3: Send", "e5: ClickMe"]
+        # Ids are stable across snapshots
+        assert await snapshot_page(page, ids=True) == summary
+
+        await execute_single(page, {"action": "fill", "args": {"id": "e2", "text": "a@b.c"}}, fast=True)
+        assert await page.input_value("input[name=email]") == "a@b.c"
+
+        await browser.close()
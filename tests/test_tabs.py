@@ -0,0 +1,112 @@
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import autonomous_loop, fan_out
+from browser_controller import ActionFailed, TabSet, execute_single
+from planner import Planner, ScriptedPlanner
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        return FakeTab(self)
+
+class FakeTab:
+    def __init__(self, context, url="about:blank"):
+        self.context = context
+        self.url = url
+        self.closed = False
+        context.pages.append(self)
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+
+    async def title(self):
+        return self.url.rsplit("/", 1)[-1]
+
+    async def bring_to_front(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+        self.context.pages.remove(self)
+
+    async def evaluate(self, script, arg=None):
+        return {"forms": [], "links": [self.url], "buttons": []}
+
+@pytest.mark.asyncio
+async def test_open_switch_and_close_tabs():
+    first = FakeTab(FakeContext(), "https://a.test/home")
+    tabs = TabSet(first)
+    await execute_single(tabs.current, {"action": "new_tab", "args": {"url": "https://b.test/pricing"}}, tabs=tabs)
+    assert tabs.current.url == "https://b.test/pricing"
+    assert await tabs.describe() == ["t0: home (https://a.test/home)", "*t1: pricing (https://b.test/pricing)"]
+
+    await execute_single(tabs.current, {"action": "switch_tab", "args": {"tab": "t0"}}, tabs=tabs)
+    assert tabs.current is first
+    await execute_single(tabs.current, {"action": "close_tab", "args": {"tab": "t0"}}, tabs=tabs)
+    assert first.closed and tabs.current.url == "https://b.test/pricing"
+    # Ids are never reused, and the last tab cannot be closed
+    assert list(tabs.pages()) == ["t1"]
+    with pytest.raises(ActionFailed):
+        await tabs.apply("close_tab", {"tab": "t1"})
+    with pytest.raises(ActionFailed):
+        await tabs.apply("switch_tab", {"tab": "t0"})
+
+@pytest.mark.asyncio
+async def test_loop_follows_tabs_and_lists_them():
+    page = FakeTab(FakeContext(), "https://a.test/home")
+    planner = ScriptedPlanner([
+        ("new_tab", {"url": "https://b.test/prices"}),
+        ("scroll", {"dx": 0, "dy": 100}),
+    ])
+    await autonomous_loop(page, "compare", planner=planner)
+    observation = json.loads(planner.calls[1][-2]["content"])
+    assert observation["tabs"] == ["t0: home (https://a.test/home)", "*t1: prices (https://b.test/prices)"]
+    assert observation["links"] == ["https://b.test/prices"]
+
+@pytest.mark.asyncio
+async def test_tab_sets_sharing_a_context_only_see_their_own_tabs():
+    context = FakeContext()
+    mine, theirs = TabSet(FakeTab(context, "https://a.test/one")), TabSet(FakeTab(context, "https://b.test/two"))
+    await mine.apply("new_tab", {"url": "https://a.test/three"})
+    popup = FakeTab(context, "https://a.test/popup")
+    mine._adopt(popup)  # what page.on("popup") does for a real page
+
+    assert [p.url for p in mine.pages().values()] == [
+        "https://a.test/one", "https://a.test/three", "https://a.test/popup"
+    ]
+    assert list(theirs.pages()) == ["t0"] and len(theirs) == 1
+    with pytest.raises(ActionFailed):
+        await theirs.apply("switch_tab", {"tab": "t1"})
+    with pytest.raises(ActionFailed):
+        await theirs.apply("close_tab", {"tab": "t0"})
+
+    # Closing the current tab falls back to one of the set's own tabs
+    await mine.apply("switch_tab", {"tab": "t2"})
+    await mine.apply("close_tab", {})
+    assert mine.current.url == "https://a.test/three"
+    assert len(context.pages) == 3
+
+class GoalPlanner(Planner):
+    """Navigates to the site named in the goal, then finishes."""
+    async def decide(self, messages, functions):
+        goal = messages[-1]["content"]
+        if not any(m.get("function_call") for m in messages):
+            return {"name": "navigate", "arguments": json.dumps({"url": f"https://{goal}/"})}
+        return {"name": "done", "arguments": "{}"}
+
+@pytest.mark.asyncio
+async def test_fan_out_runs_sub_goals_in_their_own_tabs():
+    context = FakeContext()
+    FakeTab(context)
+    merged = await fan_out(context, ["a.test", "b.test", "c.test"], concurrency=3, planner=GoalPlanner())
+    assert [m["goal"] for m in merged] == ["a.test", "b.test", "c.test"]
+    assert all(m["results"] == [] for m in merged)
+    # Sub-goal tabs are closed again
+    assert len(context.pages) == 1
@@ -0,0 +1,70 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
+from ai_agent import autonomous_loop, autonomous_stream
+from planner import ScriptedPlanner
+from tracing import Tracer, span
+from conftest import SingleTabPage
+
+class FakePage(SingleTabPage):
+    url = "about:blank"
+
+    async def evaluate(self, script, arg=None):
+        return {"forms": [], "links": ["Home", "About"], "buttons": []}
+
+    async def goto(self, url):
+        self.url = url
+
+def test_span_is_a_shared_noop_when_tracing_is_off():
+    first = span("snapshot")
+    with first as sp:
+        sp["ignored"] = 1
+    assert first is span("action") and not first.active
+
+@pytest.mark.asyncio
+async def test_loop_records_nested_spans(tmp_path):
+    tracer = Tracer()
+    planner = ScriptedPlanner([("navigate", {"url": "https://example.com"})])
+    with tracer.activate():
+        await autonomous_loop(FakePage(), "Open example.com", planner=planner)
+
+    names = [record["name"] for record in tracer.spans]
+    assert names.count("step") == 2
+    assert names.count("plan") == 2
+    assert names.count("snapshot") == 2
+    action = next(r for r in tracer.spans if r["name"] == "action")
+    assert action["action"] == "navigate"
+    assert "act" in action["timings"]
+    step_ids = {r["id"] for r in tracer.spans if r["name"] == "step"}
+    assert all(r["parent"] in step_ids for r in tracer.spans if r["name"] != "step")
+    snapshot = next(r for r in tracer.spans if r["name"] == "snapshot")
+    assert snapshot["links"] == 2
+
+    path = tmp_path / "trace.jsonl"
+    tracer.write_jsonl(str(path))
+    assert len(path.read_text().splitlines()) == len(tracer.spans)
+    assert all("duration_ms" in json.loads(line) for line in path.read_text().splitlines())
+
+    text = tracer.prometheus()
+    assert 'browseruse_span_seconds_count{span="plan"} 2' in text
+    assert 'browseruse_span_seconds_count{span="action",action="navigate"} 1' in text
+    assert "browseruse_llm_retries_total 0" in text
+
+@pytest.mark.asyncio
+async def test_step_span_excludes_the_consumer():
+    tracer = Tracer()
+    planner = ScriptedPlanner([("navigate", {"url": "https://example.com"})])
+    with tracer.activate():
+        async for event in autonomous_stream(FakePage(), "Open example.com", planner=planner):
+            with span("consumer"):
+                await asyncio.sleep(0.05)
+
+    step = next(r for r in tracer.spans if r["name"] == "step")
+    assert step["duration_ms"] < 50
+    consumers = [r for r in tracer.spans if r["name"] == "consumer"]
+    assert len(consumers) == 3 and all(r["parent"] is None for r in consumers)
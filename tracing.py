@@ -0,0 +1,186 @@
+import json
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_tracer: ContextVar[Optional["Tracer"]] = ContextVar("browseruse_tracer", default=None)
+_current_span: ContextVar[Optional[int]] = ContextVar("browseruse_span", default=None)
+
+
+class _NullSpan:
+    """Shared stand-in returned by span() when tracing is off."""
+    __slots__ = ()
+    active = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setitem__(self, key, value):
+        pass
+
+    def update(self, *args, **kwargs):
+        pass
+
+    def paused(self):
+        return nullcontext()
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    active = True
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]):
+        self._tracer = tracer
+        self.record: Dict[str, Any] = {"name": name, **attrs}
+
+    def __setitem__(self, key, value):
+        self.record[key] = value
+
+    def update(self, *args, **kwargs):
+        self.record.update(*args, **kwargs)
+
+    def __enter__(self):
+        self.record["id"] = self._tracer._next_id()
+        self.record["parent"] = _current_span.get()
+        self._token = _current_span.set(self.record["id"])
+        self.record["start"] = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    @contextmanager
+    def paused(self) -> Iterator[None]:
+        """
+        Step out of the span and stop its clock, e.g. around a generator's
+        yield, so the consumer's time and spans are not counted in it.
+        """
+        paused_at = time.perf_counter()
+        _current_span.set(self.record["parent"])
+        try:
+            yield
+        finally:
+            _current_span.set(self.record["id"])
+            self._t0 += time.perf_counter() - paused_at
+
+    def __exit__(self, exc_type, exc, tb):
+        self.record["duration_ms"] = (time.perf_counter() - self._t0) * 1000
+        if exc_type is not None:
+            self.record["error"] = f"{exc_type.__name__}: {exc}"
+        _current_span.reset(self._token)
+        self._tracer.spans.append(self.record)
+        return False
+
+
+class Tracer:
+    """
+    Collects spans (snapshot, plan, action, step, ...) with durations and
+    attributes such as token counts, retries and the locator strategy.
+
+        tracer = Tracer()
+        with tracer.activate():
+            await autonomous_loop(page, goal)
+        tracer.write_jsonl("trace.jsonl")
+        print(tracer.prometheus())
+    """
+
+    def __init__(self):
+        self.spans: List[Dict[str, Any]] = []
+        self._ids = 0
+
+    def _next_id(self) -> int:
+        self._ids += 1
+        return self._ids
+
+    def span(self, name: str, **attrs: Any) -> _Span:
+        return _Span(self, name, attrs)
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this the tracer picked up by span() in the current context."""
+        token = _current_tracer.set(self)
+        try:
+            yield self
+        finally:
+            _current_tracer.reset(token)
+
+    def write_jsonl(self, path: str) -> None:
+        """Write one JSON object per finished span."""
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.spans:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def prometheus(self) -> str:
+        """Summarise the spans in Prometheus text exposition format."""
+        durations: Dict[tuple, List[float]] = defaultdict(list)
+        tokens: Counter = Counter()
+        strategies: Counter = Counter()
+        retries = 0
+        errors: Counter = Counter()
+        for record in self.spans:
+            labels = (record["name"], record.get("action", ""))
+            durations[labels].append(record["duration_ms"] / 1000)
+            tokens["prompt"] += record.get("prompt_tokens", 0)
+            tokens["completion"] += record.get("completion_tokens", 0)
+            retries += record.get("retries", 0)
+            if "strategy" in record:
+                strategies[record["strategy"]] += 1
+            if "error" in record:
+                errors[labels] += 1
+
+        def fmt(span_name, action):
+            label = f'span="{span_name}"'
+            return label + (f',action="{action}"' if action else "")
+
+        lines = [
+            "# HELP browseruse_span_seconds Time spent per span type.",
+            "# TYPE browseruse_span_seconds summary"
+        ]
+        for (span_name, action), values in sorted(durations.items()):
+            labels = fmt(span_name, action)
+            lines.append(f"browseruse_span_seconds_count{{{labels}}} {len(values)}")
+            lines.append(f"browseruse_span_seconds_sum{{{labels}}} {sum(values):.6f}")
+        lines += [
+            "# HELP browseruse_span_errors_total Spans that ended with an exception.",
+            "# TYPE browseruse_span_errors_total counter"
+        ]
+        for (span_name, action), count in sorted(errors.items()):
+            lines.append(f"browseruse_span_errors_total{{{fmt(span_name, action)}}} {count}")
+        lines += [
+            "# HELP browseruse_llm_tokens_total Tokens sent to and received from the planner.",
+            "# TYPE browseruse_llm_tokens_total counter",
+            f'browseruse_llm_tokens_total{{kind="prompt"}} {tokens["prompt"]}',
+            f'browseruse_llm_tokens_total{{kind="completion"}} {tokens["completion"]}',
+            "# HELP browseruse_llm_retries_total Planner request retries.",
+            "# TYPE browseruse_llm_retries_total counter",
+            f"browseruse_llm_retries_total {retries}",
+            "# HELP browseruse_locator_strategy_total Locator strategies that resolved a target.",
+            "# TYPE browseruse_locator_strategy_total counter"
+        ]
+        for strategy, count in sorted(strategies.items()):
+            lines.append(f'browseruse_locator_strategy_total{{strategy="{strategy}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def span(name: str, **attrs: Any):
+    """
+    Context manager recording a span on the active tracer. When no tracer
+    is active this returns a shared no-op object, so instrumented code pays
+    only a context-variable lookup.
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        return _NULL_SPAN
+    return tracer.span(name, **attrs)
+
+
+def current_tracer() -> Optional[Tracer]:
+    return _current_tracer.get()
+
+
+__all__ = ["Tracer", "span", "current_tracer"]